@@ -0,0 +1,213 @@
+"""
+MEDIA_ROOT altındaki dosyaların production'da sunulması.
+
+django.views.static.serve'den farkları:
+  * İçerik özetinden (sha256) güçlü ETag, Last-Modified ve
+    If-None-Match / If-Modified-Since için 304 yanıtları,
+  * Tek aralıklı Range istekleri (206 / 416) ve If-Range,
+  * Adında içerik özeti taşıyan dosyalar (örn. products/derivatives/
+    <sha256>-400w.webp, products/models/lite/<sha256>.glb) için bir yıllık
+    "immutable" Cache-Control,
+  * İstemci destekliyorsa önceden sıkıştırılmış .br / .gz kopyasının
+    seçilmesi (bkz. compress_media komutu),
+  * Önde bir proxy varsa dosya gövdesinin ona devredilmesi:
+    MEDIA_ACCEL_REDIRECT (nginx X-Accel-Redirect) ya da MEDIA_SENDFILE
+    (Apache mod_xsendfile / lighttpd X-Sendfile).
+"""
+import hashlib
+import mimetypes
+import os
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# Dosya adında en az 16 haneli hex özet: "<özet>.glb", "<özet>-400w.webp"
+HASHED_NAME = re.compile(r'(^|[/_.-])[0-9a-f]{16,}([_.-]|$)')
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+# mimetypes'ın bilmediği ya da platforma göre farklı döndüğü türler
+MIME_TYPES = {
+    '.glb': 'model/gltf-binary',
+    '.gltf': 'model/gltf+json',
+    '.usdz': 'model/vnd.usdz+zip',
+    '.avif': 'image/avif',
+    '.webp': 'image/webp',
+}
+# Accept-Encoding kodlaması -> sıkıştırılmış kopya uzantısı (tercih sırasıyla)
+SIDECARS = (('br', '.br'), ('gzip', '.gz'))
+
+
+@lru_cache(maxsize=4096)
+def _content_hash(path, mtime_ns, size):
+    """Dosya değişmedikçe (mtime/boyut aynı) özet bir kez hesaplanır."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def _accepted_encodings(request):
+    accepted = set()
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _select_representation(request, path, stat):
+    """(dosya yolu, stat, Content-Encoding, sıkıştırılmış kopya var mı) döner."""
+    has_sidecar = False
+    accepted = None
+    for coding, suffix in SIDECARS:
+        try:
+            sidecar_stat = os.stat(path + suffix)
+        except OSError:
+            continue
+        # Kaynaktan eski kopya bayattır; kullanılmaz
+        if sidecar_stat.st_mtime < stat.st_mtime:
+            continue
+        has_sidecar = True
+        if accepted is None:
+            accepted = _accepted_encodings(request)
+        # Range istekleri kodlanmamış gövdeye göre yorumlanır
+        if coding in accepted and 'Range' not in request.headers:
+            return path + suffix, sidecar_stat, coding, True
+    return path, stat, None, has_sidecar
+
+
+def _parse_range(header, size):
+    """'bytes=a-b' -> (başlangıç, bitiş dahil); geçersiz/çoklu aralıkta None, karşılanamazsa False."""
+    match = RANGE_HEADER.match(header.strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def _if_range_matches(request, etag, mtime):
+    value = request.headers.get('If-Range')
+    if value is None:
+        return True
+    if value.startswith('"') or value.startswith('W/'):
+        return value == etag
+    modified = parse_http_date_safe(value)
+    return modified is not None and int(mtime) <= modified
+
+
+def _stream(path, start, length):
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        while length > 0:
+            chunk = fh.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except (SuspiciousFileOperation, ValueError):
+        raise Http404('Dosya bulunamadı.')
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404('Dosya bulunamadı.')
+    if not os.path.isfile(full_path):
+        raise Http404('Dosya bulunamadı.')
+
+    file_path, file_stat, encoding, has_sidecar = _select_representation(request, full_path, stat)
+    etag = '"%s"' % _content_hash(file_path, file_stat.st_mtime_ns, file_stat.st_size)
+    mtime = stat.st_mtime
+
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(mtime),
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': (
+            f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+            if HASHED_NAME.search(os.path.basename(path))
+            else f'public, max-age={getattr(settings, "MEDIA_CACHE_MAX_AGE", 3600)}'
+        ),
+    }
+    if has_sidecar:
+        headers['Vary'] = 'Accept-Encoding'
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(mtime))
+    if not_modified is not None:
+        for name, value in headers.items():
+            not_modified.headers.setdefault(name, value)
+        return not_modified
+
+    content_type = MIME_TYPES.get(os.path.splitext(full_path)[1].lower())
+    if content_type is None:
+        content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    if encoding:
+        headers['Content-Encoding'] = encoding
+
+    # Proxy'ye devret: Range ve gövdeyi proxy sunar
+    accel_prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT', '')
+    if accel_prefix or getattr(settings, 'MEDIA_SENDFILE', False):
+        response = HttpResponse(content_type=content_type, headers=headers)
+        relative = os.path.relpath(file_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+        if accel_prefix:
+            response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + relative
+        else:
+            response['X-Sendfile'] = file_path
+        return response
+
+    size = file_stat.st_size
+    byte_range = None
+    if 'Range' in request.headers and _if_range_matches(request, etag, mtime):
+        byte_range = _parse_range(request.headers['Range'], size)
+    if byte_range is False:
+        return HttpResponse(
+            status=416, content_type='text/plain', headers={**headers, 'Content-Range': f'bytes */{size}'}
+        )
+
+    if byte_range is None:
+        headers['Content-Length'] = str(size)
+        if request.method == 'HEAD':
+            return HttpResponse(content_type=content_type, headers=headers)
+        # FileResponse, sunucunun wsgi.file_wrapper'ını (sendfile) kullanır
+        return FileResponse(
+            open(file_path, 'rb'), content_type=content_type, filename=os.path.basename(full_path), headers=headers,
+        )
+
+    start, end = byte_range
+    headers['Content-Length'] = str(end - start + 1)
+    headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    if request.method == 'HEAD':
+        return HttpResponse(status=206, content_type=content_type, headers=headers)
+    return StreamingHttpResponse(
+        _stream(file_path, start, end - start + 1), status=206, content_type=content_type, headers=headers,
+    )
@@ -46,6 +46,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sites',
+    'django.contrib.postgres',
 
 # Senin Uygulamaların
     'users',
@@ -91,7 +92,56 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 12,
+    # orjson kuruluysa onu kullanır, değilse DRF'in stdlib json yoluna düşer
+    'DEFAULT_RENDERER_CLASSES': (
+        'store.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'store.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+}
+
+# Ürün ve sipariş listeleri ModelSerializer yerine values() satırlarından
+# kurulur (store/plain.py); çıktı aynıdır, bkz. benchmark_json_rendering komutu
+API_PLAIN_SERIALIZERS = config('API_PLAIN_SERIALIZERS', default=False, cast=bool)
+
+# Önbellek: katalog listeleri ayrı bir alias'ta tutulur; Redis için örn.
+# CATALOG_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# CATALOG_CACHE_LOCATION=redis://127.0.0.1:6379/1
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalog': {
+        'BACKEND': config('CATALOG_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CATALOG_CACHE_LOCATION', default='catalog'),
+    },
 }
+CATALOG_CACHE_ALIAS = 'catalog'
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=300, cast=int)
+
+# Ürün görüntülenme sayaçlarının DB'ye toplu yazılma aralığı (saniye).
+# 0: tamponlama kapalı, her görüntülenme anında yazılır (örn. production'da 10)
+VIEW_COUNT_FLUSH_INTERVAL = config('VIEW_COUNT_FLUSH_INTERVAL', default=0, cast=int)
+
+# Sepete eklenen ürünlerin stokta tutulma süresi (dakika)
+STOCK_HOLD_MINUTES = config('STOCK_HOLD_MINUTES', default=15, cast=int)
+
+# ?ordering=trending / bestselling (store/ranking.py, compute_trending_scores komutu).
+# Sinyal ağırlıkları TRENDING_WEIGHTS = {'views': 1, 'favorites': 5, 'cart_adds': 8, 'sales': 20} ile değiştirilebilir
+TRENDING_HALF_LIFE_DAYS = config('TRENDING_HALF_LIFE_DAYS', default=3, cast=float)
+TRENDING_WINDOW_DAYS = config('TRENDING_WINDOW_DAYS', default=14, cast=int)
+BESTSELLING_WINDOW_DAYS = config('BESTSELLING_WINDOW_DAYS', default=30, cast=int)
+
+# /products/<id>/related/ "birlikte alınanlar" (store/recommendations.py, build_recommendations komutu)
+RECOMMENDATION_TOP_K = config('RECOMMENDATION_TOP_K', default=12, cast=int)
+RECOMMENDATION_MIN_SUPPORT = config('RECOMMENDATION_MIN_SUPPORT', default=1, cast=int)
+
+# Ürün listesi ?facets=1 fiyat aralıkları (store/facets.py); değiştirince rebuild_product_facets çalıştırın
+FACET_PRICE_BUCKETS = [int(b) for b in config('FACET_PRICE_BUCKETS', default='50,100,200,500').split(',') if b]
 
 # 30 Günlük Oturum Süresi
 ACCOUNT_SESSION_REMEMBER = True
@@ -115,6 +165,8 @@ MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
+    # Accept-Language'i bir kez çözer: request.catalog_language (bkz. store/i18n.py)
+    'store.i18n.LanguageNegotiationMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -211,6 +263,13 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Medya dosyaları core/media.py ile sunulur (ETag/304, Range, .br/.gz kopyalar).
+# Önde nginx varsa gövdeyi ona devretmek için internal location öneki, örn.
+# MEDIA_ACCEL_REDIRECT=/protected-media/ ; Apache/lighttpd için MEDIA_SENDFILE=True
+MEDIA_ACCEL_REDIRECT = config('MEDIA_ACCEL_REDIRECT', default='')
+MEDIA_SENDFILE = config('MEDIA_SENDFILE', default=False, cast=bool)
+# Adında içerik özeti olmayan dosyalar için tarayıcı önbellek süresi (saniye)
+MEDIA_CACHE_MAX_AGE = config('MEDIA_CACHE_MAX_AGE', default=3600, cast=int)
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -241,6 +300,11 @@ SOCIALACCOUNT_ADAPTER = 'core.adapters.CustomSocialAccountAdapter'
 
 LANGUAGE_CODE = 'en-us'
 
+# Katalog içerik dilleri (name_<dil> / description_<dil> kolonları);
+# Accept-Language bunlara göre çözülür, eşleşme yoksa varsayılan dil
+CATALOG_LANGUAGES = ('tr', 'en', 'de')
+CATALOG_DEFAULT_LANGUAGE = 'en'
+
 TIME_ZONE = 'UTC'
 
 USE_I18N = True
@@ -14,11 +14,13 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from .media import serve_media
 from .views import google_jwt_redirect
 
 urlpatterns = [
@@ -35,6 +37,8 @@ urlpatterns = [
     path('accounts/', include('allauth.urls')),
 ]
 
-# Geliştirme aşamasında medya (resim) dosyalarının servis edilmesi
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+# Medya (resim, 3D model) dosyaları: ETag/304, Range ve uzun süreli önbellek
+# desteğiyle; önde proxy varsa X-Accel-Redirect/X-Sendfile ile devredilir
+urlpatterns += [
+    re_path(rf'^{re.escape(settings.MEDIA_URL.lstrip("/"))}(?P<path>.+)$', serve_media, name='media'),
+]
\ No newline at end of file
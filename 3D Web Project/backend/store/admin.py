@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.shortcuts import render
 from django.http import HttpResponseRedirect
-from .models import Category, Product, ProductColor, ProductSize, ProductImage, Review, Cart, CartItem, Order, OrderItem, Coupon, Campaign
+from .models import Category, Product, ProductColor, ProductSize, ProductImage, Review, Cart, CartItem, Order, OrderItem, Coupon, Campaign, StockReservation
 
 
 # --- AKSİYON: Toplu Fiyat Güncelleme ---
@@ -11,6 +11,7 @@ def set_bulk_price(modeladmin, request, queryset):
     if 'apply' in request.POST:
         price = request.POST.get('new_price')
         queryset.update(price_override=price)
+        queryset.refresh_effective_prices()
         modeladmin.message_user(request, f"{queryset.count()} adet bedene {price} EUR fiyatı uygulandı.")
         return HttpResponseRedirect(request.get_full_path())
     # Admin için özel fiyat giriş sayfası (Şablon gerektirir)
@@ -43,8 +44,10 @@ class ProductAdmin(admin.ModelAdmin):
     fields = (
         'slug', 'name_tr', 'name_en', 'name_de', 'description_tr', 'description_en', 'description_de',
         'price', 'currency', 'category', 'thumbnail', 'model_3d', 'model_3d_poster',
-        'is_visible', 'is_available', 'low_stock_warning',
+        'model_3d_lite', 'model_3d_meta', 'is_visible', 'is_available', 'low_stock_warning',
     )
+    # process_3d_models komutu doldurur
+    readonly_fields = ('model_3d_lite', 'model_3d_meta')
 
 @admin.register(ProductSize)
 class ProductSizeAdmin(admin.ModelAdmin):
@@ -55,7 +58,7 @@ class ProductSizeAdmin(admin.ModelAdmin):
 
     @admin.display(description='Net Fiyat')
     def get_final_price(self, obj):
-        return obj.current_price
+        return obj.effective_price
 
 admin.site.register(Category)
 admin.site.register(Review)
@@ -71,8 +74,20 @@ class CartItemInline(admin.TabularInline):
 @admin.register(Cart)
 class CartAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'total_price', 'updated_at', 'is_completed')
+    list_select_related = ('user',)
     inlines = [CartItemInline]
 
+    def get_queryset(self, request):
+        # total_price satır başına sorgu atmasın diye SQL'de hesaplanır
+        return super().get_queryset(request).with_totals()
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ('cart', 'size', 'quantity', 'expires_at')
+    list_select_related = ('size__product',)
+    raw_id_fields = ('cart', 'size')
+
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
@@ -0,0 +1,201 @@
+"""
+Katalog okuma uçlarının async sürümleri (/api/store/async/...), ASGI altında
+(uvicorn / daphne: core.asgi:application) çalıştırılmak içindir.
+
+Yavaş bir istemciye yanıt gönderilirken WSGI'da bir iş parçacığı bekler;
+burada bekleyen yalnızca bir coroutine'dir, tek worker çok sayıda eşzamanlı
+bağlantıyı taşır. Sorgu/serializer kuralları senkron view'lardan
+(get_queryset, get_serializer_class, sayfalama) aynen alınır; yanıt
+gövdeleri, ETag/304 ve önbellek davranışı ile hata gövdeleri senkron
+uçlarla aynıdır.
+
+Sayfa numaralı listeler ve detay Django'nun async ORM'i (acount, async for,
+aget) ile okunur. Keyset (?pagination=cursor) sayfalaması ile ETag/önbellek
+işlemleri senkron kodu sync_to_async ile çağırır. Düz serializer yolu
+(API_PLAIN_SERIALIZERS) yalnızca senkron view'lardadır.
+
+Karşılaştırma için: manage.py loadtest_catalog
+"""
+from abc import ABCMeta, abstractmethod
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.shortcuts import aget_object_or_404
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework.views import exception_handler
+
+from .cache import catalog_cache, catalog_cache_key, catalog_etag, record_hit, record_miss
+from .counters import view_counts
+from .models import Cart
+from .pagination import CatalogPagination
+from .renderers import FastJSONRenderer
+from .serializers import CartSerializer
+from .views import CART_PREFETCH, CategoryListView, ProductDetailView, ProductListView, wants_facets
+
+
+def _cached(prefix, request):
+    key = catalog_cache_key(prefix, request)
+    data = catalog_cache().get(key)
+    if data is None:
+        record_miss()
+    else:
+        record_hit()
+    return key, data
+
+
+class AsyncAPIView(View):
+    """DRF Request'i (kimlik doğrulama, query_params) async bir Django view'ında kullanır."""
+    sync_view = None
+    renderer = FastJSONRenderer()
+
+    def drf_request(self, request):
+        return Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+
+    def drf_view(self, request, kwargs):
+        return self.sync_view(request=request, args=(), kwargs=kwargs, format_kwarg=None, headers={})
+
+    def render(self, data, status_code=status.HTTP_200_OK, headers=None):
+        return HttpResponse(
+            self.renderer.render(data), status=status_code, content_type='application/json', headers=headers,
+        )
+
+    def handle_exception(self, exc, view, request):
+        response = exception_handler(exc, {'view': view, 'request': request, 'args': (), 'kwargs': {}})
+        if response is None:
+            raise exc
+        headers = {name: value for name, value in response.items() if name.lower() != 'content-type'}
+        return self.render(response.data, response.status_code, headers=headers)
+
+
+class AsyncCatalogView(AsyncAPIView, metaclass=ABCMeta):
+    """ConditionalGetMixin + CatalogCacheMixin'in async karşılığı; alt sınıflar respond() ile gövdeyi üretir."""
+
+    async def get(self, request, *args, **kwargs):
+        request = self.drf_request(request)
+        view = self.drf_view(request, kwargs)
+        try:
+            etag = await sync_to_async(catalog_etag)(request)
+            client_etags = parse_etags(request.headers.get('If-None-Match', ''))
+            if etag in [tag.removeprefix('W/') for tag in client_etags]:
+                await self.not_modified(request, **kwargs)
+                response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = await self.respond(view, request, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc, view, request)
+        else:
+            response['ETag'] = etag
+            response['Cache-Control'] = 'no-cache'
+        patch_vary_headers(response, ('Accept-Language',))
+        return response
+
+    async def not_modified(self, request, **kwargs):
+        """304 dönülürken de çalışması gereken yan etkiler için."""
+
+    @abstractmethod
+    async def respond(self, view, request, **kwargs):
+        """ETag eşleşmediğinde yanıtı üretir."""
+
+
+class AsyncListView(AsyncCatalogView):
+    async def respond(self, view, request, **kwargs):
+        # Sayfa linkleri yola bağlı: senkron uçla aynı girdiyi paylaşmaz
+        key, data = await sync_to_async(_cached)(f'async-{self.sync_view.cache_prefix}', request)
+        if data is not None:
+            return self.render(data, headers={'X-Cache': 'HIT'})
+        data = await self.list(view, request)
+        await catalog_cache().aset(key, data, getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300))
+        return self.render(data, headers={'X-Cache': 'MISS'})
+
+    async def list(self, view, request):
+        # get_queryset arama (SQLite FTS) için sorgu çalıştırabilir
+        queryset = await sync_to_async(lambda: view.filter_queryset(view.get_queryset()))()
+        paginator = view.paginator
+        if paginator is None:
+            return view.get_serializer([obj async for obj in queryset], many=True).data
+        if isinstance(paginator, CatalogPagination) and paginator.wants_cursor(request):
+            page = await sync_to_async(paginator.paginate_queryset)(queryset, request, view)
+            return paginator.get_paginated_response(view.get_serializer(page, many=True).data).data
+        return await self.paginate_pages(view, request, queryset)
+
+    async def paginate_pages(self, view, request, queryset):
+        """PageNumberPagination ile aynı yanıt; COUNT ve sayfa async ORM ile okunur."""
+        pagination = PageNumberPagination
+        page_size = pagination.page_size
+        count = await queryset.acount()
+        num_pages = max(1, -(-count // page_size))
+        raw = request.query_params.get(pagination.page_query_param) or 1
+        try:
+            number = num_pages if raw in pagination.last_page_strings else int(raw)
+        except (TypeError, ValueError):
+            number = 0
+        if not 1 <= number <= num_pages:
+            raise NotFound(pagination.invalid_page_message.format(page_number=raw, message=''))
+
+        offset = (number - 1) * page_size
+        rows = [obj async for obj in queryset[offset:offset + page_size]]
+        url = request.build_absolute_uri()
+        previous = None
+        if number > 1:
+            previous = (
+                remove_query_param(url, pagination.page_query_param) if number == 2
+                else replace_query_param(url, pagination.page_query_param, number - 1)
+            )
+        return {
+            'count': count,
+            'next': replace_query_param(url, pagination.page_query_param, number + 1) if number < num_pages else None,
+            'previous': previous,
+            'results': view.get_serializer(rows, many=True).data,
+        }
+
+
+class AsyncProductListView(AsyncListView):
+    sync_view = ProductListView
+
+    async def list(self, view, request):
+        data = await super().list(view, request)
+        if wants_facets(request):
+            data['facets'] = await sync_to_async(view.get_facet_counts)()
+        return data
+
+
+class AsyncCategoryListView(AsyncListView):
+    sync_view = CategoryListView
+
+
+class AsyncProductDetailView(AsyncCatalogView):
+    sync_view = ProductDetailView
+
+    async def not_modified(self, request, **kwargs):
+        await sync_to_async(view_counts.add)(int(kwargs['id']))
+
+    async def respond(self, view, request, **kwargs):
+        instance = await aget_object_or_404(view.get_queryset(), id=kwargs['id'])
+        await sync_to_async(view_counts.add)(instance.pk)
+        return self.render(view.get_serializer(instance).data)
+
+
+class AsyncMyCartView(AsyncAPIView):
+    """CartViewSet.my_cart'ın async karşılığı."""
+
+    async def get(self, request, *args, **kwargs):
+        request = self.drf_request(request)
+        try:
+            # Kimlik doğrulama (JWT kullanıcısı / oturum) veritabanına gider
+            user = await sync_to_async(lambda: request.user)()
+        except Exception as exc:
+            return self.handle_exception(exc, None, request)
+        if not user.is_authenticated:
+            return self.render({"items": []})
+        cart, _ = await Cart.objects.aget_or_create(user=user, is_completed=False)
+        cart = await Cart.objects.with_totals().prefetch_related(*CART_PREFETCH).aget(pk=cart.pk)
+        return self.render(CartSerializer(cart).data)
@@ -0,0 +1,125 @@
+"""
+Katalog yanıt önbelleği.
+
+Ürün/kategori listeleri (kategori, arama, sayfa, dil...) anahtarıyla
+CATALOG_CACHE_ALIAS önbelleğinde tutulur. Backend settings.CACHES üzerinden
+seçilir (locmem / file / Redis). Geçersiz kılma anahtar silerek değil, katalog
+sürümünü artırarak yapılır: sürüm anahtarın parçası olduğu için eski girdiler
+bir daha okunmaz ve TTL ile düşer.
+
+HTTP koşullu GET (ETag / 304) için katalog_etag() ayrıca veritabanındaki
+en son updated_at damgasını kullanır; böylece önbellek süreçler arasında
+paylaşılmasa bile başka bir süreçte yapılan değişiklik ETag'i değiştirir.
+"""
+import hashlib
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import IntegerField, Max, Value
+
+from .i18n import request_language
+
+VERSION_KEY = 'catalog:version'
+HITS_KEY = 'catalog:hits'
+MISSES_KEY = 'catalog:misses'
+
+
+def catalog_cache():
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+
+def _incr(key):
+    cache = catalog_cache()
+    # add() anahtar yoksa oluşturur; incr() Redis/memcached'de atomiktir
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Arada başka bir süreç önbelleği temizlediyse
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def get_catalog_version():
+    version = catalog_cache().get(VERSION_KEY)
+    if version is None:
+        catalog_cache().add(VERSION_KEY, 1, timeout=None)
+        version = catalog_cache().get(VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version():
+    """Katalog verisi değişti: tüm liste girdilerini tek işlemde geçersiz kılar."""
+    return _incr(VERSION_KEY)
+
+
+def catalog_cache_key(prefix, request):
+    params = sorted(request.query_params.lists())
+    digest = hashlib.md5(repr((request.get_host(), params)).encode()).hexdigest()
+    return f'catalog:{get_catalog_version()}:{prefix}:{request_language(request)}:{digest}'
+
+
+# Damga sorgusu istek patlamalarında bu kadar saniye paylaşılır; aynı süreçteki
+# değişiklikler sürüm artışıyla anında, diğer süreçlerdekiler en geç bu sürede görünür
+STAMP_TIMEOUT = 2
+# updated_at taşıyan ve liste/detay yanıtlarına giren modeller
+STAMPED_MODELS = ('Product', 'ProductSize', 'ProductColor', 'ProductImage', 'Category', 'Campaign')
+
+
+def catalog_stamp():
+    """Katalog tablolarındaki en yeni updated_at; tek sorguda (UNION ALL) ve indeks üzerinden okunur."""
+    # Sabit değere göre gruplama GROUP BY'ı düşürür: SELECT MAX(updated_at) FROM ...
+    first, *rest = [
+        apps.get_model('store', name).objects.order_by()
+        .values(one=Value(1, output_field=IntegerField()))
+        .annotate(stamp=Max('updated_at'))
+        .values_list('stamp')
+        for name in STAMPED_MODELS
+    ]
+    stamps = [stamp for stamp, in first.union(*rest, all=True) if stamp is not None]
+    return max(stamps).isoformat() if stamps else ''
+
+
+def catalog_etag(request):
+    """
+    Gövde üretilmeden hesaplanan ETag: en yeni updated_at + katalog sürümü
+    (silmeler ve toplu güncellemeler) + yol/query parametreleri + dil.
+    Rezervasyon süreleri gibi yazma olmadan değişen alanlar (available_stock)
+    için damga en geç CATALOG_CACHE_TIMEOUT saniyede bir yenilenir.
+    """
+    version = get_catalog_version()
+    stamp_key = f'catalog:{version}:stamp'
+    stamp = catalog_cache().get(stamp_key)
+    if stamp is None:
+        stamp = catalog_stamp()
+        catalog_cache().set(stamp_key, stamp, STAMP_TIMEOUT)
+
+    timeout = getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300) or 1
+    parts = (
+        stamp, version, int(time.time() // timeout),
+        request.path, sorted(request.query_params.lists()), request_language(request),
+    )
+    return '"%s"' % hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def record_hit():
+    _incr(HITS_KEY)
+
+
+def record_miss():
+    _incr(MISSES_KEY)
+
+
+def cache_stats():
+    cache = catalog_cache()
+    return {
+        'hits': cache.get(HITS_KEY, 0),
+        'misses': cache.get(MISSES_KEY, 0),
+        'version': cache.get(VERSION_KEY, 1),
+    }
+
+
+def reset_cache_stats():
+    catalog_cache().delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,107 @@
+"""
+Ürün görüntülenme sayaçları için süreç içi tampon.
+
+ProductDetailView her istekte sıcak satıra UPDATE atmak yerine artışları
+burada biriktirir; arka plan thread'i VIEW_COUNT_FLUSH_INTERVAL saniyede bir
+tüm bekleyen artışları tek bir `UPDATE ... CASE` ile yazar. Süreç düzgün
+kapanırken (atexit) kalanlar da yazılır. Aralık 0 ise tamponlama kapalıdır
+ve her artış anında yazılır.
+"""
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError, connection, models, transaction
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH_SIZE = 500
+
+
+class ViewCountBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._atexit_registered = False
+
+    @property
+    def interval(self):
+        return getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', 0)
+
+    def add(self, product_id, amount=1):
+        if self.interval <= 0:
+            self._write({product_id: amount})
+            return
+        with self._lock:
+            self._pending[product_id] += amount
+            self._ensure_flusher()
+
+    def pending(self):
+        with self._lock:
+            return dict(self._pending)
+
+    def flush(self):
+        """Bekleyen artışları yazar; yazılan ürün sayısını döner."""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return 0
+        written = len(pending)
+        try:
+            self._write(pending)
+        except DatabaseError:
+            # Artışlar kaybolmasın: yazılamayan gruplar bir sonraki turda tekrar denenir
+            logger.exception('View count flush failed; %d products re-queued', len(pending))
+            with self._lock:
+                self._pending.update(pending)
+            return 0
+        return written
+
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+    def _write(self, counts):
+        """Yazılan grupları counts'tan düşer; hata olursa counts yazılamayanları taşır."""
+        from .models import Product, ProductActivity
+
+        items = list(counts.items())
+        for start in range(0, len(items), FLUSH_BATCH_SIZE):
+            batch = items[start:start + FLUSH_BATCH_SIZE]
+            increment = models.Case(
+                *[models.When(pk=pk, then=models.Value(n)) for pk, n in batch],
+                output_field=models.PositiveIntegerField(),
+            )
+            # Sayaç ve günlük kova birlikte yazılır: yeniden denenen grup view_count'u iki kez artırmaz
+            with transaction.atomic():
+                Product.objects.filter(pk__in=[pk for pk, _ in batch]).update(
+                    view_count=models.F('view_count') + increment
+                )
+                # Trend skoru için günlük kova (bkz. store/ranking.py)
+                ProductActivity.objects.bump('views', dict(batch))
+            for pk, _ in batch:
+                del counts[pk]
+
+    def _ensure_flusher(self):
+        if not self._atexit_registered:
+            atexit.register(self.stop)
+            self._atexit_registered = True
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='view-count-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            finally:
+                # Thread'e ait DB bağlantısı açık kalmasın
+                connection.close()
+
+
+view_counts = ViewCountBuffer()
@@ -0,0 +1,252 @@
+"""
+Ürün listesi facet filtreleri (size / color / min_price / max_price / in_stock)
+ve facet sayıları (?facets=1).
+
+Her istekte ProductSize x ProductColor join'i ve birkaç GROUP BY yapmamak
+için görünür ürünlerin her beden x renk birleşimi ProductFacet tablosunda
+tutulur (kategori, net fiyat, fiyat aralığı, stok durumu ile). Liste
+filtreleri bu tablodaki tek bir alt sorguya (product_id IN ...), süzgeçsiz (yalnızca kategori)
+listelerin facet sayıları FacetCount'taki hazır satırlara dönüşür; süzgeçli
+sayılar yalnızca ProductFacet üzerinden hesaplanır.
+
+Tablolar sync_product_facets ile artımlı güncellenir: beden / renk / ürün
+kayıtları (signals), toplu fiyat yenilemesi (refresh_effective_prices) ve
+stoğu tükenen bedenler (decrement_stock). Toplu içe aktarma sonrası ya da
+tutarsızlık şüphesinde rebuild_product_facets komutu tabloları baştan kurar.
+"""
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import models, transaction
+from rest_framework.exceptions import ValidationError
+
+DEFAULT_PRICE_BUCKETS = (50, 100, 200, 500)
+SYNC_BATCH_SIZE = 500
+ROW_FIELDS = ('product_id', 'category_id', 'size_value', 'color', 'price_bucket', 'in_stock')
+# Süzgeç -> ait olduğu facet; bir facet'in sayıları kendi süzgeci olmadan hesaplanır
+FILTER_FACETS = {
+    'size_value__in': 'size',
+    'color__in': 'color',
+    'price__gte': 'price',
+    'price__lte': 'price',
+    'in_stock': 'in_stock',
+}
+TRUTHY = ('1', 'true', 'yes')
+
+
+def price_buckets():
+    return sorted(Decimal(str(bound)) for bound in getattr(settings, 'FACET_PRICE_BUCKETS', DEFAULT_PRICE_BUCKETS))
+
+
+def size_key(size_value):
+    return f'{size_value:g}'
+
+
+def facet_rows(sizes, colors, bounds):
+    """
+    sizes: (ürün, kategori, beden, net fiyat, stok) satırları; colors: {ürün:
+    {renk adı}}. ROW_FIELDS sırasıyla satır sözlükleri döner.
+    """
+    return [
+        {
+            'product_id': product_id, 'category_id': category_id, 'size_value': size_value, 'color': color,
+            'price': price, 'price_bucket': bisect_right(bounds, price), 'in_stock': stock > 0,
+        }
+        for product_id, category_id, size_value, price, stock in sizes
+        for color in sorted(colors.get(product_id, ())) or ['']
+    ]
+
+
+def facet_contributions(rows):
+    """ROW_FIELDS demetlerinden {(kategori | 0, facet, değer): ürün sayısı}."""
+    keys = set()
+    for product_id, category_id, size_value, color, price_bucket, in_stock in rows:
+        values = [('size', size_key(size_value)), ('price', str(price_bucket))]
+        if color:
+            values.append(('color', color))
+        if in_stock:
+            values.append(('in_stock', 'true'))
+        for facet, value in values:
+            keys.add((product_id, category_id, facet, value))
+            keys.add((product_id, 0, facet, value))
+    return Counter((scope, facet, value) for _, scope, facet, value in keys)
+
+
+def _current_rows(product_ids, bounds):
+    from .models import ProductColor, ProductSize
+
+    colors = defaultdict(set)
+    for product_id, name in ProductColor.objects.filter(product_id__in=product_ids).values_list('product_id', 'name'):
+        if name.strip():
+            colors[product_id].add(name.strip())
+    sizes = ProductSize.objects.filter(product_id__in=product_ids, product__is_visible=True).values_list(
+        'product_id', 'product__category_id', 'size_value', 'effective_price', 'stock',
+    )
+    return facet_rows(sizes, colors, bounds)
+
+
+def _replace(product_ids, rows):
+    from .models import FacetCount, Product, ProductFacet, increment_upsert
+
+    with transaction.atomic():
+        # Aynı ürünü eşzamanlı yenileyen iki işlem sayıları iki kez değiştirmesin
+        list(Product.objects.select_for_update().filter(pk__in=product_ids).values_list('pk', flat=True))
+        stored = ProductFacet.objects.filter(product_id__in=product_ids)
+        delta = facet_contributions([tuple(row[name] for name in ROW_FIELDS) for row in rows])
+        delta.subtract(facet_contributions(stored.values_list(*ROW_FIELDS)))
+        stored.delete()
+        ProductFacet.objects.bulk_create([ProductFacet(**row) for row in rows])
+        increment_upsert(
+            FacetCount, ['category_id', 'facet', 'value'],
+            [
+                {'category_id': scope, 'facet': facet, 'value': value, 'products': change}
+                for (scope, facet, value), change in delta.items() if change
+            ],
+            ['products'],
+        )
+
+
+def sync_product_facets(product_ids):
+    """Verilen ürünlerin ProductFacet satırlarını ve FacetCount sayılarını yeniler."""
+    product_ids = sorted(set(product_ids))
+    bounds = price_buckets()
+    for start in range(0, len(product_ids), SYNC_BATCH_SIZE):
+        batch = product_ids[start:start + SYNC_BATCH_SIZE]
+        _replace(batch, _current_rows(batch, bounds))
+
+
+def remove_product_facets(product_ids):
+    """Silinecek ürünlerin katkısını sayılardan düşer (CASCADE sayıları güncellemez)."""
+    product_ids = sorted(set(product_ids))
+    for start in range(0, len(product_ids), SYNC_BATCH_SIZE):
+        _replace(product_ids[start:start + SYNC_BATCH_SIZE], [])
+
+
+def rebuild_product_facets():
+    """Tüm facet tablolarını baştan kurar (toplu içe aktarma sonrası); satır sayısını döner."""
+    from .models import FacetCount, Product, ProductFacet
+
+    bounds = price_buckets()
+    product_ids = list(Product.objects.filter(is_visible=True).order_by('pk').values_list('pk', flat=True))
+    counts = Counter()
+    total = 0
+    with transaction.atomic():
+        ProductFacet.objects.all().delete()
+        FacetCount.objects.all().delete()
+        for start in range(0, len(product_ids), SYNC_BATCH_SIZE):
+            rows = _current_rows(product_ids[start:start + SYNC_BATCH_SIZE], bounds)
+            ProductFacet.objects.bulk_create([ProductFacet(**row) for row in rows])
+            counts.update(facet_contributions([tuple(row[name] for name in ROW_FIELDS) for row in rows]))
+            total += len(rows)
+        FacetCount.objects.bulk_create([
+            FacetCount(category_id=scope, facet=facet, value=value, products=n)
+            for (scope, facet, value), n in counts.items()
+        ], batch_size=SYNC_BATCH_SIZE)
+    return total
+
+
+def _values(raw):
+    return [value.strip() for value in (raw or '').split(',') if value.strip()]
+
+
+def facet_filters(params):
+    """Query parametrelerinden ProductFacet süzgeçleri; geçersiz değerde ValidationError."""
+    filters = {}
+    sizes = _values(params.get('size'))
+    if sizes:
+        try:
+            filters['size_value__in'] = sorted({float(value) for value in sizes})
+        except ValueError:
+            raise ValidationError({'error': 'Geçersiz beden.'})
+    colors = _values(params.get('color'))
+    if colors:
+        filters['color__in'] = colors
+    try:
+        if params.get('min_price'):
+            filters['price__gte'] = Decimal(params['min_price'])
+        if params.get('max_price'):
+            filters['price__lte'] = Decimal(params['max_price'])
+    except InvalidOperation:
+        raise ValidationError({'error': 'Geçersiz fiyat aralığı.'})
+    if params.get('in_stock', '').lower() in TRUTHY:
+        filters['in_stock'] = True
+    return filters
+
+
+def filter_products(queryset, filters):
+    """Süzgeçlerin hepsini aynı beden x renk satırında sağlayan ürünler."""
+    from .models import ProductFacet
+
+    if not filters:
+        return queryset
+    # İlişkisiz alt sorgu: süzgeç indeksi bir kez taranır (EXISTS her ürün için yeniden tarardı)
+    return queryset.filter(pk__in=ProductFacet.objects.filter(**filters).values('product_id'))
+
+
+def _stored_counts(category_id):
+    from .models import FacetCount
+
+    counts = defaultdict(dict)
+    rows = FacetCount.objects.filter(category_id=category_id or 0, products__gt=0)
+    for facet, value, n in rows.values_list('facet', 'value', 'products'):
+        counts[facet][value] = n
+    return counts
+
+
+def _live_counts(filters, category_id, products):
+    from .models import ProductFacet
+
+    rows = ProductFacet.objects.order_by()
+    if category_id:
+        rows = rows.filter(category_id=category_id)
+    if products is not None:
+        rows = rows.filter(product_id__in=products)
+    distinct = models.Count('product', distinct=True)
+
+    def without(facet):
+        return rows.filter(**{key: value for key, value in filters.items() if FILTER_FACETS[key] != facet})
+
+    counts = defaultdict(dict)
+    for size_value, n in without('size').values('size_value').annotate(n=distinct).values_list('size_value', 'n'):
+        counts['size'][size_key(size_value)] = n
+    for color, n in without('color').exclude(color='').values('color').annotate(n=distinct).values_list('color', 'n'):
+        counts['color'][color] = n
+    for bucket, n in without('price').values('price_bucket').annotate(n=distinct).values_list('price_bucket', 'n'):
+        counts['price'][str(bucket)] = n
+    counts['in_stock']['true'] = without('in_stock').filter(in_stock=True).aggregate(n=distinct)['n']
+    return counts
+
+
+def facet_counts(filters, category_id=None, products=None):
+    """
+    Liste yanıtının facets bloğu. Her facet'in sayıları diğer süzgeçlere
+    göredir (seçili bir bedenin yanındaki bedenler de sayı gösterir).
+    products: arama sonucu ürünlerin id alt sorgusu (yoksa tüm görünür ürünler).
+    """
+    if filters or products is not None:
+        counts = _live_counts(filters, category_id, products)
+    else:
+        counts = _stored_counts(category_id)
+    bounds = price_buckets()
+    price = []
+    for bucket, n in sorted(counts['price'].items(), key=lambda item: int(item[0])):
+        index = int(bucket)
+        if index > len(bounds):
+            continue  # FACET_PRICE_BUCKETS değişti, rebuild_product_facets bekleniyor
+        price.append({
+            'min': str(bounds[index - 1]) if index else '0',
+            'max': str(bounds[index]) if index < len(bounds) else None,
+            'count': n,
+        })
+    return {
+        'size': [
+            {'value': value, 'count': n} for value, n in sorted(counts['size'].items(), key=lambda item: float(item[0]))
+        ],
+        'color': [
+            {'value': value, 'count': n} for value, n in sorted(counts['color'].items(), key=lambda item: (-item[1], item[0]))
+        ],
+        'price': price,
+        'in_stock': counts['in_stock'].get('true', 0),
+    }
@@ -0,0 +1,728 @@
+"""
+Ürün 3D modelleri (Product.model_3d) için çevrimdışı işleme hattı.
+
+Yüklenen .glb/.gltf dosyası okunur, doğrulanır ve karmaşıklığı ölçülür
+(düğüm/mesh/vertex/üçgen/doku sayıları, dosya boyutu). Ardından mobil
+istemciler için hafif bir GLB üretilir:
+
+  * sahneden erişilemeyen ve boş yaprak düğümler ile bunlara bağlı
+    mesh/materyal/doku/accessor/bufferView kayıtları atılır,
+  * NORMAL/TANGENT verisi KHR_mesh_quantization ile 8 bit'e, [0, 1]
+    aralığındaki TEXCOORD verisi 16 bit'e indirilir (POSITION düğüm
+    dönüşümlerini değiştirmeyi gerektirdiği için olduğu gibi bırakılır),
+  * gömülü dokular LITE_TEXTURE_SIZE pikseline küçültülür,
+  * aynı içerikli bufferView ve accessor'lar tekilleştirilir.
+
+Poster görseli yoksa geometri, materyal renkleriyle basit bir ressam
+algoritmasıyla (painter's algorithm) PNG olarak çizilir. .usdz dosyaları
+yalnızca boyut/biçim kontrolünden geçer.
+
+Sonuç Product.model_3d_meta alanına yazılır:
+    {"source": "products/models/x.glb", "format": "glb", "valid": true,
+     "errors": [], "file_size": 812345, "vertices": 24000, "triangles": 40000,
+     "textures": 3, "max_texture_size": 4096, ...,
+     "lite": {"file_size": 210000, "max_texture_size": 1024, ...},
+     "poster": "products/model_posters/<sha256>.png"}
+"""
+import base64
+import hashlib
+import json
+import logging
+import math
+import struct
+import zipfile
+from collections import defaultdict
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageDraw, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+LITE_DIR = 'products/models/lite'
+POSTER_DIR = 'products/model_posters'
+LITE_TEXTURE_SIZE = 1024
+POSTER_SIZE = 800
+POSTER_MAX_TRIANGLES = 150_000
+
+GLB_MAGIC = b'glTF'
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+FLOAT, BYTE, UNSIGNED_SHORT = 5126, 5120, 5123
+COMPONENT_FORMATS = {5120: 'b', 5121: 'B', 5122: 'h', 5123: 'H', 5125: 'I', 5126: 'f'}
+# normalized=True tamsayı bileşenlerinin [-1, 1] / [0, 1] aralığına bölüneceği değer
+NORMALIZE_DIVISORS = {5120: 127, 5121: 255, 5122: 32767, 5123: 65535, 5125: 4294967295}
+TYPE_SIZES = {'SCALAR': 1, 'VEC2': 2, 'VEC3': 3, 'VEC4': 4, 'MAT2': 4, 'MAT3': 9, 'MAT4': 16}
+COLLECTIONS = (
+    'nodes', 'meshes', 'skins', 'cameras', 'accessors', 'materials',
+    'textures', 'images', 'samplers', 'bufferViews',
+)
+# Bu uzantılarla sıkıştırılmış veriyi çözemeyiz; hafif sürüm üretilmez
+COMPRESSION_EXTENSIONS = {'KHR_draco_mesh_compression', 'EXT_meshopt_compression'}
+
+
+class GLTFError(ValueError):
+    """Model dosyası okunamadı ya da işlenemedi."""
+
+
+# --- Okuma / yazma ---
+
+def _decode_data_uri(uri):
+    if not uri.startswith('data:') or ';base64,' not in uri:
+        return None
+    return base64.b64decode(uri.split(';base64,', 1)[1])
+
+
+def read_glb(data):
+    """GLB ikili dosyasını (JSON sözlüğü, BIN chunk baytları) olarak ayrıştırır."""
+    if len(data) < 20 or data[:4] != GLB_MAGIC:
+        raise GLTFError('Geçerli bir GLB dosyası değil.')
+    version, length = struct.unpack_from('<II', data, 4)
+    if version != 2:
+        raise GLTFError(f'Desteklenmeyen GLB sürümü: {version}')
+    if length > len(data):
+        raise GLTFError('GLB dosyası eksik (kesilmiş olabilir).')
+
+    document, binary, offset = None, b'', 12
+    while offset + 8 <= length:
+        chunk_length, chunk_type = struct.unpack_from('<II', data, offset)
+        chunk = data[offset + 8:offset + 8 + chunk_length]
+        if len(chunk) != chunk_length:
+            raise GLTFError('GLB chunk uzunluğu hatalı.')
+        if chunk_type == CHUNK_JSON and document is None:
+            document = chunk
+        elif chunk_type == CHUNK_BIN and not binary:
+            binary = bytes(chunk)
+        offset += 8 + chunk_length
+    if document is None:
+        raise GLTFError('GLB dosyasında JSON chunk yok.')
+    try:
+        return json.loads(document), binary
+    except (UnicodeDecodeError, ValueError):
+        raise GLTFError('GLB JSON chunk okunamadı.')
+
+
+def write_glb(gltf, views):
+    """Belgeyi ve bufferView baytlarını tek buffer'lı bir GLB dosyasına yazar."""
+    blob = bytearray()
+    for view, data in zip(gltf.get('bufferViews', []), views):
+        blob += b'\0' * (-len(blob) % 4)
+        view.update(buffer=0, byteOffset=len(blob), byteLength=len(data))
+        blob += data
+    blob += b'\0' * (-len(blob) % 4)
+    if blob:
+        gltf['buffers'] = [{'byteLength': len(blob)}]
+    else:
+        gltf.pop('buffers', None)
+
+    document = json.dumps(gltf, separators=(',', ':')).encode()
+    document += b' ' * (-len(document) % 4)
+    chunks = struct.pack('<II', len(document), CHUNK_JSON) + document
+    if blob:
+        chunks += struct.pack('<II', len(blob), CHUNK_BIN) + bytes(blob)
+    return GLB_MAGIC + struct.pack('<II', 2, 12 + len(chunks)) + chunks
+
+
+def load(data, name):
+    """
+    .glb/.gltf baytlarını (belge, bufferView baytları listesi) olarak yükler.
+    Her bufferView kendi baytlarını taşır; böylece buffer yerleşimi
+    yazarken sıfırdan kurulabilir. Harici (.bin) buffer'lar çözülemez.
+    """
+    if name.lower().endswith('.gltf'):
+        try:
+            gltf, binary = json.loads(data), b''
+        except (UnicodeDecodeError, ValueError):
+            raise GLTFError('glTF JSON okunamadı.')
+    else:
+        gltf, binary = read_glb(data)
+    if not isinstance(gltf, dict) or not str(gltf.get('asset', {}).get('version', '')).startswith('2.'):
+        raise GLTFError('Yalnızca glTF 2.x desteklenir.')
+
+    buffers = []
+    for index, buffer in enumerate(gltf.get('buffers', [])):
+        if 'uri' not in buffer:
+            buffers.append(binary if index == 0 else None)
+        else:
+            buffers.append(_decode_data_uri(buffer['uri']))
+
+    views = []
+    for index, view in enumerate(gltf.get('bufferViews', [])):
+        buffer_index = view.get('buffer', 0)
+        if buffer_index >= len(buffers):
+            raise GLTFError(f'bufferView {index}: buffer {buffer_index} yok.')
+        buffer = buffers[buffer_index]
+        if buffer is None:
+            raise GLTFError(f'Harici buffer dosyası çözümlenemedi: {gltf["buffers"][buffer_index].get("uri")}')
+        start = view.get('byteOffset', 0)
+        end = start + view.get('byteLength', 0)
+        if end > len(buffer):
+            raise GLTFError(f'bufferView {index} buffer sınırını aşıyor.')
+        views.append(buffer[start:end])
+    return gltf, views
+
+
+def _accessor_item(accessor):
+    return struct.Struct('<' + COMPONENT_FORMATS[accessor['componentType']] * TYPE_SIZES[accessor['type']])
+
+
+def read_accessor(gltf, views, index):
+    """Accessor'ı satır (tuple) listesi olarak okur; normalized tamsayıları float'a çevirir."""
+    accessor = gltf['accessors'][index]
+    item = _accessor_item(accessor)
+    count = accessor['count']
+    if 'bufferView' not in accessor:
+        return [(0,) * len(item.format[1:])] * count
+    view = gltf['bufferViews'][accessor['bufferView']]
+    data = views[accessor['bufferView']]
+    stride = view.get('byteStride') or item.size
+    offset = accessor.get('byteOffset', 0)
+    if stride == item.size:
+        rows = list(item.iter_unpack(data[offset:offset + count * stride]))
+    else:
+        rows = [item.unpack_from(data, offset + i * stride) for i in range(count)]
+    divisor = NORMALIZE_DIVISORS.get(accessor['componentType'])
+    if accessor.get('normalized') and divisor:
+        rows = [tuple(max(v / divisor, -1.0) for v in row) for row in rows]
+    return rows
+
+
+# --- İnceleme / doğrulama ---
+
+def _validate(gltf, views):
+    errors = []
+    counts = {kind: len(gltf.get(kind, [])) for kind in COLLECTIONS}
+    for holder, key, kind in _references(gltf):
+        value = holder[key]
+        if not isinstance(value, int) or not 0 <= value < counts[kind]:
+            errors.append(f'Geçersiz {kind} referansı: {value}')
+    for index, accessor in enumerate(gltf.get('accessors', [])):
+        if accessor.get('componentType') not in COMPONENT_FORMATS or accessor.get('type') not in TYPE_SIZES:
+            errors.append(f'accessor {index}: bilinmeyen bileşen tipi.')
+            continue
+        view_index = accessor.get('bufferView')
+        if not isinstance(view_index, int) or not 0 <= view_index < len(views) or not accessor.get('count'):
+            continue
+        item = _accessor_item(accessor)
+        stride = gltf['bufferViews'][view_index].get('byteStride') or item.size
+        end = accessor.get('byteOffset', 0) + (accessor['count'] - 1) * stride + item.size
+        if end > len(views[view_index]):
+            errors.append(f'accessor {index} bufferView sınırını aşıyor.')
+    return errors[:20]
+
+
+def _image_bytes(gltf, views, image):
+    if 'bufferView' in image:
+        return views[image['bufferView']]
+    return _decode_data_uri(image.get('uri', ''))
+
+
+def _complexity(gltf, views):
+    accessors = gltf.get('accessors', [])
+    vertices = triangles = primitives = 0
+    for mesh in gltf.get('meshes', []):
+        for primitive in mesh.get('primitives', []):
+            primitives += 1
+            count = accessors[primitive['attributes']['POSITION']]['count'] if 'POSITION' in primitive.get('attributes', {}) else 0
+            vertices += count
+            if 'indices' in primitive:
+                count = accessors[primitive['indices']]['count']
+            mode = primitive.get('mode', 4)
+            if mode == 4:
+                triangles += count // 3
+            elif mode in (5, 6):
+                triangles += max(count - 2, 0)
+
+    max_texture_size = 0
+    for image in gltf.get('images', []):
+        data = _image_bytes(gltf, views, image)
+        if not data:
+            continue
+        try:
+            max_texture_size = max(max_texture_size, *Image.open(BytesIO(data)).size)
+        except (UnidentifiedImageError, OSError):
+            pass
+
+    return {
+        'nodes': len(gltf.get('nodes', [])),
+        'meshes': len(gltf.get('meshes', [])),
+        'primitives': primitives,
+        'vertices': vertices,
+        'triangles': triangles,
+        'materials': len(gltf.get('materials', [])),
+        'textures': len(gltf.get('textures', [])),
+        'images': len(gltf.get('images', [])),
+        'max_texture_size': max_texture_size,
+    }
+
+
+def inspect(data, name):
+    """Dosyayı doğrular ve boyut/karmaşıklık bilgisini sözlük olarak döner."""
+    fmt = name.rsplit('.', 1)[-1].lower()
+    meta = {'format': fmt, 'file_size': len(data), 'valid': True, 'errors': []}
+    if fmt == 'usdz':
+        if not zipfile.is_zipfile(BytesIO(data)):
+            meta.update(valid=False, errors=['Geçerli bir USDZ (zip) dosyası değil.'])
+        return meta
+    try:
+        gltf, views = load(data, name)
+        errors = _validate(gltf, views)
+        if not errors:
+            meta.update(_complexity(gltf, views))
+    except (GLTFError, KeyError, TypeError, struct.error) as e:
+        errors = [str(e) if isinstance(e, GLTFError) else f'Model okunamadı: {e!r}']
+    meta.update(valid=not errors, errors=errors)
+    return meta
+
+
+# --- Referanslar ve sıkıştırma adımları ---
+
+def _each(items, kind):
+    for i in range(len(items)):
+        yield items, i, kind
+
+
+def _texture_infos(obj):
+    """Materyal içindeki {"index": n, ...} doku referansları (uzantılar dahil)."""
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if key.endswith('Texture') and isinstance(value, dict) and 'index' in value:
+                yield value
+            yield from _texture_infos(value)
+    elif isinstance(obj, list):
+        for value in obj:
+            yield from _texture_infos(value)
+
+
+def _references(gltf):
+    """Belgedeki tüm dizin referansları: (kapsayıcı, anahtar, koleksiyon) üçlüleri."""
+    for scene in gltf.get('scenes', []):
+        yield from _each(scene.get('nodes', []), 'nodes')
+    for node in gltf.get('nodes', []):
+        yield from _each(node.get('children', []), 'nodes')
+        for key, kind in (('mesh', 'meshes'), ('skin', 'skins'), ('camera', 'cameras')):
+            if key in node:
+                yield node, key, kind
+    for skin in gltf.get('skins', []):
+        yield from _each(skin.get('joints', []), 'nodes')
+        if 'skeleton' in skin:
+            yield skin, 'skeleton', 'nodes'
+        if 'inverseBindMatrices' in skin:
+            yield skin, 'inverseBindMatrices', 'accessors'
+    for mesh in gltf.get('meshes', []):
+        for primitive in mesh.get('primitives', []):
+            for semantic in primitive.get('attributes', {}):
+                yield primitive['attributes'], semantic, 'accessors'
+            for target in primitive.get('targets', []):
+                for semantic in target:
+                    yield target, semantic, 'accessors'
+            if 'indices' in primitive:
+                yield primitive, 'indices', 'accessors'
+            if 'material' in primitive:
+                yield primitive, 'material', 'materials'
+    for animation in gltf.get('animations', []):
+        for channel in animation.get('channels', []):
+            if 'node' in channel.get('target', {}):
+                yield channel['target'], 'node', 'nodes'
+        for sampler in animation.get('samplers', []):
+            yield sampler, 'input', 'accessors'
+            yield sampler, 'output', 'accessors'
+    for material in gltf.get('materials', []):
+        for info in _texture_infos(material):
+            yield info, 'index', 'textures'
+    for texture in gltf.get('textures', []):
+        if 'source' in texture:
+            yield texture, 'source', 'images'
+        if 'sampler' in texture:
+            yield texture, 'sampler', 'samplers'
+        for extension in texture.get('extensions', {}).values():
+            if isinstance(extension, dict) and 'source' in extension:
+                yield extension, 'source', 'images'
+    for image in gltf.get('images', []):
+        if 'bufferView' in image:
+            yield image, 'bufferView', 'bufferViews'
+    for accessor in gltf.get('accessors', []):
+        if 'bufferView' in accessor:
+            yield accessor, 'bufferView', 'bufferViews'
+        for part in ('indices', 'values'):
+            if part in accessor.get('sparse', {}):
+                yield accessor['sparse'][part], 'bufferView', 'bufferViews'
+
+
+def _prune_nodes(gltf):
+    """Sahneden erişilemeyen ya da hiçbir şey taşımayan yaprak düğümleri referanslardan çıkarır."""
+    nodes = gltf.get('nodes', [])
+    if not nodes or not gltf.get('scenes'):
+        return
+    skins = gltf.get('skins', [])
+    reachable, stack = set(), [n for scene in gltf['scenes'] for n in scene.get('nodes', [])]
+    while stack:
+        index = stack.pop()
+        if index in reachable:
+            continue
+        reachable.add(index)
+        stack.extend(nodes[index].get('children', []))
+        if 'skin' in nodes[index]:
+            skin = skins[nodes[index]['skin']]
+            stack.extend(skin.get('joints', []))
+            stack.extend([skin['skeleton']] if 'skeleton' in skin else [])
+
+    protected = {
+        channel['target']['node']
+        for animation in gltf.get('animations', [])
+        for channel in animation.get('channels', [])
+        if 'node' in channel.get('target', {})
+    }
+    for index in reachable:
+        if 'skin' in nodes[index]:
+            skin = skins[nodes[index]['skin']]
+            protected.update(skin.get('joints', []))
+            protected.update([skin['skeleton']] if 'skeleton' in skin else [])
+
+    changed = True
+    while changed:
+        changed = False
+        for index in list(reachable):
+            node = nodes[index]
+            if index in protected or any(key in node for key in ('mesh', 'camera', 'skin', 'extensions')):
+                continue
+            if not any(child in reachable for child in node.get('children', [])):
+                reachable.discard(index)
+                changed = True
+
+    for scene in gltf['scenes']:
+        scene['nodes'] = [n for n in scene.get('nodes', []) if n in reachable]
+    for node in nodes:
+        if 'children' in node:
+            node['children'] = [n for n in node['children'] if n in reachable]
+            if not node['children']:
+                del node['children']
+    for animation in gltf.get('animations', []):
+        animation['channels'] = [
+            channel for channel in animation.get('channels', [])
+            if channel.get('target', {}).get('node') in reachable or 'node' not in channel.get('target', {})
+        ]
+        used = sorted({channel['sampler'] for channel in animation['channels']})
+        mapping = {old: new for new, old in enumerate(used)}
+        animation['samplers'] = [animation['samplers'][i] for i in used]
+        for channel in animation['channels']:
+            channel['sampler'] = mapping[channel['sampler']]
+    animations = [animation for animation in gltf.pop('animations', []) if animation['channels']]
+    if animations:
+        gltf['animations'] = animations
+
+
+def _compact(gltf, views):
+    """Hiçbir yerden referans verilmeyen kayıtları siler ve dizinleri yeniden numaralar."""
+    while True:
+        refs = list(_references(gltf))
+        used = defaultdict(set)
+        for holder, key, kind in refs:
+            used[kind].add(holder[key])
+        if not gltf.get('scenes'):
+            used['nodes'] = set(range(len(gltf.get('nodes', []))))
+
+        mappings = {}
+        for kind in COLLECTIONS:
+            items = gltf.get(kind)
+            if not items or len(used[kind]) == len(items):
+                continue
+            keep = sorted(used[kind])
+            mappings[kind] = {old: new for new, old in enumerate(keep)}
+            if keep:
+                gltf[kind] = [items[i] for i in keep]
+            else:
+                del gltf[kind]
+            if kind == 'bufferViews':
+                views[:] = [views[i] for i in keep]
+        if not mappings:
+            return
+        for holder, key, kind in refs:
+            if kind in mappings:
+                holder[key] = mappings[kind][holder[key]]
+
+
+def _dedupe(gltf, views):
+    """Aynı baytları taşıyan bufferView'ları, sonra aynı tanımlı accessor'ları birleştirir."""
+    seen, canonical = {}, {}
+    for index, (view, data) in enumerate(zip(gltf.get('bufferViews', []), views)):
+        key = (hashlib.sha256(data).digest(), view.get('byteStride'), view.get('target'))
+        canonical[index] = seen.setdefault(key, index)
+    seen, accessor_canonical = {}, {}
+    for holder, key, kind in list(_references(gltf)):
+        if kind == 'bufferViews':
+            holder[key] = canonical[holder[key]]
+    for index, accessor in enumerate(gltf.get('accessors', [])):
+        accessor_canonical[index] = seen.setdefault(json.dumps(accessor, sort_keys=True), index)
+    for holder, key, kind in list(_references(gltf)):
+        if kind == 'accessors':
+            holder[key] = accessor_canonical[holder[key]]
+    _compact(gltf, views)
+
+
+def _add_view(gltf, views, data, **fields):
+    gltf.setdefault('bufferViews', []).append({'buffer': 0, 'byteLength': len(data), **fields})
+    views.append(data)
+    return len(views) - 1
+
+
+def _quantize(gltf, views):
+    """NORMAL/TANGENT -> normalized BYTE, [0, 1] TEXCOORD -> normalized UNSIGNED_SHORT."""
+    attribute_maps = {
+        id(primitive['attributes'])
+        for mesh in gltf.get('meshes', []) for primitive in mesh.get('primitives', [])
+    }
+    uses = defaultdict(set)
+    for holder, key, kind in _references(gltf):
+        if kind == 'accessors':
+            uses[holder[key]].add(key if id(holder) in attribute_maps else None)
+
+    quantized_normals = False
+    for index, semantics in uses.items():
+        semantic = next(iter(semantics)) if len(semantics) == 1 else None
+        accessor = gltf['accessors'][index]
+        if semantic is None or accessor['componentType'] != FLOAT or 'sparse' in accessor or 'bufferView' not in accessor:
+            continue
+        if (semantic, accessor['type']) in (('NORMAL', 'VEC3'), ('TANGENT', 'VEC4')):
+            rows = read_accessor(gltf, views, index)
+            # Vertex öznitelikleri 4 bayta hizalanmalı: VEC3 için bir bayt dolgu
+            item = struct.Struct('<bbbx' if accessor['type'] == 'VEC3' else '<bbbb')
+            data = b''.join(item.pack(*(round(max(-1.0, min(1.0, v)) * 127) for v in row)) for row in rows)
+            component_type = BYTE
+            quantized_normals = True
+        elif semantic.startswith('TEXCOORD_') and accessor['type'] == 'VEC2':
+            rows = read_accessor(gltf, views, index)
+            if not all(0.0 <= v <= 1.0 for row in rows for v in row):
+                continue
+            item = struct.Struct('<HH')
+            data = b''.join(item.pack(round(u * 65535), round(v * 65535)) for u, v in rows)
+            component_type = UNSIGNED_SHORT
+        else:
+            continue
+        view = _add_view(gltf, views, data, byteStride=item.size, target=34962)
+        accessor.update(bufferView=view, byteOffset=0, componentType=component_type, normalized=True)
+        accessor.pop('min', None)
+        accessor.pop('max', None)
+
+    if quantized_normals:
+        for key in ('extensionsUsed', 'extensionsRequired'):
+            extensions = gltf.setdefault(key, [])
+            if 'KHR_mesh_quantization' not in extensions:
+                extensions.append('KHR_mesh_quantization')
+
+
+def _downscale_textures(gltf, views, max_size):
+    """Gömülü dokuları max_size'a küçültür; data URI görselleri bufferView'a taşır."""
+    for image in gltf.get('images', []):
+        if 'uri' in image:
+            data = _decode_data_uri(image['uri'])
+            if data is None:
+                continue
+            mime_type = image['uri'][5:].split(';', 1)[0]
+            image.pop('uri')
+            image.update(bufferView=_add_view(gltf, views, data), mimeType=mime_type)
+        if 'bufferView' not in image:
+            continue
+        try:
+            texture = Image.open(BytesIO(views[image['bufferView']]))
+            fmt = texture.format
+            if max(texture.size) <= max_size or fmt not in ('PNG', 'JPEG', 'WEBP'):
+                continue
+            texture.thumbnail((max_size, max_size), Image.LANCZOS)
+        except (UnidentifiedImageError, OSError):
+            continue
+        buffer = BytesIO()
+        if fmt == 'JPEG':
+            texture.convert('RGB').save(buffer, fmt, quality=85, optimize=True)
+        elif fmt == 'WEBP':
+            texture.save(buffer, fmt, quality=85)
+        else:
+            texture.save(buffer, fmt, optimize=True)
+        views[image['bufferView']] = buffer.getvalue()
+
+
+def optimize(data, name, max_texture_size=LITE_TEXTURE_SIZE):
+    """Modelin budanmış, kuantize edilmiş ve dokuları küçültülmüş GLB sürümünü döner."""
+    gltf, views = load(data, name)
+    if COMPRESSION_EXTENSIONS & set(gltf.get('extensionsUsed', [])):
+        raise GLTFError('Model zaten sıkıştırılmış (Draco/meshopt); hafif sürüm üretilmedi.')
+    _prune_nodes(gltf)
+    _compact(gltf, views)
+    _quantize(gltf, views)
+    _downscale_textures(gltf, views, max_texture_size)
+    _dedupe(gltf, views)
+    return write_glb(gltf, views)
+
+
+# --- Poster ---
+
+def _matmul(a, b):
+    return [[sum(a[r][k] * b[k][c] for k in range(4)) for c in range(4)] for r in range(4)]
+
+
+def _node_matrix(node):
+    if 'matrix' in node:
+        m = node['matrix']  # sütun öncelikli (column-major)
+        return [[m[c * 4 + r] for c in range(4)] for r in range(4)]
+    tx, ty, tz = node.get('translation', (0, 0, 0))
+    x, y, z, w = node.get('rotation', (0, 0, 0, 1))
+    sx, sy, sz = node.get('scale', (1, 1, 1))
+    rotation = [
+        [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+        [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+    ]
+    return [
+        [rotation[0][0] * sx, rotation[0][1] * sy, rotation[0][2] * sz, tx],
+        [rotation[1][0] * sx, rotation[1][1] * sy, rotation[1][2] * sz, ty],
+        [rotation[2][0] * sx, rotation[2][1] * sy, rotation[2][2] * sz, tz],
+        [0, 0, 0, 1],
+    ]
+
+
+def _material_color(gltf, views, material_index, cache):
+    if material_index in cache:
+        return cache[material_index]
+    color = [1.0, 1.0, 1.0]
+    if material_index is not None:
+        pbr = gltf['materials'][material_index].get('pbrMetallicRoughness', {})
+        color = list(pbr.get('baseColorFactor', (1, 1, 1, 1))[:3])
+        if 'baseColorTexture' in pbr:
+            try:
+                texture = gltf['textures'][pbr['baseColorTexture']['index']]
+                data = _image_bytes(gltf, views, gltf['images'][texture['source']])
+                average = Image.open(BytesIO(data)).convert('RGB').resize((1, 1), Image.BOX).getpixel((0, 0))
+                color = [c * a / 255 for c, a in zip(color, average)]
+            except (KeyError, TypeError, UnidentifiedImageError, OSError):
+                pass
+    cache[material_index] = color
+    return color
+
+
+def _scene_triangles(gltf, views):
+    nodes = gltf.get('nodes', [])
+    scenes = gltf.get('scenes', [])
+    roots = scenes[gltf.get('scene', 0)].get('nodes', []) if scenes else range(len(nodes))
+    stack = [(index, [[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]) for index in roots]
+    triangles, colors = [], {}
+    while stack:
+        index, parent = stack.pop()
+        node = nodes[index]
+        world = _matmul(parent, _node_matrix(node))
+        stack.extend((child, world) for child in node.get('children', []))
+        if 'mesh' not in node:
+            continue
+        (a, b, c, d), (e, f, g, h), (i, j, k, l) = world[0], world[1], world[2]
+        for primitive in gltf['meshes'][node['mesh']].get('primitives', []):
+            if primitive.get('mode', 4) != 4 or 'POSITION' not in primitive.get('attributes', {}):
+                continue
+            points = [
+                (a * x + b * y + c * z + d, e * x + f * y + g * z + h, i * x + j * y + k * z + l)
+                for x, y, z in read_accessor(gltf, views, primitive['attributes']['POSITION'])
+            ]
+            if 'indices' in primitive:
+                indices = [row[0] for row in read_accessor(gltf, views, primitive['indices'])]
+            else:
+                indices = range(len(points))
+            color = _material_color(gltf, views, primitive.get('material'), colors)
+            for n in range(0, len(indices) - 2, 3):
+                triangles.append((points[indices[n]], points[indices[n + 1]], points[indices[n + 2]], color))
+    return triangles
+
+
+def render_poster(data, name, size=POSTER_SIZE):
+    """Modeli 3/4 açıdan, gölgelendirilmiş düz renklerle PNG olarak çizer; geometri yoksa None."""
+    gltf, views = load(data, name)
+    triangles = _scene_triangles(gltf, views)
+    if not triangles:
+        return None
+    if len(triangles) > POSTER_MAX_TRIANGLES:
+        triangles = triangles[::math.ceil(len(triangles) / POSTER_MAX_TRIANGLES)]
+
+    yaw, pitch = math.radians(35), math.radians(20)
+    cy, sy, cp, sp = math.cos(yaw), math.sin(yaw), math.cos(pitch), math.sin(pitch)
+
+    def view(point):
+        x, y, z = point
+        x, z = x * cy + z * sy, -x * sy + z * cy
+        return x, y * cp - z * sp, y * sp + z * cp
+
+    light = (0.3, 0.6, 0.75)
+    faces = []
+    for p0, p1, p2, color in triangles:
+        a, b, c = view(p0), view(p1), view(p2)
+        u = (b[0] - a[0], b[1] - a[1], b[2] - a[2])
+        v = (c[0] - a[0], c[1] - a[1], c[2] - a[2])
+        normal = (u[1] * v[2] - u[2] * v[1], u[2] * v[0] - u[0] * v[2], u[0] * v[1] - u[1] * v[0])
+        length = math.sqrt(sum(n * n for n in normal)) or 1.0
+        # Sarım yönü güvenilmez olabilir: çift yüzlü Lambert
+        shade = 0.35 + 0.65 * abs(sum(n * l for n, l in zip(normal, light))) / length
+        faces.append(((a[2] + b[2] + c[2]) / 3, (a, b, c), tuple(round(255 * min(ch * shade, 1.0)) for ch in color)))
+
+    xs = [p[0] for _, points, _ in faces for p in points]
+    ys = [p[1] for _, points, _ in faces for p in points]
+    span = max(max(xs) - min(xs), max(ys) - min(ys)) or 1.0
+    # 2x çizip küçülterek kenar yumuşatma
+    canvas = size * 2
+    scale = canvas * 0.85 / span
+    cx, cy_ = (max(xs) + min(xs)) / 2, (max(ys) + min(ys)) / 2
+
+    image = Image.new('RGBA', (canvas, canvas), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    for _, points, color in sorted(faces, key=lambda face: face[0]):
+        polygon = [(canvas / 2 + (x - cx) * scale, canvas / 2 - (y - cy_) * scale) for x, y, _ in points]
+        draw.polygon(polygon, fill=color + (255,))
+    buffer = BytesIO()
+    image.resize((size, size), Image.LANCZOS).save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+
+# --- Ürün düzeyi işleme: process_3d_models komutu ---
+
+def _save(storage, directory, data, extension):
+    name = f'{directory}/{hashlib.sha256(data).hexdigest()[:16]}.{extension}'
+    if not storage.exists(name):
+        storage.save(name, ContentFile(data))
+    return name
+
+
+def process_product(product):
+    """
+    Ürünün 3D modelini inceler; hafif GLB ve (poster yoksa ya da önceki otomatik
+    posterse) poster üretir. Product üzerinde güncellenecek alanları döner.
+    """
+    previous = product.model_3d_meta or {}
+    auto_poster = not product.model_3d_poster or product.model_3d_poster.name == previous.get('poster')
+    updates = {'model_3d_meta': {}, 'model_3d_lite': ''}
+    if auto_poster and product.model_3d_poster:
+        # Eski modelden çizilmiş poster yenisiyle değiştirilir ya da kaldırılır
+        updates['model_3d_poster'] = ''
+    name = product.model_3d.name if product.model_3d else ''
+    if not name:
+        return updates
+
+    storage = product.model_3d.storage
+    with storage.open(name, 'rb') as fh:
+        data = fh.read()
+    meta = updates['model_3d_meta'] = {'source': name, **inspect(data, name)}
+    if not meta['valid'] or meta['format'] == 'usdz':
+        return updates
+
+    try:
+        lite = optimize(data, name)
+        updates['model_3d_lite'] = _save(storage, LITE_DIR, lite, 'glb')
+        meta['lite'] = {key: value for key, value in inspect(lite, 'lite.glb').items() if key not in ('valid', 'errors')}
+    except (GLTFError, KeyError, TypeError, struct.error) as e:
+        logger.warning('3D model optimization failed for %s: %s', name, e)
+        meta['errors'].append(str(e))
+
+    if auto_poster:
+        try:
+            poster = render_poster(data, name)
+        except (GLTFError, KeyError, TypeError, IndexError, struct.error) as e:
+            logger.warning('Poster rendering failed for %s: %s', name, e)
+            poster = None
+        if poster:
+            updates['model_3d_poster'] = meta['poster'] = _save(storage, POSTER_DIR, poster, 'png')
+    return updates
@@ -0,0 +1,137 @@
+"""
+İstek dili: Accept-Language bir kez (middleware'de) çözülür, katalog
+sorguları da yalnızca o dilin ad/açıklama kolonlarını taşır.
+
+  * LanguageNegotiationMiddleware başlığı q-değerlerine göre sıralar,
+    CATALOG_LANGUAGES (varsayılan tr/en/de) dışındakileri atlar ve sonucu
+    request.catalog_language'a yazar.
+  * localized() display_name / display_description'ı SQL'de
+    (dil -> en -> tr sırasıyla ilk dolu değer) hesaplar ve yanıtta yer
+    almayan çeviri kolonlarını defer eder.
+"""
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.models import F, TextField, Value
+from django.db.models.functions import Coalesce, NullIf
+
+LANGUAGES = ('tr', 'en', 'de')
+DEFAULT_LANGUAGE = 'en'
+# Çevirisi <alan>_<dil> kolonlarında tutulan alanlar -> serializer'daki karşılığı
+TRANSLATED_FIELDS = {'name': 'display_name', 'description': 'display_description'}
+# Dolu çeviri yoksa bakılan diller (eski davranış: name_en, sonra name_tr)
+FALLBACK_LANGUAGES = ('en', 'tr')
+
+
+def supported_languages():
+    return tuple(getattr(settings, 'CATALOG_LANGUAGES', LANGUAGES))
+
+
+def default_language():
+    return getattr(settings, 'CATALOG_DEFAULT_LANGUAGE', DEFAULT_LANGUAGE)
+
+
+@lru_cache(maxsize=512)
+def _negotiate(header, supported, default):
+    choices = []
+    for index, part in enumerate(header.split(',')):
+        tag, _, params = part.partition(';')
+        tag = tag.strip().lower()
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if tag and quality > 0:
+            # Eşit q-değerinde başlıktaki sıra korunur
+            choices.append((-quality, index, tag))
+    for _, _, tag in sorted(choices):
+        if tag == '*':
+            return default
+        base = tag.split('-')[0]
+        if base in supported:
+            return base
+    return default
+
+
+def negotiate_language(header):
+    """'de-CH;q=0.5, tr, en;q=0.8' -> 'tr'. Desteklenen dil yoksa varsayılan dil."""
+    return _negotiate(header or '', supported_languages(), default_language())
+
+
+def request_language(request):
+    lang = getattr(request, 'catalog_language', None)
+    if lang is None:
+        # Middleware'den geçmemiş istekler (RequestFactory, komutlar)
+        lang = negotiate_language(request.headers.get('Accept-Language', ''))
+    return lang
+
+
+class LanguageNegotiationMiddleware:
+    # ASGI altında async view'lar iş parçacığına geçmeden çalışsın diye iki kip de desteklenir
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.catalog_language = negotiate_language(request.headers.get('Accept-Language', ''))
+        response = self.get_response(request)
+        response.headers.setdefault('Content-Language', request.catalog_language)
+        return response
+
+    async def __acall__(self, request):
+        request.catalog_language = negotiate_language(request.headers.get('Accept-Language', ''))
+        response = await self.get_response(request)
+        response.headers.setdefault('Content-Language', request.catalog_language)
+        return response
+
+
+def localized_expression(base, lang):
+    columns = [f'{base}_{code}' for code in (lang, *FALLBACK_LANGUAGES)]
+    columns = list(dict.fromkeys(columns))
+    # Son kolon boş olsa da döner (getattr(...) or ... zinciriyle aynı)
+    return Coalesce(
+        *[NullIf(F(column), Value('')) for column in columns[:-1]], F(columns[-1]), output_field=TextField(),
+    )
+
+
+def localized(queryset, lang, fields):
+    """
+    fields'taki display_* alanlarını localized_<alan> olarak annotate eder;
+    fields'ta adıyla geçmeyen çeviri kolonlarını (name_de, description_tr...) defer eder.
+    """
+    model_fields = {field.name for field in queryset.model._meta.get_fields()}
+    annotations, deferred = {}, []
+    for base, display in TRANSLATED_FIELDS.items():
+        if f'{base}_{FALLBACK_LANGUAGES[-1]}' not in model_fields:
+            continue
+        if display in fields:
+            annotations[f'localized_{base}'] = localized_expression(base, lang)
+        deferred += [
+            f'{base}_{code}' for code in LANGUAGES
+            if f'{base}_{code}' in model_fields and f'{base}_{code}' not in fields
+        ]
+    return queryset.annotate(**annotations).defer(*deferred)
+
+
+def translated(obj, base, request):
+    """Nesnenin istek dilindeki değeri; localized() ile gelmişse SQL'de hesaplanan kullanılır."""
+    value = getattr(obj, f'localized_{base}', None)
+    if value is not None:
+        return value
+    lang = request_language(request) if request is not None else DEFAULT_LANGUAGE
+    for code in (lang, *FALLBACK_LANGUAGES[:-1]):
+        value = getattr(obj, f'{base}_{code}', None)
+        if value:
+            return value
+    return getattr(obj, f'{base}_{FALLBACK_LANGUAGES[-1]}', None)
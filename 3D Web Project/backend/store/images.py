@@ -0,0 +1,125 @@
+"""
+Ürün görselleri için türev (derivative) üretimi.
+
+Yüklenen görselden VARIANT_WIDTHS genişliklerinde WebP, (Pillow destekliyorsa)
+AVIF ve JPEG yedek sürümler üretilir. Dosya adları içerik özetinden türetilir
+(products/derivatives/<sha256>-<genişlik>w.<uzantı>); aynı çıktı iki kez
+yazılmaz ve adı değişmeyen dosya sonsuza kadar önbelleklenebilir.
+
+Üretilen yollar modeldeki JSON alanında tutulur:
+    {"source": "products/thumbnails/x.png",
+     "widths": {"200": {"webp": "...", "avif": "...", "jpeg": "..."}, ...}}
+"""
+import hashlib
+import logging
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (200, 400, 800)
+DERIVATIVE_DIR = 'products/derivatives'
+
+
+def _avif_supported():
+    try:
+        return features.check_module('avif')
+    except ValueError:
+        return False
+
+
+# (format, uzantı, kayıt seçenekleri) — srcset'te tarayıcı ilk desteklediğini seçer
+FORMATS = [('webp', 'WEBP', {'quality': 80, 'method': 6})]
+if _avif_supported():
+    FORMATS.insert(0, ('avif', 'AVIF', {'quality': 55}))
+FORMATS.append(('jpeg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}))
+
+
+def _encode(image, fmt, options):
+    if fmt == 'JPEG' and image.mode != 'RGB':
+        # JPEG saydamlık desteklemez: beyaz zemine oturt
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def build_variants(source_name, storage=None):
+    """Kaynak görselin tüm türevlerini üretip kaydeder; JSON alanına yazılacak sözlüğü döner."""
+    storage = storage or default_storage
+    with storage.open(source_name, 'rb') as fh:
+        original = Image.open(fh)
+        original = ImageOps.exif_transpose(original)
+        original = original.convert('RGBA' if 'A' in original.getbands() or original.mode == 'P' else 'RGB')
+
+    widths = [w for w in VARIANT_WIDTHS if w <= original.width] or [original.width]
+    variants = {}
+    for width in widths:
+        height = max(round(original.height * width / original.width), 1)
+        resized = original.resize((width, height), Image.LANCZOS) if width != original.width else original
+        files = {}
+        for key, fmt, options in FORMATS:
+            data = _encode(resized, fmt, options)
+            digest = hashlib.sha256(data).hexdigest()[:16]
+            name = f'{DERIVATIVE_DIR}/{digest}-{width}w.{key}'
+            if not storage.exists(name):
+                storage.save(name, ContentFile(data))
+            files[key] = name
+        variants[str(width)] = files
+    return {'source': source_name, 'widths': variants}
+
+
+def derivatives_for(file_field, current):
+    """
+    Dosya değiştiyse türevleri yeniden üretir; değişmediyse None döner.
+    Bozuk/okunamayan görselde yalnızca kaynak adı kaydedilir (her kayıtta tekrar denenmesin).
+    """
+    name = file_field.name if file_field else ''
+    if (current or {}).get('source') == name:
+        return None
+    if not name:
+        return {}
+    try:
+        return build_variants(name, file_field.storage)
+    except (UnidentifiedImageError, OSError, ValueError) as e:
+        logger.warning('Derivative generation failed for %s: %s', name, e)
+        return {'source': name, 'widths': {}}
+
+
+def srcset(variants, request=None):
+    """{'avif': 'url 200w, url 400w', 'webp': ..., 'jpeg': ...} — <picture><source srcset> için."""
+    widths = sorted((variants or {}).get('widths', {}).items(), key=lambda item: int(item[0]))
+    result = {}
+    for key, _, _ in FORMATS:
+        entries = []
+        for width, files in widths:
+            if key in files:
+                url = default_storage.url(files[key])
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                entries.append(f'{url} {width}w')
+        if entries:
+            result[key] = ', '.join(entries)
+    return result
+
+
+# --- Toplu (process pool) üretim: generate_image_derivatives komutu ---
+
+def init_worker():
+    import django
+    django.setup()
+
+
+def render_job(job):
+    """(model etiketi, pk, kaynak adı) -> (model etiketi, pk, türevler). Alt süreçte çalışır."""
+    label, pk, source_name = job
+    try:
+        return label, pk, build_variants(source_name)
+    except (UnidentifiedImageError, OSError, ValueError) as e:
+        logger.warning('Derivative generation failed for %s: %s', source_name, e)
+        return label, pk, {'source': source_name, 'widths': {}}
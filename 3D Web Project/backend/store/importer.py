@@ -0,0 +1,302 @@
+"""
+Toplu ürün içe aktarma (manage.py import_products).
+
+Girdi satır satır okunur, dosyanın tamamı belleğe alınmaz:
+
+  * JSON Lines (.jsonl / .ndjson): her satır bir ürün; alanlar
+    fixtures/sample_products.json'daki ürün nesneleriyle aynıdır (sizes /
+    colors listeleri dahil).
+  * CSV: her satır bir ürün; sizes "36:15;37:20:79.90" (beden:stok[:fiyat]),
+    colors "Siyah:#000000;Beyaz:#ffffff" biçimindedir.
+
+Kategoriler baştan tek sorguyla slug -> id haritasına okunur; bilinmeyen
+kategorili satırlar hata sayılır. Satırlar batch_size'lık gruplar halinde,
+her grup kendi transaction'ında yazılır: ürünler slug, bedenler (ürün,
+beden), renkler (ürün, ad) üzerinden bulk_create(update_conflicts=True) ile
+eklenir ya da güncellenir. Beslemede olmayan beden/renkler silinmez;
+name_de / description_de yalnızca satırda varsa güncellenir, thumbnail
+yalnızca yeni ürüne yazılır (admin'den yüklenen görsel ezilmez).
+
+bulk_create sinyal göndermez: her grupta net fiyatlar (kampanyalar dahil),
+SQLite arama indeksi ve facet indeksi açıkça yenilenir.
+"""
+import csv
+import json
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from .cache import bump_catalog_version
+from .facets import sync_product_facets
+from .models import CENTS, Category, Product, ProductColor, ProductSize
+from .search import sync_search_index
+
+FORMATS = ('jsonl', 'csv')
+# Beslemenin her zaman belirlediği alanlar; çakışmada üzerine yazılır
+PRODUCT_FIELDS = (
+    'name_tr', 'name_en', 'description_tr', 'description_en', 'price', 'currency', 'category_id',
+    'is_visible', 'is_available', 'low_stock_warning',
+)
+# Yalnızca satırda varsa yazılır (beslemede yoksa admin'deki değer korunur)
+OPTIONAL_FIELDS = ('name_de', 'description_de', 'thumbnail')
+TRUTHY = ('1', 'true', 'yes', 'evet')
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = self.created = self.updated = self.sizes = self.colors = 0
+        self.errors = []  # (satır no, mesaj)
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def detect_format(path):
+    if path.endswith('.csv'):
+        return 'csv'
+    return 'jsonl'
+
+
+def read_jsonl(stream):
+    """(satır no, nesne ya da ImportRowError) çiftleri."""
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, ImportRowError(f'JSON hatası: {exc.msg}')
+
+
+def read_csv(stream):
+    reader = csv.DictReader(stream)
+    for row in reader:
+        try:
+            row['sizes'] = _split_pairs(row.get('sizes'), ('size_value', 'stock', 'price_override'))
+            row['colors'] = _split_pairs(row.get('colors'), ('name', 'hex_code'))
+        except ImportRowError as exc:
+            yield reader.line_num, exc
+            continue
+        # Boş hücre: alan beslemede yok sayılır
+        yield reader.line_num, {key: value for key, value in row.items() if value not in ('', None)}
+
+
+def _split_pairs(raw, names):
+    items = []
+    for part in (raw or '').split(';'):
+        if not part.strip():
+            continue
+        values = [value.strip() for value in part.split(':')]
+        if len(values) > len(names):
+            raise ImportRowError(f'Geçersiz değer: {part}')
+        items.append({name: value for name, value in zip(names, values) if value != ''})
+    return items
+
+
+def _decimal(value, label):
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise ImportRowError(f'Geçersiz {label}: {value}')
+    if not number.is_finite() or number < 0:
+        raise ImportRowError(f'Geçersiz {label}: {value}')
+    return number.quantize(CENTS)
+
+
+def _bool(value, default=True):
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUTHY
+
+
+def _int(value, label, default=0):
+    if value is None:
+        return default
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise ImportRowError(f'Geçersiz {label}: {value}')
+
+
+def _check_length(model, name, value):
+    max_length = model._meta.get_field(name).max_length
+    if max_length and value and len(value) > max_length:
+        raise ImportRowError(f'{name} en fazla {max_length} karakter olabilir')
+    return value
+
+
+def parse_product(data, categories):
+    """Ham satırı {alan: değer, 'sizes': [...], 'colors': [...]} biçimine çevirir."""
+    if not isinstance(data, dict):
+        raise ImportRowError('Satır bir nesne olmalı')
+    slug = str(data.get('slug') or '').strip()
+    if not slug:
+        raise ImportRowError('slug zorunlu')
+    category_slug = data.get('category_slug')
+    if category_slug not in categories:
+        raise ImportRowError(f'Kategori bulunamadı: {category_slug}')
+    if data.get('price') in (None, ''):
+        raise ImportRowError('price zorunlu')
+
+    product = {
+        'slug': _check_length(Product, 'slug', slug),
+        'name_tr': _check_length(Product, 'name_tr', str(data.get('name_tr', ''))),
+        'name_en': _check_length(Product, 'name_en', str(data.get('name_en', ''))),
+        'description_tr': str(data.get('description_tr', '')),
+        'description_en': str(data.get('description_en', '')),
+        'price': _decimal(data['price'], 'fiyat'),
+        'currency': _check_length(Product, 'currency', str(data.get('currency') or 'EUR')),
+        'category_id': categories[category_slug],
+        'is_visible': _bool(data.get('is_visible')),
+        'is_available': _bool(data.get('is_available')),
+        'low_stock_warning': _int(data.get('low_stock_warning'), 'low_stock_warning', 5),
+    }
+    if data.get('name_de') is not None:
+        product['name_de'] = _check_length(Product, 'name_de', str(data['name_de']))
+    if data.get('description_de') is not None:
+        product['description_de'] = str(data['description_de'])
+    if data.get('thumbnail'):
+        thumbnail = str(data['thumbnail'])
+        product['thumbnail'] = thumbnail if '/' in thumbnail else f'products/thumbnails/{thumbnail}'
+
+    sizes = {}
+    for size in data.get('sizes') or ():
+        try:
+            size_value = float(size['size_value'])
+        except (KeyError, TypeError, ValueError):
+            raise ImportRowError(f'Geçersiz beden: {size}')
+        override = size.get('price_override')
+        sizes[size_value] = {
+            'stock': max(_int(size.get('stock'), 'stok'), 0),
+            'price_override': _decimal(override, 'beden fiyatı') if override not in (None, '') else None,
+        }
+    colors = {}
+    for color in data.get('colors') or ():
+        if not isinstance(color, dict):
+            raise ImportRowError(f'Geçersiz renk: {color}')
+        name = str(color.get('name') or '').strip()
+        if not name:
+            raise ImportRowError(f'Renk adı zorunlu: {color}')
+        colors[_check_length(ProductColor, 'name', name)] = _check_length(
+            ProductColor, 'hex_code', str(color.get('hex_code') or '#000000'),
+        )
+    product['sizes'], product['colors'] = sizes, colors
+    return product
+
+
+def write_batch(products):
+    """
+    {slug: ayrıştırılmış ürün} grubunu yazar (çağıran transaction açar);
+    (yeni ürün sayısı, beden sayısı, renk sayısı) döner.
+    """
+    slugs = list(products)
+    existing = set(Product.objects.filter(slug__in=slugs).values_list('slug', flat=True))
+
+    # Aynı isteğe bağlı alanları taşıyan satırlar aynı update_fields ile yazılır
+    groups = {}
+    for data in products.values():
+        optional = tuple(name for name in OPTIONAL_FIELDS if name in data)
+        groups.setdefault(optional, []).append(data)
+    for optional, rows in groups.items():
+        Product.objects.bulk_create(
+            [
+                Product(slug=data['slug'], **{name: data[name] for name in (*PRODUCT_FIELDS, *optional)})
+                for data in rows
+            ],
+            update_conflicts=True, unique_fields=['slug'],
+            update_fields=[*PRODUCT_FIELDS, *(name for name in optional if name != 'thumbnail'), 'updated_at'],
+        )
+    ids = dict(Product.objects.filter(slug__in=slugs).values_list('slug', 'pk'))
+
+    now = timezone.now()
+    sizes = [
+        ProductSize(
+            product_id=ids[slug], size_value=size_value, stock=size['stock'], price_override=size['price_override'],
+            # Kampanyasız net fiyat; kampanyalı bedenler aşağıda yeniden hesaplanır
+            effective_price=size['price_override'] or data['price'], updated_at=now,
+        )
+        for slug, data in products.items() for size_value, size in data['sizes'].items()
+    ]
+    ProductSize.objects.bulk_create(
+        sizes, update_conflicts=True, unique_fields=['product', 'size_value'],
+        update_fields=['stock', 'price_override', 'updated_at'],
+    )
+    colors = [
+        ProductColor(product_id=ids[slug], name=name, hex_code=hex_code, updated_at=now)
+        for slug, data in products.items() for name, hex_code in data['colors'].items()
+    ]
+    ProductColor.objects.bulk_create(
+        colors, update_conflicts=True, unique_fields=['product', 'name'], update_fields=['hex_code', 'updated_at'],
+    )
+
+    product_ids = list(ids.values())
+    # Yeni ürünlerin bedenleri kampanyasız; kampanya / fiyat değişikliği yalnızca var olanlarda olabilir
+    ProductSize.objects.filter(product_id__in=[ids[slug] for slug in existing]).refresh_effective_prices()
+    sync_search_index(product_ids)
+    sync_product_facets(product_ids)
+    return len(slugs) - len(existing), len(sizes), len(colors)
+
+
+def import_products(records, batch_size=1000, dry_run=False, progress=None):
+    """
+    records: (satır no, ham satır) çiftleri (read_jsonl / read_csv). dry_run
+    her grubu yazıp transaction'ı geri alır. progress(report) her gruptan
+    sonra çağrılır. ImportReport döner.
+    """
+    report = ImportReport()
+    categories = dict(Category.objects.values_list('slug', 'pk'))
+    batch, first_line = {}, None
+
+    def flush():
+        try:
+            with transaction.atomic():
+                created, sizes, colors = write_batch(batch)
+                if dry_run:
+                    transaction.set_rollback(True)
+        except DatabaseError as exc:
+            report.errors.append((first_line, f'{len(batch)} satırlık grup yazılamadı: {exc}'))
+        else:
+            report.created += created
+            report.updated += len(batch) - created
+            report.sizes += sizes
+            report.colors += colors
+        if progress:
+            progress(report)
+
+    for line_no, data in records:
+        report.rows += 1
+        try:
+            if isinstance(data, ImportRowError):
+                raise data
+            product = parse_product(data, categories)
+        except ImportRowError as exc:
+            report.errors.append((line_no, str(exc)))
+            continue
+        if first_line is None:
+            first_line = line_no
+        # Aynı slug grupta iki kez olursa sonuncusu geçerli (ON CONFLICT aynı satırı iki kez güncelleyemez)
+        batch.pop(product['slug'], None)
+        batch[product['slug']] = product
+        if len(batch) >= batch_size:
+            flush()
+            batch, first_line = {}, None
+    if batch:
+        flush()
+
+    if not dry_run and report.created + report.updated:
+        bump_catalog_version()
+    return report
@@ -0,0 +1,110 @@
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from store.models import Category, Order, OrderItem, Product, ProductColor, ProductImage, ProductSize
+from store.renderers import FastJSONRenderer, orjson
+from store.views import OrderViewSet, ProductListView
+
+RENDERERS = [('json', JSONRenderer), ('orjson', FastJSONRenderer)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Ürün ve sipariş listesinde ModelSerializer / düz (values()) serileştirme ile '
+        'stdlib json / orjson renderer kombinasyonlarının istek/saniye değerini ölçer'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=500, help='Sentetik ürün sayısı')
+        parser.add_argument('--orders', type=int, default=200, help='Sentetik sipariş sayısı')
+        parser.add_argument('--repeat', type=int, default=30, help='Kombinasyon başına tekrar')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson kurulu değil; FastJSONRenderer stdlib yoluna düşecek.'))
+        with transaction.atomic():
+            user = self.seed(options['products'], options['orders'])
+            endpoints = [
+                ('ürün listesi', ProductListView, {}, '/api/store/products/', None),
+                ('sipariş listesi', OrderViewSet, {'actions': {'get': 'list'}}, '/api/store/orders/', user),
+            ]
+            for label, view_class, actions, url, auth_user in endpoints:
+                self.stdout.write(label)
+                baseline = None
+                for plain in (False, True):
+                    for renderer_name, renderer in RENDERERS:
+                        view = view_class.as_view(**actions, renderer_classes=[renderer])
+                        with override_settings(API_PLAIN_SERIALIZERS=plain):
+                            p50, size = self.measure(view, url, auth_user, options['repeat'], f'{plain}-{renderer_name}')
+                        baseline = baseline or p50
+                        serializer = 'düz' if plain else 'serializer'
+                        self.stdout.write(
+                            f'  {serializer:10} + {renderer_name:6} {size / 1024:7.1f} KB  p50={p50:7.2f}ms  '
+                            f'{1000 / p50:7.0f} istek/s  x{baseline / p50:.2f}'
+                        )
+            transaction.set_rollback(True)
+
+    def seed(self, product_count, order_count):
+        rng = random.Random(42)
+        category = Category.objects.create(name_tr='Benchmark', name_en='Benchmark', slug='benchmark-json')
+        products = Product.objects.bulk_create([
+            Product(
+                slug=f'benchmark-json-{i}', name_tr=f'Ürün {i}', name_en=f'Product {i}', name_de=f'Produkt {i}',
+                description_tr='Açıklama', description_en='Description', price=rng.randint(20, 300),
+                category=category, thumbnail='products/thumbnails/benchmark.png',
+            )
+            for i in range(product_count)
+        ], batch_size=1000)
+        ProductSize.objects.bulk_create([
+            ProductSize(product=product, size_value=36 + n, stock=rng.randint(0, 20), effective_price=product.price)
+            for product in products for n in range(6)
+        ], batch_size=5000)
+        ProductColor.objects.bulk_create([
+            ProductColor(product=product, name=name, hex_code=hex_code)
+            for product in products for name, hex_code in (('Siyah', '#000000'), ('Beyaz', '#ffffff'))
+        ], batch_size=5000)
+        ProductImage.objects.bulk_create([
+            ProductImage(product=product, image=f'products/gallery/benchmark-{n}.png', order=n)
+            for product in products for n in range(3)
+        ], batch_size=5000)
+
+        user = get_user_model().objects.create_user(
+            username='benchmark-json@example.com', email='benchmark-json@example.com', password='benchmark',
+        )
+        orders = Order.objects.bulk_create([
+            Order(user=user, status='paid', total=rng.randint(50, 900)) for _ in range(order_count)
+        ])
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order, product=product, product_name=product.name_en, size_value=40,
+                price=product.price, quantity=rng.randint(1, 3),
+            )
+            for order in orders for product in rng.sample(products, min(3, len(products)))
+        ], batch_size=5000)
+        return user
+
+    @staticmethod
+    def measure(view, url, user, repeat, tag):
+        host = next((h for h in settings.ALLOWED_HOSTS if h != '*' and not h.startswith('.')), 'localhost')
+        factory = APIRequestFactory(HTTP_HOST=host)
+        timings, size = [], 0
+        for i in range(repeat):
+            # Benzersiz parametre: katalog önbelleği ve ETag devre dışı kalsın
+            request = factory.get(url, {'bench': f'{tag}-{i}'})
+            if user is not None:
+                force_authenticate(request, user=user)
+            started = time.perf_counter()
+            response = view(request)
+            response.render()
+            timings.append((time.perf_counter() - started) * 1000)
+            size = len(response.content)
+        return statistics.median(timings), size
@@ -0,0 +1,89 @@
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from store.facets import rebuild_product_facets
+from store.models import Category, Product, ProductColor, ProductImage, ProductSize
+from store.views import ProductListView
+
+SCENARIOS = [
+    ('tam liste', {}),
+    ('kart', {'view': 'card'}),
+    ('kart + galeri', {'view': 'card', 'expand': 'images'}),
+    ('yalnızca id/ad', {'view': 'card', 'fields': 'id,display_name,min_price'}),
+    ('beden+renk+stok', {'view': 'card', 'size': '40', 'color': 'Mavi', 'in_stock': '1'}),
+    ('facet sayıları', {'view': 'card', 'facets': '1'}),
+    ('süzgeç + facet', {'view': 'card', 'size': '40', 'in_stock': '1', 'facets': '1'}),
+]
+
+
+class Command(BaseCommand):
+    help = 'Ürün listesi yanıt boyutunu ve süresini tam gösterim / kart (?view=card, ?fields=) için ölçer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=2000, help='Sentetik ürün sayısı')
+        parser.add_argument('--repeat', type=int, default=30, help='Senaryo başına tekrar')
+        parser.add_argument('--keep', action='store_true', help='Sentetik verileri silme')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['products'])
+            for label, params in SCENARIOS:
+                size, queries, p50, p95 = self.measure(params, options['repeat'])
+                self.stdout.write(
+                    f'{label:16} {size / 1024:8.1f} KB  {queries:3d} sorgu  p50={p50:7.1f}ms p95={p95:7.1f}ms'
+                )
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def seed(self, count):
+        rng = random.Random(42)
+        started = time.perf_counter()
+        category = Category.objects.create(name_tr='Benchmark', name_en='Benchmark', slug='benchmark-list')
+        products = Product.objects.bulk_create([
+            Product(
+                slug=f'benchmark-list-{i}', name_tr=f'Ürün {i}', name_en=f'Product {i}', name_de=f'Produkt {i}',
+                description_tr='Açıklama', description_en='Description', price=rng.randint(20, 300),
+                category=category, thumbnail='products/thumbnails/benchmark.png',
+                model_3d='products/models/benchmark.glb' if i % 3 == 0 else None,
+            )
+            for i in range(count)
+        ], batch_size=1000)
+        ProductSize.objects.bulk_create([
+            ProductSize(product=product, size_value=36 + n, stock=rng.randint(0, 20), effective_price=product.price)
+            for product in products for n in range(6)
+        ], batch_size=5000)
+        ProductColor.objects.bulk_create([
+            ProductColor(product=product, name=name, hex_code=hex_code)
+            for product in products for name, hex_code in (('Siyah', '#000000'), ('Beyaz', '#ffffff'), ('Mavi', '#0000ff'))
+        ], batch_size=5000)
+        ProductImage.objects.bulk_create([
+            ProductImage(product=product, image=f'products/gallery/benchmark-{n}.png', order=n)
+            for product in products for n in range(4)
+        ], batch_size=5000)
+        # bulk_create sinyal göndermez
+        rebuild_product_facets()
+        self.stdout.write(f'{count} ürün {time.perf_counter() - started:.1f}s içinde oluşturuldu ({connection.vendor})')
+
+    @staticmethod
+    def measure(params, repeat):
+        host = next((h for h in settings.ALLOWED_HOSTS if h != '*' and not h.startswith('.')), 'localhost')
+        factory = RequestFactory(HTTP_HOST=host)
+        view = ProductListView.as_view()
+        timings, size, queries = [], 0, 0
+        for i in range(repeat):
+            # Benzersiz parametre: katalog önbelleği ve ETag devre dışı kalsın
+            request = factory.get('/api/store/products/', {**params, 'bench': i})
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = view(request)
+                response.render()
+                timings.append((time.perf_counter() - started) * 1000)
+            size, queries = len(response.content), len(ctx.captured_queries)
+        timings.sort()
+        return size, queries, statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
@@ -0,0 +1,133 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from store.models import Category, Order, OrderItem, Product, ProductCooccurrence, ProductRecommendation
+from store.recommendations import (
+    basket_lines, build, cooccurrence_numpy, cooccurrence_python, recommendation_settings,
+    top_neighbours_numpy, top_neighbours_python, vectorized_available,
+)
+
+SEED_SLUG = 'benchmark-reco'
+
+
+class Command(BaseCommand):
+    help = (
+        'build_recommendations\'ı sentetik sipariş geçmişinde ölçer: hesaplama (saf Python / NumPy+SciPy), '
+        'tam kurulum ve yalnızca yeni siparişleri işleyen artımlı kurulum. Veriler sonunda geri alınır.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=1_000_000, help='Sentetik sipariş satırı sayısı')
+        parser.add_argument('--products', type=int, default=5_000, help='Sentetik ürün sayısı')
+        parser.add_argument('--new-orders', type=int, default=1_000, help='Artımlı kurulum için yeni sipariş sayısı')
+        parser.add_argument('--skip-python', action='store_true', help='Saf Python hesaplamasını ölçme')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            started = time.perf_counter()
+            self.rng = random.Random(42)
+            self.user, self.products = self.seed_catalog(options['products'])
+            orders = self.seed_orders(options['lines'])
+            self.stdout.write(
+                f'{options["lines"]} satır / {orders} sipariş / {len(self.products)} ürün hazır '
+                f'({time.perf_counter() - started:.1f}s)'
+            )
+
+            paths = []
+            if not options['skip_python']:
+                paths.append(('saf Python', cooccurrence_python, top_neighbours_python))
+            if vectorized_available():
+                paths.append(('NumPy+SciPy', cooccurrence_numpy, top_neighbours_numpy))
+            else:
+                self.stdout.write(self.style.WARNING('NumPy/SciPy kurulu değil; yalnızca saf Python ölçülüyor.'))
+            for label, cooccurrence, top_neighbours in paths:
+                self.measure_compute(label, cooccurrence, top_neighbours)
+
+            vectorized = vectorized_available()
+            record = self.timed_build(full=True, vectorized=vectorized)
+            self.stdout.write(
+                f'tam kurulum (yazma dahil)      {record.duration_ms / 1000:7.2f}s  '
+                f'{ProductCooccurrence.objects.count()} ikili, {ProductRecommendation.objects.count()} öneri'
+            )
+
+            self.seed_orders_count(options['new_orders'])
+            record = self.timed_build(full=False, vectorized=vectorized)
+            self.stdout.write(
+                f'artımlı ({record.orders} yeni sipariş)   {record.duration_ms / 1000:7.2f}s  '
+                f'{record.products} ürünün önerisi yenilendi'
+            )
+            transaction.set_rollback(True)
+
+    def measure_compute(self, label, cooccurrence, top_neighbours):
+        config = recommendation_settings()
+        started = time.perf_counter()
+        product, other, count = cooccurrence(basket_lines(0, 2 ** 62))
+        counted = time.perf_counter()
+        diag = {a: n for a, b, n in zip(_tolist(product), _tolist(other), _tolist(count)) if a == b}
+        top_neighbours(product, other, count, diag, config['top_k'], config['min_support'])
+        done = time.perf_counter()
+        self.stdout.write(
+            f'hesaplama ({label:11})      {done - started:7.2f}s  '
+            f'(okuma + birlikte alınma {counted - started:.2f}s, top-{config["top_k"]} {done - counted:.2f}s)'
+        )
+
+    @staticmethod
+    def timed_build(full, vectorized):
+        return build(full=full, vectorized=vectorized, settle_seconds=0)
+
+    def seed_catalog(self, count):
+        category = Category.objects.create(name_tr='Benchmark', name_en='Benchmark', slug=SEED_SLUG)
+        products = Product.objects.bulk_create([
+            Product(
+                slug=f'{SEED_SLUG}-{i}', name_tr=f'Ürün {i}', name_en=f'Product {i}',
+                description_tr='Açıklama', description_en='Description', price=100, category=category,
+            )
+            for i in range(count)
+        ], batch_size=2000)
+        user = get_user_model().objects.create_user(
+            username=f'{SEED_SLUG}@example.com', email=f'{SEED_SLUG}@example.com', password='benchmark',
+        )
+        # Her ürünün birlikte alındığı birkaç "tamamlayıcı" ürünü olur
+        self.partners = {product.pk: self.rng.sample(products, 3) for product in products}
+        # Popülerlik uzun kuyruklu: ilk ürünler çok daha sık seçilir
+        self.weights = [1 / (rank + 1) ** 0.8 for rank in range(count)]
+        return user, products
+
+    def basket(self):
+        first = self.rng.choices(self.products, weights=self.weights)[0]
+        items = {first}
+        for _ in range(self.rng.randint(0, 5)):
+            pool = self.partners[first.pk] if self.rng.random() < 0.5 else self.products
+            items.add(self.rng.choice(pool))
+        return items
+
+    def seed_orders(self, lines):
+        baskets, total = [], 0
+        while total < lines:
+            items = self.basket()
+            baskets.append(items)
+            total += len(items)
+        self.write_orders(baskets)
+        return len(baskets)
+
+    def seed_orders_count(self, count):
+        self.write_orders([self.basket() for _ in range(count)])
+
+    def write_orders(self, baskets):
+        for start in range(0, len(baskets), 20_000):
+            chunk = baskets[start:start + 20_000]
+            orders = Order.objects.bulk_create(
+                [Order(user=self.user, status='paid', total=100) for _ in chunk], batch_size=5000,
+            )
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=product, product_name=product.name_en, size_value=40, price=100)
+                for order, items in zip(orders, chunk) for product in items
+            ], batch_size=5000)
+
+
+def _tolist(values):
+    return values.tolist() if hasattr(values, 'tolist') else values
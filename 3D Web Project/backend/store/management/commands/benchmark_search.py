@@ -0,0 +1,95 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from store.models import Category, Product
+from store.search import SEARCH_FIELDS, rebuild_search_index, search_products
+
+ADJECTIVES = [
+    ('Mavi', 'Blue', 'Blau'), ('Kırmızı', 'Red', 'Rot'), ('Siyah', 'Black', 'Schwarz'),
+    ('Hafif', 'Light', 'Leicht'), ('Deri', 'Leather', 'Leder'), ('Klasik', 'Classic', 'Klassisch'),
+    ('Spor', 'Sport', 'Sport'), ('Su Geçirmez', 'Waterproof', 'Wasserdicht'),
+]
+NOUNS = [
+    ('Ayakkabı', 'Shoes', 'Schuhe'), ('Bot', 'Boots', 'Stiefel'), ('Sandalet', 'Sandals', 'Sandalen'),
+    ('Terlik', 'Slippers', 'Hausschuhe'), ('Koşu Ayakkabısı', 'Running Shoes', 'Laufschuhe'),
+    ('Gömlek', 'Shirt', 'Hemd'), ('Ceket', 'Jacket', 'Jacke'),
+]
+QUERIES = [('en', 'running shoes'), ('tr', 'ayakkabı'), ('de', 'leder stiefel'), ('en', 'waterpr'), ('en', 'jaket')]
+
+
+class Command(BaseCommand):
+    help = 'Ürün aramasını büyük sentetik katalogda ölçer (icontains vs tam metin); veriler sonunda geri alınır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100_000, help='Sentetik ürün sayısı')
+        parser.add_argument('--repeat', type=int, default=20, help='Sorgu başına tekrar')
+        parser.add_argument('--keep', action='store_true', help='Sentetik verileri silme')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['products'])
+            for lang, query in QUERIES:
+                legacy = self.measure(lambda: self.run_icontains(query), options['repeat'])
+                fulltext = self.measure(lambda: self.run_search(query, lang), options['repeat'])
+                self.stdout.write(
+                    f'{query!r:18} icontains p50={legacy[0]:7.1f}ms p95={legacy[1]:7.1f}ms (n={legacy[2]})  '
+                    f'fts p50={fulltext[0]:7.1f}ms p95={fulltext[1]:7.1f}ms (n={fulltext[2]})'
+                )
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def seed(self, count):
+        rng = random.Random(42)
+        category = Category.objects.create(name_tr='Benchmark', name_en='Benchmark', slug='benchmark-search')
+        started = time.perf_counter()
+        batch = []
+        for i in range(count):
+            adjective, noun = rng.choice(ADJECTIVES), rng.choice(NOUNS)
+            batch.append(Product(
+                slug=f'benchmark-{i}',
+                name_tr=f'{adjective[0]} {noun[0]} {i}',
+                name_en=f'{adjective[1]} {noun[1]} {i}',
+                name_de=f'{adjective[2]} {noun[2]} {i}',
+                description_tr=f'{adjective[0]} {noun[0]} günlük kullanım için.',
+                description_en=f'{adjective[1]} {noun[1]} for everyday use.',
+                description_de=f'{adjective[2]} {noun[2]} für jeden Tag.',
+                price=rng.randint(20, 300),
+                category=category,
+                thumbnail='products/thumbnails/benchmark.png',
+            ))
+            if len(batch) == 5000:
+                Product.objects.bulk_create(batch)
+                batch = []
+        Product.objects.bulk_create(batch)
+        rebuild_search_index()
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE store_product')
+        self.stdout.write(f'{count} ürün {time.perf_counter() - started:.1f}s içinde oluşturuldu ({connection.vendor})')
+
+    @staticmethod
+    def run_icontains(query):
+        q = Q()
+        for field in SEARCH_FIELDS:
+            q |= Q(**{f'{field}__icontains': query})
+        qs = Product.objects.filter(q).order_by('-id')
+        return qs.count(), list(qs[:12])
+
+    @staticmethod
+    def run_search(query, lang):
+        qs = search_products(Product.objects.all(), query, lang)
+        return qs.count(), list(qs[:12])
+
+    @staticmethod
+    def measure(fn, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            count, _ = fn()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return statistics.median(timings), timings[int(len(timings) * 0.95) - 1], count
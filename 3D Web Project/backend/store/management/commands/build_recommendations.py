@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from store.recommendations import build, vectorized_available
+
+
+class Command(BaseCommand):
+    help = (
+        '"Birlikte sık satın alınanlar" önerilerini sipariş geçmişinden günceller; ilk çalıştırmadan '
+        'sonra yalnızca yeni siparişleri işler (cron ile örn. saatte bir)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Tüm siparişlerden sıfırdan kur')
+        parser.add_argument('--python', action='store_true', help='NumPy/SciPy kurulu olsa da saf Python yolunu kullan')
+
+    def handle(self, *args, **options):
+        vectorized = vectorized_available() and not options['python']
+        if not vectorized and not options['python']:
+            self.stdout.write(self.style.WARNING('NumPy/SciPy kurulu değil; saf Python yolu kullanılıyor.'))
+        record = build(full=options['full'], vectorized=vectorized)
+        kind = 'tam' if record.full else 'artımlı'
+        self.stdout.write(self.style.SUCCESS(
+            f'{kind} kurulum: {record.orders} sipariş, {record.products} ürünün önerisi yenilendi '
+            f'({record.duration_ms}ms, vektörel={vectorized})'
+        ))
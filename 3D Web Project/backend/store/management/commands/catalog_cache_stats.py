@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from store.cache import cache_stats, reset_cache_stats, bump_catalog_version
+
+
+class Command(BaseCommand):
+    help = 'Katalog önbelleği isabet/ıskalama sayaçlarını gösterir'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Sayaçları sıfırla')
+        parser.add_argument('--invalidate', action='store_true', help='Tüm katalog girdilerini geçersiz kıl')
+
+    def handle(self, *args, **options):
+        stats = cache_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = (stats['hits'] / total * 100) if total else 0
+        self.stdout.write(
+            f"Sürüm: {stats['version']}  İsabet: {stats['hits']}  Iskalama: {stats['misses']}  Oran: %{ratio:.1f}"
+        )
+
+        if options['reset']:
+            reset_cache_stats()
+            self.stdout.write(self.style.SUCCESS('Sayaçlar sıfırlandı'))
+        if options['invalidate']:
+            bump_catalog_version()
+            self.stdout.write(self.style.SUCCESS('Katalog önbelleği geçersiz kılındı'))
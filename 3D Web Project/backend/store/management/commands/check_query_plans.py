@@ -0,0 +1,128 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from store.models import (
+    Cart, CartItem, Category, Coupon, Order, Product, ProductSize, Review, StockReservation,
+)
+from store.facets import rebuild_product_facets
+from store.query_plans import HOT_QUERIES, SEQ_SCAN_PATTERNS, seq_scans, sorts_in_memory
+
+SEED_SLUG = 'query-plans'
+
+
+class Command(BaseCommand):
+    help = (
+        'store/query_plans.py\'deki sıcak sorguları büyük sentetik veri üzerinde EXPLAIN eder; '
+        'asıl tabloda sıralı tarama varsa hata ile çıkar. Veriler sonunda geri alınır.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=50_000, help='Sentetik ürün sayısı')
+        parser.add_argument('--users', type=int, default=5_000, help='Sentetik kullanıcı sayısı')
+        parser.add_argument('--show-plans', action='store_true', help='Her sorgunun planını yazdır')
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in SEQ_SCAN_PATTERNS:
+            raise CommandError(f'{vendor} için plan denetimi desteklenmiyor (postgresql / sqlite).')
+
+        failures = []
+        with transaction.atomic():
+            started = time.perf_counter()
+            ctx = self.seed(options['products'], options['users'])
+            with connection.cursor() as cursor:
+                # İstatistikler olmadan planlayıcı tablo boyutlarını bilmez
+                cursor.execute('ANALYZE')
+            self.stdout.write(f'Veri hazır ({time.perf_counter() - started:.1f}s), {len(HOT_QUERIES)} sorgu denetleniyor')
+
+            for name, (table, build) in HOT_QUERIES.items():
+                plan = build(ctx).explain()
+                scanned = seq_scans(plan, vendor)
+                if table in scanned:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(f'  SIRALI TARAMA  {name} ({table})'))
+                elif sorts_in_memory(plan, vendor):
+                    self.stdout.write(self.style.WARNING(f'  indeks + sort  {name}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'  indeks         {name}'))
+                if options['show_plans'] or table in scanned:
+                    for line in plan.splitlines():
+                        self.stdout.write(f'      {line}')
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f'{len(failures)} sorgu sıralı taramaya düştü: {", ".join(failures)}')
+
+    def seed(self, product_count, user_count):
+        rng = random.Random(42)
+        now = timezone.now()
+        categories = Category.objects.bulk_create([
+            Category(name_tr=f'Kategori {i}', name_en=f'Category {i}', slug=f'{SEED_SLUG}-{i}') for i in range(20)
+        ])
+        products = Product.objects.bulk_create([
+            Product(
+                slug=f'{SEED_SLUG}-{i}', name_tr=f'Ürün {i}', name_en=f'Product {i}',
+                description_tr='Açıklama', description_en='Description', price=rng.randint(20, 300),
+                category=rng.choice(categories), is_visible=rng.random() < 0.9,
+                view_count=rng.randint(0, 10_000), favorite_count=rng.randint(0, 500),
+            )
+            for i in range(product_count)
+        ], batch_size=2000)
+        sizes = ProductSize.objects.bulk_create([
+            ProductSize(product=product, size_value=40, stock=rng.randint(0, 20), effective_price=product.price)
+            for product in products
+        ], batch_size=5000)
+        rebuild_product_facets()
+
+        users = get_user_model().objects.bulk_create([
+            get_user_model()(username=f'{SEED_SLUG}-{i}@example.com', email=f'{SEED_SLUG}-{i}@example.com', password='!')
+            for i in range(user_count)
+        ], batch_size=2000)
+        # Her kullanıcının birkaç tamamlanmış, en fazla bir aktif sepeti olur
+        carts = Cart.objects.bulk_create([
+            Cart(user=user, is_completed=n > 0) for user in users for n in range(3)
+        ], batch_size=5000)
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, product_id=size.product_id, size=size, quantity=1)
+            for cart in carts for size in rng.sample(sizes, 2)
+        ], batch_size=5000)
+        StockReservation.objects.bulk_create([
+            StockReservation(
+                cart=cart, size=rng.choice(sizes), quantity=1,
+                expires_at=now + timezone.timedelta(minutes=rng.choice((-30, 10))),
+            )
+            for cart in carts if not cart.is_completed
+        ], batch_size=5000)
+        Order.objects.bulk_create([
+            Order(user=user, status='paid', total=rng.randint(50, 900)) for user in users for _ in range(5)
+        ], batch_size=5000)
+        # Kuponların çoğu süresi dolmuş / pasif
+        Coupon.objects.bulk_create([
+            Coupon(
+                code=f'QP{i}', discount_value=10, is_active=rng.random() < 0.2,
+                valid_from=now - timezone.timedelta(days=rng.randint(30, 400)),
+                valid_to=now + timezone.timedelta(days=rng.randint(-365, 5) if rng.random() < 0.98 else 30),
+            )
+            for i in range(max(product_count // 10, 100))
+        ], batch_size=5000)
+        Review.objects.bulk_create([
+            Review(user=rng.choice(users), product=product, comment='Yorum', is_approved=rng.random() < 0.7)
+            for product in products for _ in range(3)
+        ], batch_size=5000)
+
+        product = products[len(products) // 2]
+        cart = next(cart for cart in carts if not cart.is_completed)
+        return {
+            'category_id': categories[0].pk,
+            'product_id': product.pk,
+            'view_count': product.view_count,
+            'user_id': users[len(users) // 2].pk,
+            'cart_id': cart.pk,
+            'size_id': sizes[0].pk,
+            'size_value': 40,
+        }
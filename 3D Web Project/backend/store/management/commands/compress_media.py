@@ -0,0 +1,59 @@
+import gzip
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+try:
+    import brotli
+except ImportError:  # isteğe bağlı: pip install brotli
+    brotli = None
+
+# Zaten sıkıştırılmış biçimler (görseller, .usdz zip) dışarıda kalır
+COMPRESSIBLE_EXTENSIONS = ('.glb', '.gltf', '.bin', '.obj', '.svg', '.json')
+# Kazanç bu oranın altındaysa kopya yazılmaz
+MIN_RATIO = 0.9
+
+
+class Command(BaseCommand):
+    help = 'MEDIA_ROOT altındaki 3D model/JSON/SVG dosyaları için .br ve .gz kopyaları üretir (core/media.py seçer)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Güncel kopyaları da yeniden üret')
+
+    def handle(self, *args, **options):
+        encoders = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            encoders.insert(0, ('.br', lambda data: brotli.compress(data, quality=11)))
+        else:
+            self.stdout.write(self.style.WARNING('brotli kurulu değil; yalnızca .gz üretilecek'))
+
+        written = skipped = saved = 0
+        for root, _, files in os.walk(settings.MEDIA_ROOT):
+            for name in files:
+                if not name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                mtime = os.stat(path).st_mtime
+                data = None
+                for suffix, encode in encoders:
+                    target = path + suffix
+                    if not options['force'] and os.path.exists(target) and os.stat(target).st_mtime >= mtime:
+                        continue
+                    if data is None:
+                        with open(path, 'rb') as fh:
+                            data = fh.read()
+                    compressed = encode(data)
+                    if len(compressed) > len(data) * MIN_RATIO:
+                        skipped += 1
+                        if os.path.exists(target):
+                            os.remove(target)
+                        continue
+                    with open(target, 'wb') as fh:
+                        fh.write(compressed)
+                    written += 1
+                    saved += len(data) - len(compressed)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{written} sıkıştırılmış kopya yazıldı, {skipped} dosya kazançsız atlandı ({saved / 1024:.0f} KB tasarruf)'
+        ))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.ranking import compute_scores
+
+
+class Command(BaseCommand):
+    help = (
+        'Günlük etkinlik kovalarından (görüntülenme, favori, sepete ekleme, satış) zamanla sönümlenen '
+        'trend skorunu ve son dönem satış adedini hesaplayıp Product kolonlarına yazar (cron ile örn. 15 dakikada bir)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-prune', action='store_true', help='Pencere dışındaki eski kovaları silme')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        changed = compute_scores(prune=not options['no_prune'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{changed} ürünün skoru güncellendi ({(time.perf_counter() - started) * 1000:.0f}ms)'
+        ))
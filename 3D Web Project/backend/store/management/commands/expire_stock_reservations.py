@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from store.models import StockReservation
+
+
+class Command(BaseCommand):
+    help = 'Süresi dolmuş sepet stok rezervasyonlarını toplu olarak siler (cron ile dakikalık çalıştırın)'
+
+    def handle(self, *args, **options):
+        deleted, _ = StockReservation.objects.expired(timezone.now()).delete()
+        self.stdout.write(self.style.SUCCESS(f'{deleted} rezervasyon silindi'))
@@ -0,0 +1,59 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from store.cache import bump_catalog_version
+from store.images import init_worker, render_job
+from store.models import Product, ProductImage
+
+MODELS = {
+    'product': (Product, 'thumbnail', 'thumbnail_variants'),
+    'productimage': (ProductImage, 'image', 'variants'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Mevcut ürün görselleri için boyutlandırılmış WebP/AVIF/JPEG türevlerini paralel üretir'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Süreç sayısı')
+        parser.add_argument('--force', action='store_true', help='Türevi olanları da yeniden üret')
+
+    def handle(self, *args, **options):
+        jobs = []
+        for label, (model, file_field, variants_field) in MODELS.items():
+            for pk, name, variants in model.objects.exclude(**{file_field: ''}).values_list(
+                'pk', file_field, variants_field
+            ):
+                if options['force'] or (variants or {}).get('source') != name:
+                    jobs.append((label, pk, name))
+
+        if not jobs:
+            self.stdout.write('Üretilecek türev yok')
+            return
+
+        self.stdout.write(f'{len(jobs)} görsel {options["workers"]} süreçle işleniyor...')
+        started = time.perf_counter()
+        # Alt süreçlere açık DB bağlantısı devretmeyelim
+        connections.close_all()
+        results = {label: [] for label in MODELS}
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=init_worker) as pool:
+            for label, pk, variants in pool.map(render_job, jobs, chunksize=4):
+                results[label].append((pk, variants))
+
+        failed = 0
+        for label, rows in results.items():
+            model, _, variants_field = MODELS[label]
+            objs = []
+            for pk, variants in rows:
+                failed += not variants['widths']
+                objs.append(model(pk=pk, **{variants_field: variants}))
+            model.objects.bulk_update(objs, [variants_field], batch_size=500)
+        bump_catalog_version()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(jobs) - failed} görsel işlendi, {failed} hatalı ({elapsed:.1f}s, {len(jobs) / elapsed:.1f} görsel/s)'
+        ))
@@ -0,0 +1,53 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.importer import FORMATS, detect_format, import_products, read_csv, read_jsonl
+
+
+class Command(BaseCommand):
+    help = (
+        'JSON Lines ya da CSV ürün beslemesini satır satır okuyup ürün / beden / renkleri gruplar halinde '
+        'upsert eder (biçimler için bkz. store/importer.py)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='.jsonl / .ndjson ya da .csv dosyası; - ile stdin')
+        parser.add_argument('--format', choices=FORMATS, help='Girdi biçimi (varsayılan: dosya uzantısından)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Transaction başına ürün sayısı')
+        parser.add_argument('--dry-run', action='store_true', help='Her grubu yazıp geri al: yalnızca doğrula ve raporla')
+        parser.add_argument('--max-errors', type=int, default=20, help='Ayrıntısı yazdırılacak en fazla hata')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size en az 1 olmalı')
+        path = options['file']
+        reader = read_csv if (options['format'] or detect_format(path)) == 'csv' else read_jsonl
+        try:
+            # utf-8-sig: Excel'den alınan CSV'lerin BOM'u
+            stream = sys.stdin if path == '-' else open(path, encoding='utf-8-sig', newline='')
+        except OSError as exc:
+            raise CommandError(f'Dosya okunamadı: {exc}')
+
+        with stream:
+            report = import_products(
+                reader(stream), batch_size=options['batch_size'], dry_run=options['dry_run'], progress=self.progress,
+            )
+
+        for line_no, message in report.errors[:options['max_errors']]:
+            self.stdout.write(self.style.ERROR(f'  satır {line_no}: {message}'))
+        if len(report.errors) > options['max_errors']:
+            self.stdout.write(self.style.ERROR(f'  ... {len(report.errors) - options["max_errors"]} hata daha'))
+        prefix = '(dry-run, değişiklik yapılmadı) ' if options['dry_run'] else ''
+        style = self.style.WARNING if report.errors else self.style.SUCCESS
+        self.stdout.write(style(
+            f'{prefix}{report.rows} satır {report.elapsed:.1f}s içinde işlendi ({report.rate:,.0f} satır/s): '
+            f'{report.created} yeni, {report.updated} güncellenen ürün, {report.sizes} beden, '
+            f'{report.colors} renk, {len(report.errors)} hata'
+        ))
+
+    def progress(self, report):
+        self.stdout.write(
+            f'  {report.rows} satır  {report.created + report.updated} ürün  {len(report.errors)} hata  '
+            f'{report.rate:,.0f} satır/s'
+        )
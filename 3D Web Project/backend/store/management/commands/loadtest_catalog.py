@@ -0,0 +1,185 @@
+import asyncio
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from store.models import Category, Product, ProductColor, ProductSize
+
+SEED_SLUG = 'loadtest'
+
+
+class Command(BaseCommand):
+    help = (
+        'Aynı veri üzerinde senkron uçları WSGI (sabit iş parçacığı havuzu) ve async uçları ASGI '
+        '(tek olay döngüsü) ile süreç içinde çalıştırıp istek/saniye ve p50/p99 gecikmeyi karşılaştırır. '
+        'Yavaş istemci (mobil ağ), yanıt gövdesinin gönderimi --client-delay kadar bekletilerek taklit edilir.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=200, help='Sentetik ürün sayısı')
+        parser.add_argument('--clients', type=int, default=64, help='Eşzamanlı istemci sayısı')
+        parser.add_argument('--requests', type=int, default=10, help='İstemci başına istek')
+        parser.add_argument('--threads', type=int, default=8, help='WSGI worker iş parçacığı sayısı')
+        parser.add_argument('--client-delay', type=float, default=50, help='Yanıt gönderim süresi (ms)')
+        parser.add_argument('--cached', action='store_true', help='Katalog önbelleği isabetlerine izin ver')
+        parser.add_argument('--keep', action='store_true', help='Sentetik verileri silme')
+
+    def handle(self, *args, **options):
+        # Sunucu iş parçacıkları ayrı bağlantı kullanır: veri commit edilmiş olmalı
+        product_ids = self.seed(options['products'])
+        try:
+            self.delay = options['client_delay'] / 1000
+            self.cached = options['cached']
+            self.host = next((h for h in settings.ALLOWED_HOSTS if h != '*' and not h.startswith('.')), 'localhost')
+            self.rng = random.Random(7)
+            self.product_ids = product_ids
+            total = options['clients'] * options['requests']
+            self.stdout.write(
+                f"{options['clients']} istemci x {options['requests']} istek, yanıt gönderimi {options['client_delay']:.0f}ms"
+            )
+            for label, run in (
+                (f"WSGI ({options['threads']} iş parçacığı)", lambda: self.run_wsgi(options)),
+                ('ASGI (async uçlar)', lambda: asyncio.run(self.run_asgi(options))),
+            ):
+                started = time.perf_counter()
+                latencies, errors = run()
+                elapsed = time.perf_counter() - started
+                latencies.sort()
+                self.stdout.write(
+                    f'{label:24} {total / elapsed:8.1f} istek/s  p50={statistics.median(latencies) * 1000:7.1f}ms  '
+                    f'p99={latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000:7.1f}ms  hata={errors}'
+                )
+        finally:
+            if not options['keep']:
+                Category.objects.filter(slug=SEED_SLUG).delete()
+
+    def seed(self, count):
+        Category.objects.filter(slug=SEED_SLUG).delete()
+        rng = random.Random(42)
+        category = Category.objects.create(name_tr='Yük testi', name_en='Load test', slug=SEED_SLUG)
+        products = Product.objects.bulk_create([
+            Product(
+                slug=f'{SEED_SLUG}-{i}', name_tr=f'Ürün {i}', name_en=f'Product {i}', name_de=f'Produkt {i}',
+                description_tr='Açıklama', description_en='Description', price=rng.randint(20, 300),
+                category=category, thumbnail='products/thumbnails/benchmark.png',
+            )
+            for i in range(count)
+        ], batch_size=1000)
+        ProductSize.objects.bulk_create([
+            ProductSize(product=product, size_value=36 + n, stock=rng.randint(0, 20), effective_price=product.price)
+            for product in products for n in range(6)
+        ], batch_size=5000)
+        ProductColor.objects.bulk_create([
+            ProductColor(product=product, name='Siyah', hex_code='#000000') for product in products
+        ], batch_size=5000)
+        return [product.pk for product in products]
+
+    def next_request(self, prefix, number):
+        """Ürün listesi / ürün detayı / kategori karışımı; aynı sıra iki sunucuya da gönderilir."""
+        choice = number % 4
+        if choice in (0, 1):
+            path, params = reverse(f'{prefix}product-list'), {'page': number % 3 + 1}
+        elif choice == 2:
+            path, params = reverse(f'{prefix}product-detail', kwargs={'id': self.product_ids[number % len(self.product_ids)]}), {}
+        else:
+            path, params = reverse(f'{prefix}category-list'), {}
+        if not self.cached:
+            # Benzersiz parametre: katalog önbelleği devre dışı kalsın
+            params['bench'] = f'{prefix}{number}'
+        return path, urlencode(params)
+
+    def run_wsgi(self, options):
+        app = WSGIHandler()
+        pool = ThreadPoolExecutor(max_workers=options['threads'])
+        latencies, errors, lock = [], [0], threading.Lock()
+
+        def serve(path, query):
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+                'SERVER_NAME': self.host, 'SERVER_PORT': '80', 'HTTP_HOST': self.host,
+                'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.url_scheme': 'http', 'wsgi.input': BytesIO(),
+                'wsgi.errors': BytesIO(), 'wsgi.multithread': True, 'wsgi.multiprocess': False,
+                'wsgi.run_once': False, 'wsgi.version': (1, 0),
+            }
+            result = {}
+
+            def start_response(status, headers, exc_info=None):
+                result['status'] = int(status.split()[0])
+
+            body = app(environ, start_response)
+            try:
+                b''.join(body)
+            finally:
+                body.close()
+            # Gövde yavaş istemciye yazılırken worker iş parçacığı meşgul kalır
+            time.sleep(self.delay)
+            return result['status']
+
+        def client(index):
+            for i in range(options['requests']):
+                path, query = self.next_request('', index * options['requests'] + i)
+                started = time.perf_counter()
+                status_code = pool.submit(serve, path, query).result()
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+                    errors[0] += status_code >= 400
+
+        with ThreadPoolExecutor(max_workers=options['clients']) as clients:
+            list(clients.map(client, range(options['clients'])))
+        pool.shutdown()
+        return latencies, errors[0]
+
+    async def run_asgi(self, options):
+        app = ASGIHandler()
+        latencies, errors = [], 0
+
+        async def serve(path, query):
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+                'root_path': '', 'headers': [(b'host', self.host.encode())],
+                'client': ('127.0.0.1', 50000), 'server': (self.host, 80),
+            }
+            received = False
+            status_code = None
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # Bağlantı kesilene kadar bekle (Django yanıt bitince iptal eder)
+                await asyncio.Event().wait()
+
+            async def send(message):
+                nonlocal status_code
+                if message['type'] == 'http.response.start':
+                    status_code = message['status']
+                elif not message.get('more_body'):
+                    # Yavaş istemci: yalnızca bu coroutine bekler
+                    await asyncio.sleep(self.delay)
+
+            await app(scope, receive, send)
+            return status_code
+
+        async def client(index):
+            nonlocal errors
+            for i in range(options['requests']):
+                path, query = self.next_request('async-', index * options['requests'] + i)
+                started = time.perf_counter()
+                status_code = await serve(path, query)
+                latencies.append(time.perf_counter() - started)
+                errors += status_code >= 400
+
+        await asyncio.gather(*(client(index) for index in range(options['clients'])))
+        return latencies, errors
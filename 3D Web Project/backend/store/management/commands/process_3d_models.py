@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from store.cache import bump_catalog_version
+from store.gltf import process_product
+from store.models import Product
+
+
+class Command(BaseCommand):
+    help = '3D modelleri doğrular, mobil için hafif GLB ve eksik posterleri üretir'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='İşlenmiş modelleri de yeniden işle')
+        parser.add_argument('--product', type=int, action='append', help='Yalnızca bu ürün(ler)')
+
+    def handle(self, *args, **options):
+        products = Product.objects.filter(
+            Q(model_3d__gt='') | Q(model_3d_lite__gt='') | ~Q(model_3d_meta={})
+        ).only('id', 'model_3d', 'model_3d_poster', 'model_3d_lite', 'model_3d_meta')
+        if options['product']:
+            products = products.filter(pk__in=options['product'])
+
+        started = time.perf_counter()
+        processed = invalid = 0
+        for product in products.iterator():
+            source = product.model_3d.name if product.model_3d else ''
+            if not options['force'] and (product.model_3d_meta or {}).get('source', '') == source and (source or not product.model_3d_lite):
+                continue
+            updates = process_product(product)
+            Product.objects.filter(pk=product.pk).update(**updates)
+            processed += 1
+            meta = updates['model_3d_meta']
+            if meta and not meta['valid']:
+                invalid += 1
+                self.stdout.write(self.style.WARNING(f'#{product.pk} {source}: {"; ".join(meta["errors"])}'))
+            elif meta:
+                lite = meta.get('lite', {})
+                self.stdout.write(
+                    f'#{product.pk} {source}: {meta["file_size"]} -> {lite.get("file_size", "-")} bayt, '
+                    f'{meta.get("triangles", "-")} üçgen'
+                )
+
+        if processed:
+            bump_catalog_version()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'{processed} model işlendi, {invalid} geçersiz ({elapsed:.1f}s)'))
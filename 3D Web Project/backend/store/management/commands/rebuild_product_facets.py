@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from store.facets import rebuild_product_facets
+
+
+class Command(BaseCommand):
+    help = (
+        'Ürün listesi facet indeksini (ProductFacet) ve hazır facet sayılarını (FacetCount) baştan kurar '
+        '(toplu içe aktarma ya da FACET_PRICE_BUCKETS değişikliği sonrası)'
+    )
+
+    def handle(self, *args, **options):
+        rows = rebuild_product_facets()
+        self.stdout.write(self.style.SUCCESS(f'Facet indeksi yenilendi ({rows} satır)'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from store.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Ürün tam metin arama indeksini baştan kurar (toplu içe aktarma sonrası)'
+
+    def handle(self, *args, **options):
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS('Arama indeksi yenilendi'))
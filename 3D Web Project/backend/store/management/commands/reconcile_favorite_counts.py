@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+
+from store.models import Favorite, Product
+
+
+class Command(BaseCommand):
+    help = (
+        'Product.favorite_count sayaçlarını Favorite tablosundan tek bir gruplu sayımla yeniden hesaplar; '
+        'yalnızca farklı olan ürünleri toplu UPDATE ile düzeltir (cron ile periyodik çalıştırın)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='UPDATE başına ürün sayısı')
+        parser.add_argument('--dry-run', action='store_true', help='Yalnızca farkları raporla')
+
+    def handle(self, *args, **options):
+        actual = dict(
+            Favorite.objects.order_by().values('product').annotate(total=models.Count('id'))
+            .values_list('product', 'total')
+        )
+        # Favorisi olmayan ama sayacı sıfır olmayan ürünler de düzeltilir
+        stored = Product.objects.filter(
+            models.Q(favorite_count__gt=0) | models.Exists(Favorite.objects.filter(product=models.OuterRef('pk')))
+        )
+        drift = [
+            pk for pk, count in stored.values_list('pk', 'favorite_count').iterator(chunk_size=5000)
+            if count != actual.get(pk, 0)
+        ]
+
+        if options['dry_run']:
+            self.stdout.write(f'{len(drift)} ürünün sayacı farklı (değişiklik yapılmadı)')
+            return
+
+        # Sayım, yazma anında yeniden yapılır: bu arada gelen toggle'lar ezilmez
+        current = (
+            Favorite.objects.filter(product=models.OuterRef('pk')).order_by()
+            .values('product').annotate(total=models.Count('id')).values('total')
+        )
+        batch_size = options['batch_size']
+        with transaction.atomic():
+            for start in range(0, len(drift), batch_size):
+                Product.objects.filter(pk__in=drift[start:start + batch_size]).update(
+                    favorite_count=Coalesce(models.Subquery(current, output_field=models.PositiveIntegerField()), 0)
+                )
+        self.stdout.write(self.style.SUCCESS(f'{len(drift)} ürünün favori sayacı düzeltildi'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from store.models import ProductSize
+
+
+class Command(BaseCommand):
+    help = 'Kampanya başlangıç/bitişi geçen bedenlerin saklı net fiyatını yeniler (cron ile dakikalık çalıştırın)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Sadece eskimiş olanları değil tüm bedenleri yeniden hesapla'
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        sizes = ProductSize.objects.all()
+        if not options['all']:
+            sizes = sizes.stale_prices(now)
+
+        updated = sizes.refresh_effective_prices(now)
+        self.stdout.write(self.style.SUCCESS(f'{updated} beden fiyatı güncellendi'))
@@ -0,0 +1,42 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:07
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_effective_price(apps, schema_editor):
+    ProductSize = apps.get_model('store', 'ProductSize')
+    now = timezone.now()
+    sizes = []
+    for size in ProductSize.objects.select_related('product', 'campaign').iterator(chunk_size=500):
+        base_price = size.price_override if size.price_override else size.product.price
+        campaign = size.campaign
+        if campaign and campaign.is_active and campaign.start_date <= now <= campaign.end_date:
+            base_price -= (base_price * campaign.discount_percentage) / 100
+            size.discount_ends_at = campaign.end_date
+        size.effective_price = base_price.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        sizes.append(size)
+    ProductSize.objects.bulk_update(sizes, ['effective_price', 'discount_ends_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0008_category_name_de_product_description_de_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productsize',
+            name='discount_ends_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='productsize',
+            name='effective_price',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.RunPython(backfill_effective_price, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0009_productsize_effective_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('cart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='store.cart')),
+                ('size', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='store.productsize')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('cart', 'size'), name='unique_cart_reservation')],
+            },
+        ),
+    ]
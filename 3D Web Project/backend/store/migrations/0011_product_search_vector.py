@@ -0,0 +1,76 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:20
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+SEARCH_FIELDS = ('name_tr', 'name_en', 'name_de', 'description_tr', 'description_en', 'description_de')
+
+POSTGRESQL_FORWARD = [
+    """
+    CREATE OR REPLACE FUNCTION store_product_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('pg_catalog.turkish', coalesce(NEW.name_tr, '')), 'A') ||
+            setweight(to_tsvector('pg_catalog.english', coalesce(NEW.name_en, '')), 'A') ||
+            setweight(to_tsvector('pg_catalog.german', coalesce(NEW.name_de, '')), 'A') ||
+            setweight(to_tsvector('pg_catalog.turkish', coalesce(NEW.description_tr, '')), 'B') ||
+            setweight(to_tsvector('pg_catalog.english', coalesce(NEW.description_en, '')), 'B') ||
+            setweight(to_tsvector('pg_catalog.german', coalesce(NEW.description_de, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER store_product_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name_tr, name_en, name_de, description_tr, description_en, description_de
+    ON store_product FOR EACH ROW EXECUTE FUNCTION store_product_search_vector_update()
+    """,
+    'CREATE INDEX store_product_search_idx ON store_product USING gin (search_vector)',
+    'CREATE INDEX store_product_name_tr_trgm ON store_product USING gin (name_tr gin_trgm_ops)',
+    'CREATE INDEX store_product_name_en_trgm ON store_product USING gin (name_en gin_trgm_ops)',
+    'CREATE INDEX store_product_name_de_trgm ON store_product USING gin (name_de gin_trgm_ops)',
+    'UPDATE store_product SET name_tr = name_tr',
+]
+POSTGRESQL_BACKWARD = [
+    'DROP TRIGGER IF EXISTS store_product_search_vector_trigger ON store_product',
+    'DROP FUNCTION IF EXISTS store_product_search_vector_update()',
+    'DROP INDEX IF EXISTS store_product_search_idx',
+    'DROP INDEX IF EXISTS store_product_name_tr_trgm',
+    'DROP INDEX IF EXISTS store_product_name_en_trgm',
+    'DROP INDEX IF EXISTS store_product_name_de_trgm',
+]
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE store_product_fts USING fts5(%s, tokenize='unicode61 remove_diacritics 2')"
+    % ', '.join(SEARCH_FIELDS),
+    'INSERT INTO store_product_fts (rowid, %s) SELECT id, %s FROM store_product'
+    % (', '.join(SEARCH_FIELDS), ', '.join(f"coalesce({f}, '')" for f in SEARCH_FIELDS)),
+]
+SQLITE_BACKWARD = ['DROP TABLE IF EXISTS store_product_fts']
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for sql in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0010_stockreservation'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            _run({'postgresql': POSTGRESQL_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            _run({'postgresql': POSTGRESQL_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0013_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='model_3d_lite',
+            field=models.FileField(blank=True, editable=False, null=True, upload_to='products/models/lite/'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='model_3d_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
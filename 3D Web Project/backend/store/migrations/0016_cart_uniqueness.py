@@ -0,0 +1,65 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def merge_duplicates(apps, schema_editor):
+    """Kısıtlar eklenmeden önce mükerrer aktif sepetleri ve renksiz satırları birleştirir."""
+    Cart = apps.get_model('store', 'Cart')
+    CartItem = apps.get_model('store', 'CartItem')
+    StockReservation = apps.get_model('store', 'StockReservation')
+
+    duplicated_users = (
+        Cart.objects.filter(is_completed=False, user__isnull=False)
+        .values('user').annotate(carts=models.Count('id')).filter(carts__gt=1).values_list('user', flat=True)
+    )
+    for user_id in list(duplicated_users):
+        carts = list(Cart.objects.filter(user_id=user_id, is_completed=False).order_by('-updated_at', '-id'))
+        keep, others = carts[0], carts[1:]
+        for item in CartItem.objects.filter(cart__in=others):
+            existing = CartItem.objects.filter(
+                cart=keep, product_id=item.product_id, size_id=item.size_id, color_id=item.color_id,
+            ).first()
+            if existing:
+                existing.quantity += item.quantity
+                existing.save(update_fields=['quantity'])
+                item.delete()
+            else:
+                item.cart = keep
+                item.save(update_fields=['cart'])
+        # Rezervasyonlar bir sonraki sepet işleminde yeniden tutulur
+        StockReservation.objects.filter(cart__in=others).delete()
+        Cart.objects.filter(pk__in=[cart.pk for cart in others]).delete()
+
+    duplicated_lines = (
+        CartItem.objects.filter(color__isnull=True)
+        .values('cart', 'product', 'size').annotate(lines=models.Count('id')).filter(lines__gt=1)
+    )
+    for line in list(duplicated_lines):
+        items = list(CartItem.objects.filter(
+            cart_id=line['cart'], product_id=line['product'], size_id=line['size'], color__isnull=True,
+        ).order_by('id'))
+        items[0].quantity = sum(item.quantity for item in items)
+        items[0].save(update_fields=['quantity'])
+        CartItem.objects.filter(pk__in=[item.pk for item in items[1:]]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0015_catalog_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cart',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_completed', False)), fields=('user',), name='one_active_cart_per_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(condition=models.Q(('color__isnull', True)), fields=('cart', 'product', 'size'), name='unique_cart_item_without_color'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0016_cart_uniqueness'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='coupon',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['valid_to', 'valid_from'], name='coupon_active_window_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['category', '-created_at', '-id'], name='product_visible_cat_new_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['product', '-created_at'], name='review_product_approved_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0017_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('favorites', models.PositiveIntegerField(default=0)),
+                ('cart_adds', models.PositiveIntegerField(default=0)),
+                ('sales', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='recent_sales',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Son BESTSELLING_WINDOW_DAYS gündeki satış adedi'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['-trending_score', '-id'], name='product_visible_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['-recent_sales', '-id'], name='product_visible_sales_idx'),
+        ),
+        migrations.AddField(
+            model_name='productactivity',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='store.product'),
+        ),
+        migrations.AddIndex(
+            model_name='productactivity',
+            index=models.Index(fields=['day'], name='product_activity_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='productactivity',
+            constraint=models.UniqueConstraint(fields=('product', 'day'), name='unique_product_activity_day'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:20
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from store.facets import ROW_FIELDS, facet_contributions, facet_rows, price_buckets
+
+
+def build_facets(apps, schema_editor):
+    """Mevcut katalog için facet indeksini ve sayılarını doldurur."""
+    ProductColor = apps.get_model('store', 'ProductColor')
+    ProductSize = apps.get_model('store', 'ProductSize')
+    ProductFacet = apps.get_model('store', 'ProductFacet')
+    FacetCount = apps.get_model('store', 'FacetCount')
+
+    colors = defaultdict(set)
+    for product_id, name in ProductColor.objects.values_list('product_id', 'name').iterator():
+        if name.strip():
+            colors[product_id].add(name.strip())
+    sizes = ProductSize.objects.filter(product__is_visible=True).values_list(
+        'product_id', 'product__category_id', 'size_value', 'effective_price', 'stock',
+    )
+    rows = facet_rows(sizes.iterator(), colors, price_buckets())
+    ProductFacet.objects.bulk_create([ProductFacet(**row) for row in rows], batch_size=2000)
+    counts = facet_contributions([tuple(row[name] for name in ROW_FIELDS) for row in rows])
+    FacetCount.objects.bulk_create([
+        FacetCount(category_id=scope, facet=facet, value=value, products=n)
+        for (scope, facet, value), n in counts.items()
+    ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0019_product_recommendations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category_id', models.PositiveIntegerField(default=0)),
+                ('facet', models.CharField(max_length=10)),
+                ('value', models.CharField(max_length=50)),
+                ('products', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('category_id', 'facet', 'value'), name='unique_facet_count')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('size_value', models.FloatField()),
+                ('color', models.CharField(blank=True, max_length=50)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('price_bucket', models.PositiveSmallIntegerField()),
+                ('in_stock', models.BooleanField()),
+                ('category', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='store.category')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='facets', to='store.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['category', 'size_value'], name='facet_cat_size_idx'), models.Index(fields=['category', 'color'], name='facet_cat_color_idx'), models.Index(fields=['size_value'], name='facet_size_idx'), models.Index(fields=['color'], name='facet_color_idx')],
+            },
+        ),
+        migrations.RunPython(build_facets, migrations.RunPython.noop),
+    ]
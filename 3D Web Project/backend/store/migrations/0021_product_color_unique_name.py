@@ -0,0 +1,43 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+def merge_duplicate_colors(apps, schema_editor):
+    """Kısıt eklenmeden önce aynı ürünün aynı adlı renklerini birleştirir; sepet satırları korunur."""
+    ProductColor = apps.get_model('store', 'ProductColor')
+    CartItem = apps.get_model('store', 'CartItem')
+
+    duplicated = (
+        ProductColor.objects.values('product', 'name').annotate(colors=models.Count('id')).filter(colors__gt=1)
+    )
+    for group in list(duplicated):
+        colors = list(ProductColor.objects.filter(product_id=group['product'], name=group['name']).order_by('id'))
+        keep, others = colors[0], colors[1:]
+        for item in CartItem.objects.filter(color__in=others):
+            existing = CartItem.objects.filter(
+                cart_id=item.cart_id, product_id=item.product_id, size_id=item.size_id, color=keep,
+            ).first()
+            if existing:
+                existing.quantity += item.quantity
+                existing.save(update_fields=['quantity'])
+                item.delete()
+            else:
+                item.color = keep
+                item.save(update_fields=['color'])
+        ProductColor.objects.filter(pk__in=[color.pk for color in others]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0020_product_facets'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_colors, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='productcolor',
+            constraint=models.UniqueConstraint(fields=('product', 'name'), name='unique_product_color_name'),
+        ),
+    ]
@@ -1,11 +1,20 @@
-from django.db import models
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models.functions import Coalesce, Greatest, Round
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import timedelta
 from django.core.validators import FileExtensionValidator, MinValueValidator
 
+from .cache import bump_catalog_version
+
 User = get_user_model()
 
+CENTS = Decimal('0.01')
+
 
 # --- TEMEL YAPILAR ---
 
@@ -14,6 +23,8 @@ class Category(models.Model):
     name_en = models.CharField(max_length=100)
     name_de = models.CharField(max_length=100, blank=True, null=True)
     slug = models.SlugField(unique=True)
+    # Katalog ETag'i için değişiklik damgası (bkz. store/cache.py: catalog_etag)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name_en
@@ -25,6 +36,7 @@ class Campaign(models.Model):
     start_date = models.DateTimeField(default=timezone.now)
     end_date = models.DateTimeField()
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def is_valid(self):
         now = timezone.now()
@@ -34,6 +46,13 @@ class Campaign(models.Model):
         return f"{self.name} (%{self.discount_percentage})"
 
 
+class CouponQuerySet(models.QuerySet):
+    def active(self, now=None):
+        """Şu an geçerlilik penceresi içindeki aktif kuponlar (kullanım limiti hariç)."""
+        now = now or timezone.now()
+        return self.filter(is_active=True, valid_from__lte=now, valid_to__gte=now)
+
+
 class Coupon(models.Model):
     DISCOUNT_TYPES = (
         ('percentage', 'Yüzde (%)'),
@@ -48,6 +67,17 @@ class Coupon(models.Model):
     used_count = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
 
+    objects = CouponQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Süresi dolmuş kuponlar birikir; aktif pencere yalnızca aktiflerin üzerinden aranır
+            models.Index(
+                fields=['valid_to', 'valid_from'], name='coupon_active_window_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
+
     def is_valid(self):
         now = timezone.now()
         return (self.is_active and
@@ -60,6 +90,23 @@ class Coupon(models.Model):
 
 # --- ÜRÜN YAPILARI ---
 
+class ProductQuerySet(models.QuerySet):
+    def with_card_fields(self):
+        """Ürün kartı için min_price (en düşük net beden fiyatı, beden yoksa baz fiyat), has_stock, has_3d."""
+        sizes = ProductSize.objects.filter(product=models.OuterRef('pk'))
+        return self.annotate(
+            min_price=Coalesce(
+                models.Subquery(sizes.order_by('effective_price').values('effective_price')[:1]),
+                models.F('price'),
+            ),
+            has_stock=models.Exists(sizes.filter(stock__gt=0)),
+            has_3d=models.ExpressionWrapper(
+                models.Q(model_3d__isnull=False) & ~models.Q(model_3d=''),
+                output_field=models.BooleanField(),
+            ),
+        )
+
+
 class Product(models.Model):
     slug = models.SlugField(unique=True)
     name_tr = models.CharField(max_length=200)
@@ -72,6 +119,8 @@ class Product(models.Model):
     currency = models.CharField(max_length=5, default="EUR")
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='products')
     thumbnail = models.ImageField(upload_to='products/thumbnails/')
+    # Boyutlandırılmış WebP/AVIF/JPEG türevleri (bkz. store/images.py)
+    thumbnail_variants = models.JSONField(default=dict, blank=True, editable=False)
     model_3d = models.FileField(
         upload_to='products/models/',
         null=True,
@@ -84,12 +133,54 @@ class Product(models.Model):
         blank=True,
         help_text='3D model için önizleme/poster görseli',
     )
+    # process_3d_models komutunun ürettiği hafif GLB ve inceleme sonucu (bkz. store/gltf.py)
+    model_3d_lite = models.FileField(upload_to='products/models/lite/', null=True, blank=True, editable=False)
+    model_3d_meta = models.JSONField(default=dict, blank=True, editable=False)
     is_visible = models.BooleanField(default=True)
     is_available = models.BooleanField(default=True)
     low_stock_warning = models.IntegerField(default=5)
     view_count = models.PositiveIntegerField(default=0)
     favorite_count = models.PositiveIntegerField(default=0)
+    # compute_trending_scores komutu doldurur (bkz. store/ranking.py)
+    trending_score = models.FloatField(default=0, editable=False)
+    recent_sales = models.PositiveIntegerField(default=0, editable=False, help_text="Son BESTSELLING_WINDOW_DAYS gündeki satış adedi")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # PostgreSQL'de trigger ile dolar (bkz. store/search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        # Keyset sayfalama sıralamaları (store/pagination.py); yalnızca görünür ürünler
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'], name='product_visible_newest_idx',
+                condition=models.Q(is_visible=True),
+            ),
+            models.Index(
+                fields=['-view_count', '-id'], name='product_visible_popular_idx',
+                condition=models.Q(is_visible=True),
+            ),
+            models.Index(
+                fields=['-favorite_count', '-id'], name='product_visible_fav_idx',
+                condition=models.Q(is_visible=True),
+            ),
+            # Kategori filtresi + varsayılan (en yeni) sıralama: sıralama indeksten okunur
+            models.Index(
+                fields=['category', '-created_at', '-id'], name='product_visible_cat_new_idx',
+                condition=models.Q(is_visible=True),
+            ),
+            # ?ordering=trending / bestselling: skor önceden hesaplandığından sıralama indeks taramasıdır
+            models.Index(
+                fields=['-trending_score', '-id'], name='product_visible_trending_idx',
+                condition=models.Q(is_visible=True),
+            ),
+            models.Index(
+                fields=['-recent_sales', '-id'], name='product_visible_sales_idx',
+                condition=models.Q(is_visible=True),
+            ),
+        ]
 
     def __str__(self):
         return self.name_en
@@ -99,7 +190,9 @@ class ProductImage(models.Model):
     """Ürün galerisi: Her ürünün birden fazla görseli olabilir."""
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='products/gallery/')
+    variants = models.JSONField(default=dict, blank=True, editable=False)
     order = models.PositiveIntegerField(default=0, help_text='Sıralama (küçük önce)')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['order']
@@ -112,17 +205,125 @@ class ProductColor(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='colors')
     name = models.CharField(max_length=50)
     hex_code = models.CharField(max_length=7)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            # Toplu içe aktarma (store/importer.py) renkleri bu ikili üzerinden upsert eder
+            models.UniqueConstraint(fields=['product', 'name'], name='unique_product_color_name'),
+        ]
 
     def __str__(self):
         return f"{self.product.name_en} - {self.name}"
 
 
+class ProductSizeQuerySet(models.QuerySet):
+    def stale_prices(self, now=None):
+        """Kampanya sınırı geçtiği için saklı fiyatı eskimiş bedenler."""
+        now = now or timezone.now()
+        return self.filter(
+            # İndirim süresi doldu ya da kampanya silindi/ayrıldı
+            models.Q(discount_ends_at__lte=now)
+            | models.Q(campaign__isnull=True, discount_ends_at__isnull=False)
+            # Kampanya başladı ama fiyat henüz indirimli değil
+            | models.Q(
+                discount_ends_at__isnull=True,
+                campaign__is_active=True,
+                campaign__start_date__lte=now,
+                campaign__end_date__gt=now,
+            )
+        )
+
+    def refresh_effective_prices(self, now=None, batch_size=500):
+        """effective_price / discount_ends_at kolonlarını toplu olarak yeniden hesaplar."""
+        now = now or timezone.now()
+        changed = []
+        for size in self.select_related('product', 'campaign').iterator(chunk_size=batch_size):
+            price, ends_at = size.compute_effective_price(now)
+            if size.effective_price != price or size.discount_ends_at != ends_at:
+                size.effective_price, size.discount_ends_at, size.updated_at = price, ends_at, timezone.now()
+                changed.append(size)
+        ProductSize.objects.bulk_update(
+            changed, ['effective_price', 'discount_ends_at', 'updated_at'], batch_size=batch_size
+        )
+        if changed:
+            # bulk_update sinyal göndermez; facet indeksi ve liste önbelleği burada güncellenir
+            from .facets import sync_product_facets
+            sync_product_facets({size.product_id for size in changed})
+            bump_catalog_version()
+        return len(changed)
+
+    def with_available(self, now=None):
+        """Aktif rezervasyon toplamını held_quantity olarak ekler (available_stock bunu kullanır)."""
+        held = (
+            StockReservation.objects.active(now)
+            .filter(size=models.OuterRef('pk'))
+            .values('size')
+            .annotate(total=models.Sum('quantity'))
+            .values('total')
+        )
+        return self.annotate(
+            held_quantity=Coalesce(models.Subquery(held, output_field=models.PositiveIntegerField()), 0)
+        )
+
+    def decrement_stock(self, quantities, cart=None):
+        """
+        {size_id: adet} kadar stoğu tek UPDATE ile düşer. Yalnızca stoğu
+        yeten satırlar güncellenir; güncellenen satır sayısı döner, çağıran
+        taraf eksik satırda transaction'ı geri almalıdır. cart verilirse diğer
+        sepetlerin aktif rezervasyonlarına dokunulmaz (süresi dolmuş kendi
+        rezervasyonu olan sepet başkasının tuttuğu stoğu alamaz); bu durumda
+        çağıran transaction içinde olmalıdır.
+        """
+        # Eşzamanlı UPDATE'te stok koşulu güncel satır üzerinde yeniden
+        # değerlendirilir, ama rezervasyon alt sorgusu eski görüntüde kalır
+        needed = models.Case(
+            *[models.When(pk=size_id, then=models.Value(qty)) for size_id, qty in quantities.items()],
+            output_field=models.PositiveIntegerField(),
+        )
+        required = needed
+        if cart is not None:
+            # Bu yüzden bedenler hold() / hold_many() ile aynı sırada (id) önceden
+            # kilitlenir: süren rezervasyonlar commit edilene kadar beklenir ve
+            # toplamları kilitten sonra başlayan UPDATE'te güncel okunur
+            list(self.filter(pk__in=list(quantities)).order_by('pk').select_for_update().values_list('pk', flat=True))
+            held_by_others = (
+                StockReservation.objects.active()
+                .filter(size=models.OuterRef('pk'))
+                .exclude(cart=cart)
+                .values('size')
+                .annotate(total=models.Sum('quantity'))
+                .values('total')
+            )
+            required = needed + Coalesce(
+                models.Subquery(held_by_others, output_field=models.PositiveIntegerField()), 0
+            )
+        updated = self.filter(pk__in=list(quantities), stock__gte=required).update(
+            stock=models.F('stock') - needed, updated_at=timezone.now()
+        )
+        # Tükenen bedenler ?in_stock= filtresinden ve stok sayılarından düşer
+        sold_out = ProductSize.objects.filter(pk__in=list(quantities), stock=0).values_list('product_id', flat=True)
+        if updated and sold_out:
+            from .facets import sync_product_facets
+            sync_product_facets(sold_out)
+        if updated:
+            # Önbellekteki listeler eski stoğu göstermesin; geri alınan checkout sürümü artırmaz
+            transaction.on_commit(bump_catalog_version)
+        return updated
+
+
 class ProductSize(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='sizes')
     size_value = models.FloatField(verbose_name="Numara / Beden")
     stock = models.PositiveIntegerField(default=0)
     price_override = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     campaign = models.ForeignKey(Campaign, on_delete=models.SET_NULL, null=True, blank=True, related_name='sizes')
+    # Kampanya/override uygulanmış net fiyat; signals ve refresh_effective_prices komutu güncel tutar
+    effective_price = models.DecimalField(max_digits=10, decimal_places=2, default=0, db_index=True, editable=False)
+    discount_ends_at = models.DateTimeField(null=True, blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = ProductSizeQuerySet.as_manager()
 
     class Meta:
         unique_together = ('product', 'size_value')
@@ -131,21 +332,43 @@ class ProductSize(models.Model):
     def __str__(self):
         return f"{self.product.name_en} - No: {self.size_value}"
 
-    @property
-    def current_price(self):
+    def compute_effective_price(self, now=None):
+        """(net fiyat, indirim bitişi) çiftini hesaplar; kolonlara yazmaz."""
         # Önce bedene özel fiyat var mı bak, yoksa ürünün genel fiyatını al
         base_price = self.price_override if self.price_override else self.product.price
+        base_price = Decimal(str(base_price))
 
         # Aktif kampanya varsa indirimi uygula
-        if self.campaign and self.campaign.is_valid():
-            discount = (base_price * self.campaign.discount_percentage) / 100
-            return base_price - discount
-        return base_price
+        campaign = self.campaign
+        now = now or timezone.now()
+        if campaign and campaign.is_active and campaign.start_date <= now <= campaign.end_date:
+            discount = (base_price * campaign.discount_percentage) / 100
+            return (base_price - discount).quantize(CENTS, rounding=ROUND_HALF_UP), campaign.end_date
+        return base_price.quantize(CENTS, rounding=ROUND_HALF_UP), None
+
+    def save(self, *args, **kwargs):
+        self.effective_price, self.discount_ends_at = self.compute_effective_price()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'effective_price', 'discount_ends_at', 'updated_at'}
+        super().save(*args, **kwargs)
+
+    @property
+    def current_price(self):
+        return self.effective_price
+
+    @property
+    def available_stock(self):
+        """Stok − aktif sepet rezervasyonları."""
+        held = getattr(self, 'held_quantity', None)
+        if held is None:
+            held = self.reservations.active().aggregate(total=models.Sum('quantity'))['total'] or 0
+        return max(self.stock - held, 0)
 
     @property
     def discount_remaining_time(self):
-        if self.campaign and self.campaign.is_valid():
-            remaining = self.campaign.end_date - timezone.now()
+        if self.discount_ends_at:
+            remaining = self.discount_ends_at - timezone.now()
             return max(int(remaining.total_seconds()), 0)
         return 0
 
@@ -171,10 +394,56 @@ class CartItem(models.Model):
             models.UniqueConstraint(
                 fields=['cart', 'product', 'size', 'color'],
                 name='unique_cart_item',
-            )
+            ),
+            # NULL renkler yukarıdaki kısıtta çakışmaz; renksiz satırlar ayrıca tekilleştirilir
+            models.UniqueConstraint(
+                fields=['cart', 'product', 'size'],
+                condition=models.Q(color__isnull=True),
+                name='unique_cart_item_without_color',
+            ),
         ]
 
 
+class CartQuerySet(models.QuerySet):
+    def with_totals(self, now=None):
+        """
+        subtotal_amount / discount_amount / total_amount alanlarını tek SQL
+        sorgusunda hesaplar (kalem başına ürün/beden/kampanya gezilmez).
+        """
+        now = now or timezone.now()
+        money = models.DecimalField(max_digits=12, decimal_places=2)
+        zero = models.Value(Decimal('0.00'), output_field=money)
+
+        item_totals = (
+            CartItem.objects.filter(cart=models.OuterRef('pk'))
+            .values('cart')
+            .annotate(total=models.Sum(models.F('size__effective_price') * models.F('quantity'), output_field=money))
+            .values('total')
+        )
+        coupon_valid = models.Q(
+            coupon__is_active=True,
+            coupon__valid_from__lte=now,
+            coupon__valid_to__gte=now,
+            coupon__used_count__lt=models.F('coupon__usage_limit'),
+        )
+        return self.annotate(
+            subtotal_amount=Coalesce(models.Subquery(item_totals, output_field=money), zero),
+            discount_amount=models.Case(
+                models.When(
+                    coupon_valid & models.Q(coupon__discount_type='percentage'),
+                    # Kuruşa yuvarlanır: Cart.total_price ve sipariş toplamı ile aynı sonuç
+                    then=Round(
+                        models.F('subtotal_amount') * models.F('coupon__discount_value') / 100, 2, output_field=money,
+                    ),
+                ),
+                models.When(coupon_valid, then=models.F('coupon__discount_value')),
+                default=zero,
+                output_field=money,
+            ),
+            total_amount=Greatest(models.F('subtotal_amount') - models.F('discount_amount'), zero, output_field=money),
+        )
+
+
 class Cart(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='carts')
     coupon = models.ForeignKey(Coupon, on_delete=models.SET_NULL, null=True, blank=True)
@@ -182,36 +451,225 @@ class Cart(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_completed = models.BooleanField(default=False)
 
+    objects = CartQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Kullanıcı başına tek aktif sepet: eşzamanlı get_or_create ikinci sepet açamaz
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=models.Q(is_completed=False),
+                name='one_active_cart_per_user',
+            ),
+        ]
+
     def __str__(self):
         return f"Cart {self.id} - User: {self.user}"
 
     @property
     def total_price_before_coupon(self):
+        # Cart.objects.with_totals() ile gelen sepetlerde SQL sonucu kullanılır
+        if hasattr(self, 'subtotal_amount'):
+            return self.subtotal_amount
         return sum(item.total_item_price for item in self.items.all())
 
     @property
     def total_price(self):
+        if hasattr(self, 'total_amount'):
+            return self.total_amount
         total = self.total_price_before_coupon
         if self.coupon and self.coupon.is_valid():
             if self.coupon.discount_type == 'percentage':
-                total -= (total * self.coupon.discount_value) / 100
+                total -= ((total * self.coupon.discount_value) / 100).quantize(CENTS, rounding=ROUND_HALF_UP)
             else:
                 total -= self.coupon.discount_value
         return max(total, 0)
 
-    def add_item(self, product, size, color=None, quantity=1):
-        item, created = CartItem.objects.get_or_create(
-            cart=self,
-            product=product,
-            size=size,
-            color=color,
-            defaults={'quantity': quantity}
+    @staticmethod
+    def _supports_add_upsert():
+        features = connection.features
+        return features.supports_update_conflicts_with_target and features.can_return_columns_from_insert
+
+    @staticmethod
+    def _add_sql(colorless, rows):
+        """rows satırlık artırımlı upsert; renksiz satırlar kısmi unique indekse çakışır."""
+        qn = connection.ops.quote_name
+        table = qn(CartItem._meta.db_table)
+        if colorless:
+            target = f"({qn('cart_id')}, {qn('product_id')}, {qn('size_id')}) WHERE {qn('color_id')} IS NULL"
+        else:
+            target = f"({qn('cart_id')}, {qn('product_id')}, {qn('size_id')}, {qn('color_id')})"
+        values = ', '.join(['(%s, %s, %s, %s, %s)'] * rows)
+        return (
+            f"INSERT INTO {table} ({qn('cart_id')}, {qn('product_id')}, {qn('size_id')}, {qn('color_id')}, "
+            f"{qn('quantity')}) VALUES {values} ON CONFLICT {target} DO UPDATE SET "
+            f"{qn('quantity')} = {table}.{qn('quantity')} + excluded.{qn('quantity')}"
         )
-        if not created:
-            item.quantity += int(quantity)
-            item.save()
+
+    def add_item(self, product, size, color=None, quantity=1):
+        """
+        Satırı tek ifadelik bir upsert ile ekler ya da adedini artırır:
+        INSERT ... ON CONFLICT DO UPDATE SET quantity = quantity + excluded.quantity.
+        Eşzamanlı eklemelerde artış kaybolmaz ve unique_cart_item'a takılıp
+        IntegrityError oluşmaz (okuma-değiştirme-yazma yok).
+        """
+        quantity = int(quantity)
+        if not self._supports_add_upsert():
+            item, created = CartItem.objects.get_or_create(
+                cart=self, product=product, size=size, color=color, defaults={'quantity': quantity}
+            )
+            if not created:
+                CartItem.objects.filter(pk=item.pk).update(quantity=models.F('quantity') + quantity)
+                item.refresh_from_db(fields=['quantity'])
+            return item
+
+        qn = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"{self._add_sql(color is None, 1)} RETURNING {qn('id')}, {qn('quantity')}",
+                [self.pk, product.pk, size.pk, color.pk if color else None, quantity],
+            )
+            item_id, total = cursor.fetchone()
+        item = CartItem(id=item_id, cart=self, product=product, size=size, color=color, quantity=total)
+        item._state.adding = False
         return item
 
+    def add_items(self, quantities):
+        """
+        add_item'ın toplu hali: {(ürün id, beden id, renk id | None): adet}.
+        Renkli ve renksiz satırlar birer upsert ile yazılır; adetler mutlak
+        değer olarak değil artış olarak uygulanır.
+        """
+        quantities = {key: int(quantity) for key, quantity in quantities.items() if quantity}
+        if not self._supports_add_upsert():
+            for (product_id, size_id, color_id), quantity in quantities.items():
+                item, created = CartItem.objects.get_or_create(
+                    cart=self, product_id=product_id, size_id=size_id, color_id=color_id,
+                    defaults={'quantity': quantity},
+                )
+                if not created:
+                    CartItem.objects.filter(pk=item.pk).update(quantity=models.F('quantity') + quantity)
+            return
+        for colorless in (True, False):
+            rows = [
+                (self.pk, product_id, size_id, color_id, quantity)
+                for (product_id, size_id, color_id), quantity in quantities.items()
+                if (color_id is None) == colorless
+            ]
+            if rows:
+                with connection.cursor() as cursor:
+                    cursor.execute(self._add_sql(colorless, len(rows)), [value for row in rows for value in row])
+
+
+# --- STOK REZERVASYONU ---
+
+class InsufficientStock(Exception):
+    def __init__(self, available, size_id=None):
+        super().__init__(f"Yetersiz stok. Mevcut: {available}")
+        self.available = available
+        self.size_id = size_id
+
+
+class StockReservationQuerySet(models.QuerySet):
+    def active(self, now=None):
+        return self.filter(expires_at__gt=now or timezone.now())
+
+    def expired(self, now=None):
+        return self.filter(expires_at__lte=now or timezone.now())
+
+    def hold(self, cart, size, quantity):
+        """
+        Sepetin bu bedendeki toplam rezervasyonunu `quantity` adede çeker ve
+        sepetin tüm rezervasyonlarının süresini uzatır. Diğer sepetlerin aktif
+        rezervasyonları düşüldükten sonra stok yetmezse InsufficientStock fırlatır.
+        """
+        now = timezone.now()
+        expires_at = now + timezone.timedelta(minutes=getattr(settings, 'STOCK_HOLD_MINUTES', 15))
+        with transaction.atomic():
+            if quantity <= 0:
+                self.filter(cart=cart, size=size).delete()
+            else:
+                # Aynı bedene eşzamanlı rezervasyonları sıraya sokmak için tek satır kilidi
+                stock = ProductSize.objects.select_for_update().values_list('stock', flat=True).get(pk=size.pk)
+                held_by_others = (
+                    self.active(now).filter(size=size).exclude(cart=cart)
+                    .aggregate(total=models.Sum('quantity'))['total'] or 0
+                )
+                if stock - held_by_others < quantity:
+                    raise InsufficientStock(max(stock - held_by_others, 0))
+                self.update_or_create(
+                    cart=cart, size=size, defaults={'quantity': quantity, 'expires_at': expires_at}
+                )
+            self.filter(cart=cart).update(expires_at=expires_at)
+            # Rezervasyon listelerdeki available_stock'u değiştirir
+            transaction.on_commit(bump_catalog_version)
+
+    def available_for(self, cart, size_ids, now=None, lock=False):
+        """
+        {beden id: stok - diğer sepetlerin aktif rezervasyonları} tek sorguda;
+        lock=True ise beden satırları (id sırasıyla) kilitlenir.
+        """
+        held_by_others = (
+            self.active(now).filter(size=models.OuterRef('pk')).exclude(cart=cart)
+            .values('size').annotate(total=models.Sum('quantity')).values('total')
+        )
+        sizes = ProductSize.objects.filter(pk__in=size_ids).order_by('pk')
+        if lock:
+            sizes = sizes.select_for_update()
+        rows = sizes.annotate(
+            held=Coalesce(models.Subquery(held_by_others, output_field=models.PositiveIntegerField()), 0)
+        ).values_list('pk', 'stock', 'held')
+        return {size_id: stock - held for size_id, stock, held in rows}
+
+    def hold_many(self, cart, quantities):
+        """
+        hold()'un toplu hali: {beden id: sepetteki toplam adet}. Bedenler tek
+        sorguda (id sırasıyla) kilitlenip diğer sepetlerin rezervasyonlarıyla
+        karşılaştırılır, rezervasyonlar tek upsert ile yazılır. Adedi 0 olan
+        bedenlerin rezervasyonu bırakılır.
+        """
+        now = timezone.now()
+        expires_at = now + timezone.timedelta(minutes=getattr(settings, 'STOCK_HOLD_MINUTES', 15))
+        wanted = {size_id: quantity for size_id, quantity in quantities.items() if quantity > 0}
+        with transaction.atomic():
+            released = [size_id for size_id, quantity in quantities.items() if quantity <= 0]
+            if released:
+                self.filter(cart=cart, size_id__in=released).delete()
+            if wanted:
+                for size_id, available in self.available_for(cart, wanted, now=now, lock=True).items():
+                    if available < wanted[size_id]:
+                        raise InsufficientStock(max(available, 0), size_id=size_id)
+                self.bulk_create(
+                    [self.model(cart=cart, size_id=size_id, quantity=quantity, expires_at=expires_at)
+                     for size_id, quantity in wanted.items()],
+                    update_conflicts=True, unique_fields=['cart', 'size'], update_fields=['quantity', 'expires_at'],
+                )
+            self.filter(cart=cart).update(expires_at=expires_at)
+            transaction.on_commit(bump_catalog_version)
+
+    def sync_cart_size(self, cart, size):
+        """Rezervasyonu sepetteki güncel toplam adede eşitler (bedenin tüm renkleri)."""
+        total = CartItem.objects.filter(cart=cart, size=size).aggregate(total=models.Sum('quantity'))['total']
+        self.hold(cart, size, total or 0)
+
+
+class StockReservation(models.Model):
+    """Sepete eklenen adedi STOCK_HOLD_MINUTES boyunca başka sepetlere karşı tutar."""
+    cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name='reservations')
+    size = models.ForeignKey(ProductSize, on_delete=models.CASCADE, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = StockReservationQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'size'], name='unique_cart_reservation'),
+        ]
+
+    def __str__(self):
+        return f"Cart {self.cart_id} - {self.size} x {self.quantity}"
+
 
 # --- SİPARİŞ YAPILARI ---
 
@@ -235,6 +693,11 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='order_user_newest_idx'),
+        ]
+
     def __str__(self):
         return f"Sipariş #{self.id} - {self.user.email} ({self.status})"
 
@@ -258,17 +721,243 @@ class OrderItem(models.Model):
 
 # --- ETKİLEŞİM MODELLERİ ---
 
+class FavoriteQuerySet(models.QuerySet):
+    """
+    Favori satırı ile Product.favorite_count aynı transaction'da değişir;
+    sayaç yalnızca satır gerçekten eklendiğinde / silindiğinde F() ile
+    artırılır (eşzamanlı çift tıklama sayacı iki kez değiştirmez). Kayan
+    sayaçlar reconcile_favorite_counts ile düzeltilir.
+    """
+
+    def add(self, user, product_id):
+        """Favoriye ekler; satır yeni eklendiyse True."""
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    self.create(user=user, product_id=product_id)
+            except IntegrityError:
+                return False
+            Product.objects.filter(pk=product_id).update(favorite_count=models.F('favorite_count') + 1)
+            ProductActivity.objects.bump('favorites', {product_id: 1})
+        return True
+
+    def remove(self, user, product_id):
+        """Favoriden çıkarır; satır silindiyse True."""
+        with transaction.atomic():
+            deleted, _ = self.filter(user=user, product_id=product_id).delete()
+            if deleted:
+                Product.objects.filter(pk=product_id).update(favorite_count=Greatest(models.F('favorite_count') - 1, 0))
+        return bool(deleted)
+
+    def ids_for(self, user, product_ids):
+        """product_ids içinden kullanıcının favorilediği id'ler (tek sorgu)."""
+        if not user.is_authenticated or not product_ids:
+            return set()
+        return set(self.filter(user=user, product_id__in=product_ids).values_list('product_id', flat=True))
+
+
 class Favorite(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='favorites')
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='favorited_by')
 
+    objects = FavoriteQuerySet.as_manager()
+
     class Meta:
         unique_together = ('user', 'product')
 
 
+def increment_upsert(model, conflict_fields, rows, increment_fields):
+    """
+    rows: {kolon (attname): değer} sözlükleri (hepsinde aynı anahtarlar). Yeni
+    satırlar eklenir, conflict_fields'ta çakışanlarda increment_fields mevcut
+    değere eklenir: INSERT ... ON CONFLICT (...) DO UPDATE SET f = f + excluded.f
+    (okuma-değiştirme-yazma yok, eşzamanlı artışlar kaybolmaz).
+    """
+    if not rows:
+        return
+    names = list(rows[0])
+    if not connection.features.supports_update_conflicts_with_target:
+        for row in rows:
+            keys = {name: row[name] for name in conflict_fields}
+            with transaction.atomic():
+                increments = {name: models.F(name) + row[name] for name in increment_fields}
+                if not model.objects.filter(**keys).update(**increments):
+                    model.objects.create(**row)
+        return
+
+    opts = model._meta
+    fields = [opts.get_field(name) for name in names]
+    qn = connection.ops.quote_name
+    table = qn(opts.db_table)
+    columns = ', '.join(qn(field.column) for field in fields)
+    conflict = ', '.join(qn(opts.get_field(name).column) for name in conflict_fields)
+    updates = ', '.join(
+        f'{column} = {table}.{column} + excluded.{column}'
+        for column in (qn(opts.get_field(name).column) for name in increment_fields)
+    )
+    placeholders = '(' + ', '.join(['%s'] * len(fields)) + ')'
+    # SQLite'ın eski 999 parametre sınırının altında kalır
+    batch_size = max(1, 900 // len(fields))
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            params = [
+                field.get_db_prep_save(row[name], connection)
+                for row in batch for name, field in zip(names, fields)
+            ]
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) VALUES {", ".join([placeholders] * len(batch))} '
+                f'ON CONFLICT ({conflict}) DO UPDATE SET {updates}',
+                params,
+            )
+
+
+ACTIVITY_SIGNALS = ('views', 'favorites', 'cart_adds', 'sales')
+
+
+class ProductActivityQuerySet(models.QuerySet):
+    def bump(self, signal, counts, day=None):
+        """{ürün id: adet} artışlarını günün kovasına tek upsert ile ekler."""
+        if signal not in ACTIVITY_SIGNALS:
+            raise ValueError(f"Bilinmeyen sinyal: {signal}")
+        day = day or timezone.localdate()
+        rows = [
+            {'product_id': product_id, 'day': day, **{name: amount if name == signal else 0 for name in ACTIVITY_SIGNALS}}
+            for product_id, amount in counts.items() if amount
+        ]
+        increment_upsert(self.model, ['product_id', 'day'], rows, [signal])
+
+
+class ProductActivity(models.Model):
+    """Popülerlik sinyallerinin ürün başına günlük kovaları (bkz. store/ranking.py)."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='activity')
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    favorites = models.PositiveIntegerField(default=0)
+    cart_adds = models.PositiveIntegerField(default=0)
+    sales = models.PositiveIntegerField(default=0)
+
+    objects = ProductActivityQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'day'], name='unique_product_activity_day'),
+        ]
+        indexes = [
+            # Skor penceresi ve eski kovaların silinmesi güne göre taranır
+            models.Index(fields=['day'], name='product_activity_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} @ {self.day}"
+
+
+class ProductCooccurrence(models.Model):
+    """
+    İki ürünün aynı siparişte bulunduğu sipariş sayısı (product == other:
+    ürünün sipariş sayısı). build_recommendations doldurur, bkz. store/recommendations.py.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    other = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    orders = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'other'], name='unique_product_cooccurrence'),
+        ]
+
+
+class ProductRecommendation(models.Model):
+    """Ürün başına en yüksek skorlu "birlikte alınanlar" (rank 0 en iyisi)."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='recommendations')
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='recommended_for')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    orders = models.PositiveIntegerField(help_text="Birlikte alındıkları sipariş sayısı")
+
+    class Meta:
+        ordering = ['product', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'rank'], name='unique_product_recommendation_rank'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_id} ({self.score:.3f})"
+
+
+class RecommendationBuild(models.Model):
+    """build_recommendations çalıştırmaları; sonuncusunun last_order_id'sinden sonraki siparişler artımlı işlenir."""
+    created_at = models.DateTimeField(auto_now_add=True)
+    full = models.BooleanField(default=False)
+    last_order_id = models.PositiveBigIntegerField(default=0)
+    orders = models.PositiveIntegerField(default=0)
+    products = models.PositiveIntegerField(default=0, help_text="Önerileri yeniden hesaplanan ürün sayısı")
+    duration_ms = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"#{self.pk} {'tam' if self.full else 'artımlı'} (sipariş <= {self.last_order_id})"
+
+
+class ProductFacet(models.Model):
+    """
+    Ürün listesi filtre indeksi: görünür ürünlerin her beden x renk birleşimi
+    için bir satır. Yalnızca store/facets.py'deki sync_product_facets yazar.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='facets')
+    # Kategori ile başlayan bileşik indeksler FK indeksinin yerini tutar
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+', db_index=False)
+    size_value = models.FloatField()
+    color = models.CharField(max_length=50, blank=True)  # '': renk tanımlı değil
+    price = models.DecimalField(max_digits=10, decimal_places=2)  # bedenin effective_price'ı
+    price_bucket = models.PositiveSmallIntegerField()  # FACET_PRICE_BUCKETS sınırlarına göre
+    in_stock = models.BooleanField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', 'size_value'], name='facet_cat_size_idx'),
+            models.Index(fields=['category', 'color'], name='facet_cat_color_idx'),
+            models.Index(fields=['size_value'], name='facet_size_idx'),
+            models.Index(fields=['color'], name='facet_color_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} - {self.size_value:g} {self.color}".rstrip()
+
+
+class FacetCount(models.Model):
+    """
+    Süzgeçsiz (yalnızca kategori) listelerin facet sayıları: değere sahip
+    görünür ürün sayısı. sync_product_facets artımlı günceller.
+    """
+    category_id = models.PositiveIntegerField(default=0)  # 0: tüm katalog
+    facet = models.CharField(max_length=10)  # size / color / price / in_stock
+    value = models.CharField(max_length=50)
+    products = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['category_id', 'facet', 'value'], name='unique_facet_count'),
+        ]
+
+    def __str__(self):
+        return f"{self.category_id}:{self.facet}={self.value} ({self.products})"
+
+
 class Review(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reviews')
     comment = models.TextField()
     is_approved = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Ürün sayfasında yalnızca onaylı yorumlar, en yeniden eskiye
+            models.Index(
+                fields=['product', '-created_at'], name='review_product_approved_idx',
+                condition=models.Q(is_approved=True),
+            ),
+        ]
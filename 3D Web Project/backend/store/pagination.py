@@ -0,0 +1,141 @@
+"""
+Sayfalama: varsayılan sayfa numarası (frontend Home.jsx), istenirse keyset.
+
+`?pagination=cursor` (ya da bir `cursor` parametresi) ile KeysetPagination
+devreye girer: sıralama alanı + id ikilisi üzerinden
+`alan < v OR (alan = v AND id < pk)` ile ilerler; COUNT(*) ve OFFSET taraması yapmaz, derin sayfalar da ilk sayfa
+kadar ucuzdur. Sıralama `?ordering=` ile seçilir (view.keyset_orderings).
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# ?ordering= değeri -> azalan sıralama alanı (eşitlikte id ile ayrılır)
+KEYSET_ORDERINGS = {
+    'newest': 'created_at',
+    'popular': 'view_count',
+    'favorites': 'favorite_count',
+    # compute_trending_scores ile önceden hesaplanır (bkz. store/ranking.py)
+    'trending': 'trending_score',
+    'bestselling': 'recent_sales',
+}
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    default_ordering = 'newest'
+    invalid_cursor_message = 'Geçersiz cursor.'
+
+    def __init__(self, page_size):
+        self.page_size = page_size
+
+    def get_orderings(self, view):
+        return getattr(view, 'keyset_orderings', KEYSET_ORDERINGS)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        orderings = self.get_orderings(view)
+        key = request.query_params.get(self.ordering_query_param, self.default_ordering)
+        self.field = orderings.get(key, orderings[self.default_ordering])
+        model_field = queryset.model._meta.get_field(self.field)
+
+        cursor = self.decode_cursor(request, model_field)
+        self.reverse = bool(cursor and cursor['reverse'])
+        if cursor is None:
+            qs = queryset.order_by(f'-{self.field}', '-pk')
+        elif not self.reverse:
+            qs = queryset.filter(
+                Q(**{f'{self.field}__lt': cursor['value']})
+                | Q(**{self.field: cursor['value'], 'pk__lt': cursor['pk']})
+            ).order_by(f'-{self.field}', '-pk')
+        else:
+            qs = queryset.filter(
+                Q(**{f'{self.field}__gt': cursor['value']})
+                | Q(**{self.field: cursor['value'], 'pk__gt': cursor['pk']})
+            ).order_by(self.field, 'pk')
+
+        rows = list(qs[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, obj, reverse):
+        # Model nesnesi ya da values() satırı (bkz. store.plain)
+        if isinstance(obj, dict):
+            value, pk = obj[self.field], obj['id']
+        else:
+            value, pk = getattr(obj, self.field), obj.pk
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        payload = json.dumps({'v': value, 'pk': pk, 'r': reverse}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, 'pagination', 'cursor')
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model_field):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            return {
+                'value': model_field.to_python(payload['v']),
+                'pk': int(payload['pk']),
+                'reverse': bool(payload.get('r')),
+            }
+        except (TypeError, ValueError, KeyError, ValidationError):
+            # ValidationError: çözülebilen ama alanın tipine uymayan değer (ör. tarih yerine metin)
+            raise NotFound(self.invalid_cursor_message)
+
+
+class CatalogPagination(BasePagination):
+    """İsteğe göre sayfa numarası ya da keyset sayfalamasına devreder."""
+
+    @staticmethod
+    def wants_cursor(request):
+        return request.query_params.get('pagination') == 'cursor' or 'cursor' in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.wants_cursor(request):
+            page_number = PageNumberPagination()
+            self.delegate = KeysetPagination(page_size=page_number.page_size)
+        else:
+            self.delegate = PageNumberPagination()
+        return self.delegate.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return PageNumberPagination().get_paginated_response_schema(schema)
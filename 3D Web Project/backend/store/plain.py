@@ -0,0 +1,195 @@
+"""
+Salt-okunur liste endpoint'leri için "düz" serializer'lar.
+
+ModelSerializer her nesne için alan nesneleri üzerinden dolaşır; ürün
+listesinde CPU süresinin çoğu buradadır. Buradaki sınıflar aynı JSON'u
+`.values()` satırlarından doğrudan dict kurarak üretir: ilişkiler
+(beden/renk/galeri, sipariş kalemleri) tek bir values() sorgusuyla
+toplanır, skaler biçimlendirme (Decimal, datetime, dosya URL'si) DRF
+alanlarının to_representation'ı ile yapılır ki çıktı bire bir aynı kalsın.
+
+settings.API_PLAIN_SERIALIZERS ile açılır (bkz. PlainListMixin).
+?fields= / ?expand= seçimleri (serializers.selected_fields) aynen uygulanır.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from rest_framework import serializers
+
+from .images import srcset
+from .models import OrderItem, Product, ProductColor, ProductImage, ProductSize
+from .serializers import (
+    OrderSerializer, ProductCardSerializer, ProductListSerializer, selected_fields,
+)
+
+_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+_total = serializers.DecimalField(max_digits=12, decimal_places=2)
+_datetime = serializers.DateTimeField()
+
+
+def plain_serializers_enabled():
+    return getattr(settings, 'API_PLAIN_SERIALIZERS', False)
+
+
+def _decimal(field, value):
+    return None if value is None else field.to_representation(value)
+
+
+def _datetime_or_none(value):
+    return None if value is None else _datetime.to_representation(value)
+
+
+def _file_url(model, field_name, request):
+    storage = model._meta.get_field(field_name).storage
+
+    def url(name):
+        if not name:
+            return None
+        value = storage.url(name)
+        return request.build_absolute_uri(value) if request is not None else value
+    return url
+
+
+def _group(rows, key):
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[row.pop(key)].append(row)
+    return grouped
+
+
+class PlainProductSerializer:
+    """ProductListSerializer / ProductCardSerializer çıktısının values() karşılığı."""
+
+    # Alan -> gereken values() kolonları
+    COLUMNS = {
+        'id': ('id',), 'slug': ('slug',), 'name_tr': ('name_tr',), 'name_en': ('name_en',),
+        'price': ('price',), 'min_price': ('min_price',), 'currency': ('currency',),
+        'has_stock': ('has_stock',), 'has_3d': ('has_3d',), 'thumbnail': ('thumbnail',),
+        'thumbnail_srcset': ('thumbnail_variants',), 'view_count': ('view_count',),
+        'favorite_count': ('favorite_count',), 'category': ('category_id',),
+        'display_name': ('localized_name',),
+    }
+    RELATIONS = ('sizes', 'colors', 'images')
+
+    def __init__(self, serializer_class, request):
+        self.request = request
+        self.fields = selected_fields(serializer_class, request)
+        self.thumbnail_url = _file_url(Product, 'thumbnail', request)
+        self.image_url = _file_url(ProductImage, 'image', request)
+
+    def values(self, queryset, extra=()):
+        columns = {'id', *extra}
+        for name in self.fields:
+            columns.update(self.COLUMNS.get(name, ()))
+        return queryset.prefetch_related(None).values(*columns)
+
+    def build(self, rows):
+        rows = list(rows)
+        ids = [row['id'] for row in rows]
+        relations = {name: self._relation(name, ids) for name in self.RELATIONS if name in self.fields}
+        return [self._product(row, relations) for row in rows]
+
+    def _product(self, row, relations):
+        data = {}
+        for name in self.fields:
+            if name in relations:
+                data[name] = relations[name].get(row['id'], [])
+            elif name in ('price', 'min_price'):
+                data[name] = _decimal(_price, row[name])
+            elif name == 'thumbnail':
+                data[name] = self.thumbnail_url(row['thumbnail'])
+            elif name == 'thumbnail_srcset':
+                data[name] = srcset(row['thumbnail_variants'], self.request)
+            elif name == 'category':
+                data[name] = row['category_id']
+            elif name == 'display_name':
+                data[name] = row['localized_name']
+            else:
+                data[name] = row[name]
+        return data
+
+    def _relation(self, name, ids):
+        if name == 'sizes':
+            rows = ProductSize.objects.with_available().filter(product_id__in=ids).values(
+                'product_id', 'id', 'size_value', 'stock', 'held_quantity', 'price_override',
+                'effective_price', 'discount_ends_at',
+            )
+            sizes = []
+            for row in rows:
+                sizes.append({
+                    'product_id': row['product_id'],
+                    'id': row['id'],
+                    'size_value': row['size_value'],
+                    'stock': row['stock'],
+                    'available_stock': max(row['stock'] - row['held_quantity'], 0),
+                    'price_override': _decimal(_price, row['price_override']),
+                    'current_price': row['effective_price'],
+                    'discount_ends_at': _datetime_or_none(row['discount_ends_at']),
+                })
+            return _group(sizes, 'product_id')
+        if name == 'colors':
+            return _group(
+                ProductColor.objects.filter(product_id__in=ids).values('product_id', 'id', 'name', 'hex_code'),
+                'product_id',
+            )
+        images = []
+        for row in ProductImage.objects.filter(product_id__in=ids).values(
+            'product_id', 'id', 'image', 'variants', 'order'
+        ):
+            images.append({
+                'product_id': row['product_id'],
+                'id': row['id'],
+                'image': self.image_url(row['image']),
+                'srcset': srcset(row['variants'], self.request),
+                'order': row['order'],
+            })
+        return _group(images, 'product_id')
+
+
+class PlainOrderSerializer:
+    """OrderSerializer çıktısının values() karşılığı."""
+
+    def __init__(self, serializer_class, request):
+        self.fields = selected_fields(serializer_class, request)
+
+    def values(self, queryset, extra=()):
+        columns = {'id', *extra} | {name for name in self.fields if name != 'items'}
+        return queryset.prefetch_related(None).values(*columns)
+
+    def build(self, rows):
+        rows = list(rows)
+        items = defaultdict(list)
+        if 'items' in self.fields:
+            for item in OrderItem.objects.filter(order_id__in=[row['id'] for row in rows]).values(
+                'order_id', 'id', 'product_name', 'size_value', 'price', 'quantity'
+            ):
+                items[item['order_id']].append({
+                    'id': item['id'],
+                    'product_name': item['product_name'],
+                    'size_value': item['size_value'],
+                    'price': _decimal(_price, item['price']),
+                    'quantity': item['quantity'],
+                    'line_total': item['price'] * item['quantity'],
+                })
+        result = []
+        for row in rows:
+            data = {}
+            for name in self.fields:
+                if name == 'items':
+                    data[name] = items.get(row['id'], [])
+                elif name == 'total':
+                    data[name] = _decimal(_total, row['total'])
+                elif name in ('created_at', 'updated_at'):
+                    data[name] = _datetime_or_none(row[name])
+                else:
+                    data[name] = row[name]
+            result.append(data)
+        return result
+
+
+# serializer sınıfı -> düz karşılığı
+PLAIN_SERIALIZERS = {
+    ProductListSerializer: PlainProductSerializer,
+    ProductCardSerializer: PlainProductSerializer,
+    OrderSerializer: PlainOrderSerializer,
+}
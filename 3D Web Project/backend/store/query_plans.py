@@ -0,0 +1,120 @@
+"""
+Sık çalışan sorgu biçimleri ve plan denetimi (manage.py check_query_plans).
+
+Her kayıt, view'ların ürettiği sorgunun aynısını kurar ve asıl tablosunu
+bildirir. Komut bu sorguları büyük sentetik veri üzerinde EXPLAIN eder; asıl
+tabloda sıralı tarama (PostgreSQL: "Seq Scan on", SQLite: indekssiz "SCAN")
+görülürse ilgili indeks eksik/kullanılmıyor demektir. Yeni bir sıcak sorgu
+eklerken indeksini models.py Meta'sına, sorgusunu buraya ekleyin.
+"""
+import re
+
+from django.db.models import Count, Q
+
+from .models import Cart, CartItem, Coupon, Order, Product, ProductFacet, Review, StockReservation
+
+PAGE_SIZE = 24
+HOT_QUERIES = {}
+
+SEQ_SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    # "SCAN store_product USING INDEX ..." indeks sırasıyla okur; yalnız "SCAN store_product" tam taramadır
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(\w+)(?: AS \w+)?\s*$', re.MULTILINE),
+}
+
+# Sıralamanın indeksten okunmadığını gösterir (hata değil, uyarı)
+SORT_PATTERNS = {
+    'postgresql': re.compile(r'^\s*(?:->\s*)?(?:Incremental )?Sort\b', re.MULTILINE),
+    'sqlite': re.compile(r'USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY'),
+}
+
+
+def hot_query(name, model):
+    def register(build):
+        HOT_QUERIES[name] = (model._meta.db_table, build)
+        return build
+    return register
+
+
+def seq_scans(plan, vendor):
+    """Plan metninde sıralı taranan tablo adları."""
+    return set(SEQ_SCAN_PATTERNS[vendor].findall(plan))
+
+
+def sorts_in_memory(plan, vendor):
+    return bool(SORT_PATTERNS[vendor].search(plan))
+
+
+@hot_query('ürün listesi (en yeni)', Product)
+def newest_products(ctx):
+    return Product.objects.filter(is_visible=True).order_by('-created_at', '-id')[:PAGE_SIZE]
+
+
+@hot_query('ürün listesi (kategori)', Product)
+def category_products(ctx):
+    return (
+        Product.objects.filter(is_visible=True, category_id=ctx['category_id'])
+        .order_by('-created_at', '-id')[:PAGE_SIZE]
+    )
+
+
+@hot_query('ürün listesi (popüler, keyset)', Product)
+def popular_products(ctx):
+    # Keyset sayfası: (view_count, id) < son satır
+    return (
+        Product.objects.filter(is_visible=True)
+        .filter(Q(view_count__lt=ctx['view_count']) | Q(view_count=ctx['view_count'], id__lt=ctx['product_id']))
+        .order_by('-view_count', '-id')[:PAGE_SIZE]
+    )
+
+
+@hot_query('ürün listesi (trend)', Product)
+def trending_products(ctx):
+    return Product.objects.filter(is_visible=True).order_by('-trending_score', '-id')[:PAGE_SIZE]
+
+
+@hot_query('ürün listesi (facet filtresi)', Product)
+def faceted_products(ctx):
+    facets = ProductFacet.objects.filter(size_value=ctx['size_value'], in_stock=True)
+    return (
+        Product.objects.filter(is_visible=True, category_id=ctx['category_id'], pk__in=facets.values('product_id'))
+        .order_by('-created_at', '-id')[:PAGE_SIZE]
+    )
+
+
+@hot_query('facet sayıları (süzgeçli)', ProductFacet)
+def facet_counts(ctx):
+    return (
+        ProductFacet.objects.filter(category_id=ctx['category_id'], size_value=ctx['size_value'])
+        .order_by().values('color').annotate(n=Count('product', distinct=True))
+    )
+
+
+@hot_query('aktif sepet', Cart)
+def active_cart(ctx):
+    return Cart.objects.filter(user_id=ctx['user_id'], is_completed=False)
+
+
+@hot_query('sepet satırları', CartItem)
+def cart_items(ctx):
+    return CartItem.objects.filter(cart_id=ctx['cart_id'])
+
+
+@hot_query('stok rezervasyonları', StockReservation)
+def held_by_others(ctx):
+    return StockReservation.objects.active().filter(size_id=ctx['size_id']).exclude(cart_id=ctx['cart_id'])
+
+
+@hot_query('sipariş geçmişi', Order)
+def order_history(ctx):
+    return Order.objects.filter(user_id=ctx['user_id']).order_by('-created_at', '-id')[:PAGE_SIZE]
+
+
+@hot_query('aktif kuponlar', Coupon)
+def active_coupons(ctx):
+    return Coupon.objects.active()
+
+
+@hot_query('onaylı yorumlar', Review)
+def approved_reviews(ctx):
+    return Review.objects.filter(product_id=ctx['product_id'], is_approved=True).order_by('-created_at')[:PAGE_SIZE]
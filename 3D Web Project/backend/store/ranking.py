@@ -0,0 +1,113 @@
+"""
+Popülerlik sıralaması (?ordering=trending / bestselling).
+
+Görüntülenme, favori, sepete ekleme ve satış sinyalleri ProductActivity'de
+ürün başına günlük kovalarda toplanır (ProductActivity.objects.bump).
+compute_trending_scores komutu (cron ile örn. 15 dakikada bir) pencere
+içindeki kovaları tek gruplu sorguyla toplar:
+
+    trending_score = Σ ağırlık(sinyal) * adet * 0.5 ** (kova yaşı / yarı ömür)
+    recent_sales   = son BESTSELLING_WINDOW_DAYS gündeki satış adedi
+
+ve sonucu Product'taki indeksli kolonlara yazar; liste isteği toplama
+yapmaz, (skor, id) indeksini okur.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+from .cache import bump_catalog_version
+from .models import ACTIVITY_SIGNALS, Product, ProductActivity
+
+DEFAULT_WEIGHTS = {'views': 1, 'favorites': 5, 'cart_adds': 8, 'sales': 20}
+UPDATE_BATCH_SIZE = 500
+
+
+def trending_settings():
+    weights = {**DEFAULT_WEIGHTS, **getattr(settings, 'TRENDING_WEIGHTS', {})}
+    return {
+        'weights': {signal: float(weights[signal]) for signal in ACTIVITY_SIGNALS},
+        'half_life': float(getattr(settings, 'TRENDING_HALF_LIFE_DAYS', 3)),
+        'window': int(getattr(settings, 'TRENDING_WINDOW_DAYS', 14)),
+        'sales_window': int(getattr(settings, 'BESTSELLING_WINDOW_DAYS', 30)),
+    }
+
+
+def decay(age_days, half_life):
+    return 0.5 ** (age_days / half_life)
+
+
+def aggregate_scores(today=None):
+    """{ürün id: (trending_score, recent_sales)}: pencere içinde etkinliği olan ürünler."""
+    config = trending_settings()
+    today = today or timezone.localdate()
+    # Kova yaşı -> çarpan; pencere dışındaki kovalar 0 ile çarpılır
+    factor = models.Case(
+        *[
+            models.When(day=today - timedelta(days=age), then=models.Value(decay(age, config['half_life'])))
+            for age in range(config['window'])
+        ],
+        default=models.Value(0.0),
+        output_field=models.FloatField(),
+    )
+    signal = sum(
+        (models.F(name) * models.Value(weight) for name, weight in config['weights'].items()),
+        models.Value(0.0),
+    )
+    rows = (
+        ProductActivity.objects
+        .filter(day__gt=today - timedelta(days=max(config['window'], config['sales_window'])))
+        .order_by().values('product')
+        .annotate(
+            score=models.Sum(models.ExpressionWrapper(signal * factor, output_field=models.FloatField())),
+            sales=models.Sum('sales', filter=models.Q(day__gt=today - timedelta(days=config['sales_window']))),
+        )
+        .values_list('product', 'score', 'sales')
+    )
+    return {product_id: (round(score or 0, 4), sales or 0) for product_id, score, sales in rows}
+
+
+def compute_scores(today=None, prune=True):
+    """
+    Skorları hesaplayıp yalnızca değişen ürünleri toplu UPDATE ... CASE ile
+    yazar; pencereden düşen ürünler sıfırlanır. Değişen ürün sayısını döner.
+    """
+    config = trending_settings()
+    today = today or timezone.localdate()
+    scores = aggregate_scores(today)
+
+    # Etkinliği kalmamış ama skoru/satışı sıfır olmayan ürünler de güncellenir
+    since = today - timedelta(days=max(config['window'], config['sales_window']))
+    active = ProductActivity.objects.filter(product=models.OuterRef('pk'), day__gt=since)
+    stored = Product.objects.filter(
+        models.Exists(active) | models.Q(trending_score__gt=0) | models.Q(recent_sales__gt=0)
+    ).values_list('pk', 'trending_score', 'recent_sales')
+    changed = [
+        (pk, *scores.get(pk, (0.0, 0))) for pk, score, sales in stored.iterator(chunk_size=5000)
+        if (score, sales) != scores.get(pk, (0.0, 0))
+    ]
+
+    with transaction.atomic():
+        for start in range(0, len(changed), UPDATE_BATCH_SIZE):
+            batch = changed[start:start + UPDATE_BATCH_SIZE]
+            Product.objects.filter(pk__in=[pk for pk, _, _ in batch]).update(
+                trending_score=models.Case(
+                    *[models.When(pk=pk, then=models.Value(score)) for pk, score, _ in batch],
+                    output_field=models.FloatField(),
+                ),
+                recent_sales=models.Case(
+                    *[models.When(pk=pk, then=models.Value(sales)) for pk, _, sales in batch],
+                    output_field=models.PositiveIntegerField(),
+                ),
+            )
+        if prune:
+            # Hiçbir pencerenin kullanmadığı kovalar
+            keep_days = max(config['window'], config['sales_window'])
+            ProductActivity.objects.filter(day__lte=today - timedelta(days=keep_days)).delete()
+
+    if changed:
+        # Önbellekteki trending / bestselling listeleri yenilensin
+        bump_catalog_version()
+    return len(changed)
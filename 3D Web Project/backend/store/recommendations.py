@@ -0,0 +1,251 @@
+"""
+"Birlikte sık satın alınanlar" önerileri (GET /products/<id>/related/).
+
+build_recommendations komutu (cron ile) OrderItem geçmişinden ürün-ürün
+birlikte alınma sayılarını çıkarır:
+
+  * Siparişler x ürünler seyrek 0/1 matrisi X kurulur; C = Xᵀ·X birlikte
+    alınma sayılarıdır, köşegeni ürünün sipariş sayısıdır. NumPy/SciPy
+    kuruluysa vektörel, değilse saf Python (sepet başına ikililer) hesaplanır.
+  * Skor kosinüs benzerliğidir: C[a, b] / sqrt(C[a, a] * C[b, b]); çok satan
+    ürünler her listeye girmez.
+  * Sayılar ProductCooccurrence'ta tutulur; artımlı çalıştırmada yalnızca son
+    çalıştırmadan sonraki siparişlerin katkısı eklenir ve yalnızca ilk
+    RECOMMENDATION_TOP_K önerisi değişebilecek ürünlerinki (yeni siparişlerdeki
+    ürünler ve bunlardan birini öneren ürünler) yeniden yazılır.
+
+İptal edilen siparişler sayılmaz. Artımlı çalıştırma sonradan iptal edilen
+siparişleri geri almaz; --full ile sıfırdan kurulur.
+"""
+import heapq
+import math
+import time
+from collections import defaultdict
+from datetime import timedelta
+from itertools import chain, combinations
+
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from .cache import bump_catalog_version
+from .models import (
+    Order, OrderItem, ProductCooccurrence, ProductRecommendation, RecommendationBuild, increment_upsert,
+)
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # isteğe bağlı: pip install numpy scipy
+    np = sparse = None
+
+EXCLUDED_STATUSES = ('cancelled',)
+# Toptan siparişler birlikte alınma bilgisi taşımaz, ikili sayısı da karesel büyür
+MAX_BASKET_SIZE = 50
+WRITE_BATCH_SIZE = 5000
+
+
+def recommendation_settings():
+    return {
+        'top_k': int(getattr(settings, 'RECOMMENDATION_TOP_K', 12)),
+        'min_support': int(getattr(settings, 'RECOMMENDATION_MIN_SUPPORT', 1)),
+        # Hâlâ açık olabilecek checkout transaction'larının siparişleri sonraki turda işlenir
+        'settle_seconds': int(getattr(settings, 'RECOMMENDATION_SETTLE_SECONDS', 60)),
+    }
+
+
+def vectorized_available():
+    return sparse is not None
+
+
+def basket_lines(after_order_id, upto_order_id):
+    """(sipariş id, ürün id) satırları; aynı siparişte tekrar eden ürün ayıklanmaz."""
+    return (
+        OrderItem.objects.filter(
+            order_id__gt=after_order_id, order_id__lte=upto_order_id, product_id__isnull=False,
+        )
+        .exclude(order__status__in=EXCLUDED_STATUSES)
+        .order_by().values_list('order_id', 'product_id')
+        .iterator(chunk_size=WRITE_BATCH_SIZE)
+    )
+
+
+def cooccurrence_numpy(lines):
+    """Seyrek X (sipariş x ürün) ile C = Xᵀ·X; (ürün, diğer, sayı) dizileri."""
+    pairs = np.fromiter(chain.from_iterable(lines), dtype=np.int64).reshape(-1, 2)
+    if not len(pairs):
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    orders, rows = np.unique(pairs[:, 0], return_inverse=True)
+    products, cols = np.unique(pairs[:, 1], return_inverse=True)
+    basket = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int64), (rows, cols)), shape=(len(orders), len(products)),
+    )
+    basket.sum_duplicates()
+    basket.data[:] = 1
+    sizes = np.diff(basket.indptr)
+    if (sizes > MAX_BASKET_SIZE).any():
+        basket = basket[sizes <= MAX_BASKET_SIZE]
+    counts = (basket.T @ basket).tocoo()
+    return products[counts.row], products[counts.col], counts.data.astype(np.int64)
+
+
+def cooccurrence_python(lines):
+    baskets = defaultdict(set)
+    for order_id, product_id in lines:
+        baskets[order_id].add(product_id)
+    counts = defaultdict(int)
+    for items in baskets.values():
+        if len(items) > MAX_BASKET_SIZE:
+            continue
+        for product_id in items:
+            counts[product_id, product_id] += 1
+        for a, b in combinations(items, 2):
+            counts[a, b] += 1
+            counts[b, a] += 1
+    return [a for a, _ in counts], [b for _, b in counts], list(counts.values())
+
+
+def top_neighbours_numpy(product, other, count, diag, top_k, min_support):
+    """{ürün: [(ilgili, skor, sayı), ...]}: skor, sayı azalan; eşitlikte küçük id önce."""
+    product, other, count = np.asarray(product), np.asarray(other), np.asarray(count)
+    keep = (product != other) & (count >= min_support)
+    product, other, count = product[keep], other[keep], count[keep]
+    if not len(product):
+        return {}
+    diag_ids = np.fromiter(diag.keys(), dtype=np.int64, count=len(diag))
+    diag_counts = np.fromiter(diag.values(), dtype=np.float64, count=len(diag))
+    order = np.argsort(diag_ids)
+    diag_ids, diag_counts = diag_ids[order], diag_counts[order]
+    norm = np.sqrt(
+        diag_counts[np.searchsorted(diag_ids, product)] * diag_counts[np.searchsorted(diag_ids, other)]
+    )
+    score = count / norm
+    # Ürüne göre grupla, grup içinde skor / sayı azalan, id artan
+    order = np.lexsort((other, -count, -score, product))
+    product, other, count, score = product[order], other[order], count[order], score[order]
+    starts = np.flatnonzero(np.r_[True, product[1:] != product[:-1]])
+    rank = np.arange(len(product)) - np.repeat(starts, np.diff(np.r_[starts, len(product)]))
+    top = rank < top_k
+    result = defaultdict(list)
+    for a, b, s, n in zip(product[top].tolist(), other[top].tolist(), score[top].tolist(), count[top].tolist()):
+        result[a].append((b, s, n))
+    return result
+
+
+def top_neighbours_python(product, other, count, diag, top_k, min_support):
+    candidates = defaultdict(list)
+    for a, b, n in zip(product, other, count):
+        if a != b and n >= min_support:
+            candidates[a].append((n / math.sqrt(diag[a] * diag[b]), n, -b))
+    return {
+        a: [(-negative_b, s, n) for s, n, negative_b in heapq.nlargest(top_k, items)]
+        for a, items in candidates.items()
+    }
+
+
+def insert_cooccurrence(triples):
+    """Tam kurulumda milyonlarca satır: model nesnesi kurmadan executemany ile yazılır."""
+    opts = ProductCooccurrence._meta
+    qn = connection.ops.quote_name
+    columns = ', '.join(qn(opts.get_field(name).column) for name in ('product', 'other', 'orders'))
+    sql = f'INSERT INTO {qn(opts.db_table)} ({columns}) VALUES (%s, %s, %s)'
+    with connection.cursor() as cursor:
+        for start in range(0, len(triples), WRITE_BATCH_SIZE):
+            cursor.executemany(sql, triples[start:start + WRITE_BATCH_SIZE])
+
+
+def _recommendations(products, neighbours):
+    return [
+        ProductRecommendation(product_id=product_id, related_id=related_id, rank=rank, score=score, orders=n)
+        for product_id in products
+        for rank, (related_id, score, n) in enumerate(neighbours.get(product_id, ()))
+    ]
+
+
+def write_recommendations(products, neighbours):
+    """products'ın önerilerini neighbours ile değiştirir (önerisi kalmayanlarınki silinir)."""
+    products = list(products)
+    for start in range(0, len(products), WRITE_BATCH_SIZE):
+        ProductRecommendation.objects.filter(product_id__in=products[start:start + WRITE_BATCH_SIZE]).delete()
+    ProductRecommendation.objects.bulk_create(_recommendations(products, neighbours), batch_size=WRITE_BATCH_SIZE)
+
+
+def build(full=False, vectorized=None, settle_seconds=None):
+    """
+    Önerileri günceller ve RecommendationBuild kaydını döner. İlk çalıştırma
+    (ya da full=True) tüm siparişleri, sonrakiler yalnızca yeni siparişleri işler.
+    """
+    config = recommendation_settings()
+    if vectorized is None:
+        vectorized = vectorized_available()
+    cooccurrence = cooccurrence_numpy if vectorized else cooccurrence_python
+    top_neighbours = top_neighbours_numpy if vectorized else top_neighbours_python
+    if settle_seconds is None:
+        settle_seconds = config['settle_seconds']
+
+    started = time.perf_counter()
+    last = RecommendationBuild.objects.first()
+    full = full or last is None
+    after_order_id = 0 if full else last.last_order_id
+    settled = Order.objects.filter(created_at__lte=timezone.now() - timedelta(seconds=settle_seconds))
+    upto_order_id = max(settled.aggregate(last=models.Max('id'))['last'] or 0, after_order_id)
+    orders = Order.objects.filter(id__gt=after_order_id, id__lte=upto_order_id).count()
+
+    product, other, count = cooccurrence(basket_lines(after_order_id, upto_order_id))
+    triples = list(zip(_tolist(product), _tolist(other), _tolist(count)))
+    with transaction.atomic():
+        if full:
+            ProductCooccurrence.objects.all().delete()
+            insert_cooccurrence(triples)
+            diag = {a: n for a, b, n in triples if a == b}
+            affected = set(diag)
+            neighbours = top_neighbours(product, other, count, diag, config['top_k'], config['min_support'])
+            ProductRecommendation.objects.all().delete()
+            ProductRecommendation.objects.bulk_create(
+                _recommendations(affected, neighbours), batch_size=WRITE_BATCH_SIZE,
+            )
+        else:
+            touched = {a for a, _, _ in triples}
+            increment_upsert(
+                ProductCooccurrence, ['product_id', 'other_id'],
+                [{'product_id': a, 'other_id': b, 'orders': n} for a, b, n in triples],
+                ['orders'],
+            )
+            # Yeni siparişte olmayan bir ürünün sayıları değişmez; yalnızca köşegeni büyüyen
+            # ürünlere skoru düşer. Bu yüzden ilk K'sı ancak o ürünlerden birini zaten
+            # öneriyorsa değişebilir.
+            affected = set(touched)
+            touched_ids = list(touched)
+            for start in range(0, len(touched_ids), WRITE_BATCH_SIZE):
+                affected.update(
+                    ProductRecommendation.objects.filter(related_id__in=touched_ids[start:start + WRITE_BATCH_SIZE])
+                    .values_list('product_id', flat=True)
+                )
+            rows = []
+            affected_ids = list(affected)
+            for start in range(0, len(affected_ids), WRITE_BATCH_SIZE):
+                rows += ProductCooccurrence.objects.filter(
+                    product_id__in=affected_ids[start:start + WRITE_BATCH_SIZE],
+                ).values_list('product_id', 'other_id', 'orders')
+            diag = dict(
+                ProductCooccurrence.objects.filter(product_id=models.F('other_id')).values_list('product_id', 'orders')
+            )
+            neighbours = top_neighbours(
+                [a for a, _, _ in rows], [b for _, b, _ in rows], [n for _, _, n in rows],
+                diag, config['top_k'], config['min_support'],
+            )
+            write_recommendations(affected, neighbours)
+        record = RecommendationBuild.objects.create(
+            full=full, last_order_id=upto_order_id, orders=orders, products=len(affected),
+            duration_ms=int((time.perf_counter() - started) * 1000),
+        )
+
+    if affected:
+        # Önbellekteki /related/ yanıtları yenilensin
+        bump_catalog_version()
+    return record
+
+
+def _tolist(values):
+    return values.tolist() if hasattr(values, 'tolist') else values
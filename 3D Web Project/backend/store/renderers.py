@@ -0,0 +1,44 @@
+"""
+orjson tabanlı JSON renderer / parser (isteğe bağlı: pip install orjson).
+
+Çıktı DRF'in JSONRenderer'ı ile aynıdır (sıkışık, UTF-8, U+2028/2029
+kaçışlı). orjson'ın kendi datetime biçimi yerine DRF encoder'ı
+kullanılır ("...Z"); Decimal, lazy çeviri metni vb. de aynı yoldan geçer.
+orjson kurulu değilse ya da ?indent istenirse DRF'in stdlib yoluna düşülür.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # isteğe bağlı bağımlılık
+    orjson = None
+
+if orjson is not None:
+    OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    _encoder = JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        ret = orjson.dumps(data, default=_encoder.default, option=OPTIONS)
+        # JSONRenderer ile aynı: JavaScript'te satır sonu sayılan karakterler kaçışlanır
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
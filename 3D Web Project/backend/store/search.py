@@ -0,0 +1,115 @@
+"""
+Ürün tam metin araması.
+
+PostgreSQL: Product.search_vector (tsvector) dile özel yapılandırmalarla
+(turkish / english / german) bir trigger tarafından güncel tutulur, GIN
+indeksiyle sorgulanır ve ts_rank ile sıralanır. Yazım hatalarına karşı ad
+alanlarında pg_trgm benzerliği (GIN trigram indeksi) de eşleşme sayılır.
+
+SQLite (testler / yerel geliştirme): aynı alanlar store_product_fts adlı
+FTS5 tablosunda tutulur, bm25 ile sıralanır. Bu tablo trigger ile değil
+sinyaller (sync_search_index) ile güncellenir; toplu yazımlardan sonra
+rebuild_search_index çağrılmalıdır.
+"""
+import re
+
+from django.db import connection, models
+from django.db.models.functions import Greatest
+
+SEARCH_LANGUAGES = {
+    'tr': 'turkish',
+    'en': 'english',
+    'de': 'german',
+}
+SEARCH_FIELDS = ('name_tr', 'name_en', 'name_de', 'description_tr', 'description_en', 'description_de')
+FTS_TABLE = 'store_product_fts'
+# Yazım hatası toleransı: bu alanlarda pg_trgm benzerliği (% operatörü, eşik 0.3) de eşleşme sayılır
+TRIGRAM_FIELDS = ('name_tr', 'name_en', 'name_de')
+# SQLite yedeği yalnızca test/geliştirme içindir; en alakalı bu kadar sonuç döner
+SQLITE_MAX_RESULTS = 1000
+
+
+def tokenize(query):
+    return re.findall(r'\w+', query.lower())[:10]
+
+
+def search_products(queryset, query, lang='en'):
+    """queryset'i aramaya göre süzer ve search_rank'e göre (yüksekten düşüğe) sıralar."""
+    terms = tokenize(query)
+    if not terms:
+        return queryset
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(queryset, query, terms, lang)
+    if connection.vendor == 'sqlite':
+        return _search_sqlite(queryset, terms)
+    q = models.Q()
+    for field in SEARCH_FIELDS:
+        q |= models.Q(**{f'{field}__icontains': query})
+    return queryset.filter(q)
+
+
+def _search_postgresql(queryset, query, terms, lang):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+
+    # Her terim önek olarak eşleşir: "ayak" -> "ayakkabı"
+    raw = ' & '.join(f'{term}:*' for term in terms)
+    search_query = (
+        SearchQuery(raw, search_type='raw', config=SEARCH_LANGUAGES.get(lang, 'simple'))
+        | SearchQuery(raw, search_type='raw', config='simple')
+    )
+    typo_match = models.Q()
+    for field in TRIGRAM_FIELDS:
+        typo_match |= models.Q(**{f'{field}__trigram_similar': query})
+
+    return queryset.annotate(
+        search_rank=SearchRank(models.F('search_vector'), search_query),
+        similarity=Greatest(*[TrigramSimilarity(f, query) for f in TRIGRAM_FIELDS]),
+    ).filter(models.Q(search_vector=search_query) | typo_match).order_by('-search_rank', '-similarity', '-id')
+
+
+def _search_sqlite(queryset, terms):
+    match = ' '.join(f'"{term}"*' for term in terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, bm25({FTS_TABLE}) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY bm25({FTS_TABLE}) LIMIT {SQLITE_MAX_RESULTS}',
+            [match],
+        )
+        ranked = cursor.fetchall()
+    if not ranked:
+        return queryset.none()
+    # bm25 küçük olan daha iyi; search_rank büyük olan daha iyi olsun
+    rank = models.Case(
+        *[models.When(pk=pk, then=models.Value(-score)) for pk, score in ranked],
+        output_field=models.FloatField(),
+    )
+    return queryset.filter(pk__in=[pk for pk, _ in ranked]).annotate(search_rank=rank).order_by('-search_rank', '-id')
+
+
+def sync_search_index(product_ids):
+    """SQLite FTS tablosunu verilen ürünler için yeniler (PostgreSQL'de trigger yapar)."""
+    if connection.vendor != 'sqlite':
+        return
+    from .models import Product
+
+    product_ids = list(product_ids)
+    rows = Product.objects.filter(pk__in=product_ids).values_list('pk', *SEARCH_FIELDS)
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(pk,) for pk in product_ids])
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(SEARCH_FIELDS)}) VALUES (%s, %s, %s, %s, %s, %s, %s)',
+            [tuple(value or '' for value in row) for row in rows],
+        )
+
+
+def rebuild_search_index():
+    """Tüm arama indeksini baştan kurar (toplu içe aktarma sonrası)."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # Trigger'ı tetikler
+            cursor.execute('UPDATE store_product SET name_tr = name_tr')
+        elif connection.vendor == 'sqlite':
+            columns = ', '.join(SEARCH_FIELDS)
+            coalesced = ', '.join(f"coalesce({field}, '')" for field in SEARCH_FIELDS)
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(f'INSERT INTO {FTS_TABLE} (rowid, {columns}) SELECT id, {coalesced} FROM store_product')
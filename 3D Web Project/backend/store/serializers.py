@@ -1,73 +1,137 @@
 from rest_framework import serializers
+
+from .i18n import translated
+from .images import srcset
 from .models import Product, ProductSize, ProductColor, ProductImage, Cart, CartItem, Category, Order, OrderItem
 
 
+def _split(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+def selected_fields(serializer_class, request):
+    """
+    İstekte yanıtlanacak alanlar: ?fields=a,b yalnızca bu alanları bırakır,
+    ?expand=x,y Meta.expandable_fields içindeki (varsayılanda gönderilmeyen)
+    alanları ekler. View'lar prefetch kararını da buna göre verir.
+    """
+    meta = serializer_class.Meta
+    expandable = set(getattr(meta, 'expandable_fields', ()))
+    params = request.query_params if request is not None else {}
+    wanted, expand = _split(params.get('fields')), _split(params.get('expand'))
+    return [
+        name for name in meta.fields
+        if name in expand or (name in wanted if wanted else name not in expandable)
+    ]
+
+
+class DynamicFieldsMixin:
+    """?fields= / ?expand= desteği; yalnızca kök serializer'a (many=True ise çocuğuna) uygulanır."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # İç içe tanımlı serializer'lar sınıf tanımında context'siz oluşturulur
+        request = self._context.get('request')
+        if request is None:
+            return
+        keep = set(selected_fields(type(self), request))
+        for name in list(self.fields):
+            if name not in keep:
+                self.fields.pop(name)
+
+
 # --- ÜRÜN SERIALIZERS ---
 
 class ProductImageSerializer(serializers.ModelSerializer):
+    srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = ProductImage
-        fields = ['id', 'image', 'order']
+        fields = ['id', 'image', 'srcset', 'order']
+
+    def get_srcset(self, obj):
+        return srcset(obj.variants, self.context.get('request'))
 
 
 class ProductSizeSerializer(serializers.ModelSerializer):
+    # stock − aktif sepet rezervasyonları (view'lar with_available() ile prefetch eder)
+    available_stock = serializers.ReadOnlyField()
+
     class Meta:
         model = ProductSize
-        fields = ['id', 'size_value', 'stock', 'price_override', 'current_price']
+        fields = ['id', 'size_value', 'stock', 'available_stock', 'price_override', 'current_price', 'discount_ends_at']
 
 class ProductColorSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductColor
         fields = ['id', 'name', 'hex_code']
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ProductListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     sizes = ProductSizeSerializer(many=True, read_only=True)
     colors = ProductColorSerializer(many=True, read_only=True)
     images = ProductImageSerializer(many=True, read_only=True)
     display_name = serializers.SerializerMethodField()
+    thumbnail_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
         fields = [
             'id', 'slug', 'name_tr', 'name_en', 'price', 'currency',
-            'thumbnail', 'view_count', 'favorite_count', 'sizes', 'colors', 'images', 'category',
-            'display_name',
+            'thumbnail', 'thumbnail_srcset', 'view_count', 'favorite_count', 'sizes', 'colors', 'images',
+            'category', 'display_name',
         ]
 
+    def get_thumbnail_srcset(self, obj):
+        return srcset(obj.thumbnail_variants, self.context.get('request'))
+
     def get_display_name(self, obj):
-        request = self.context.get('request')
-        lang = (request.headers.get('Accept-Language', '') if request else 'en').lower()
-        base_lang = lang.split('-')[0].split(',')[0]
-        return getattr(obj, f'name_{base_lang}', None) or getattr(obj, 'name_en', None) or getattr(obj, 'name_tr', None)
+        return translated(obj, 'name', self.context.get('request'))
+
+
+class ProductCardSerializer(ProductListSerializer):
+    """
+    Ürün ızgarası için kısa gösterim (?view=card): min_price / has_stock / has_3d
+    SQL'de hesaplanır (Product.objects.with_card_fields()); beden, renk ve
+    galeri yalnızca ?expand= ile gönderilir ve istenmedikçe prefetch edilmez.
+    """
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    has_stock = serializers.BooleanField(read_only=True)
+    has_3d = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = Product
+        fields = [
+            'id', 'slug', 'display_name', 'price', 'min_price', 'currency', 'has_stock', 'has_3d',
+            'thumbnail', 'thumbnail_srcset', 'sizes', 'colors', 'images',
+        ]
+        expandable_fields = ['sizes', 'colors', 'images']
 
 
-class ProductDetailSerializer(serializers.ModelSerializer):
+class ProductDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     sizes = ProductSizeSerializer(many=True, read_only=True)
     colors = ProductColorSerializer(many=True, read_only=True)
     images = ProductImageSerializer(many=True, read_only=True)
     display_name = serializers.SerializerMethodField()
     display_description = serializers.SerializerMethodField()
+    thumbnail_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
         fields = [
             'id', 'slug', 'name_tr', 'name_en', 'description_tr', 'description_en',
-            'price', 'currency', 'thumbnail', 'model_3d', 'model_3d_poster',
-            'view_count', 'favorite_count', 'sizes', 'colors', 'images', 'category',
+            'price', 'currency', 'thumbnail', 'thumbnail_srcset', 'model_3d', 'model_3d_poster',
+            'model_3d_lite', 'model_3d_meta', 'view_count', 'favorite_count', 'sizes', 'colors', 'images', 'category',
             'display_name', 'display_description',
         ]
 
     def get_display_name(self, obj):
-        request = self.context.get('request')
-        lang = (request.headers.get('Accept-Language', '') if request else 'en').lower()
-        base_lang = lang.split('-')[0].split(',')[0]
-        return getattr(obj, f'name_{base_lang}', None) or getattr(obj, 'name_en', None) or getattr(obj, 'name_tr', None)
+        return translated(obj, 'name', self.context.get('request'))
+
+    def get_thumbnail_srcset(self, obj):
+        return srcset(obj.thumbnail_variants, self.context.get('request'))
 
     def get_display_description(self, obj):
-        request = self.context.get('request')
-        lang = (request.headers.get('Accept-Language', '') if request else 'en').lower()
-        base_lang = lang.split('-')[0].split(',')[0]
-        return getattr(obj, f'description_{base_lang}', None) or getattr(obj, 'description_en', None) or getattr(obj, 'description_tr', None)
+        return translated(obj, 'description', self.context.get('request'))
 
 # --- SEPET SERIALIZERS (SIRALAMA ÖNEMLİ) ---
 
@@ -85,7 +149,7 @@ class CartItemSerializer(serializers.ModelSerializer):
             'color', 'quantity', 'current_price', 'total_item_price'
         ]
 
-class CartSerializer(serializers.ModelSerializer):
+class CartSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     # Sepetin içindeki tüm item'ları yukarıdaki serializer ile paketliyoruz
     items = CartItemSerializer(many=True, read_only=True)
     total_price = serializers.ReadOnlyField()
@@ -96,7 +160,7 @@ class CartSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'is_completed']
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     display_name = serializers.SerializerMethodField()
 
     class Meta:
@@ -104,10 +168,7 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name_tr', 'name_en', 'slug', 'display_name']
 
     def get_display_name(self, obj):
-        request = self.context.get('request')
-        lang = (request.headers.get('Accept-Language', '') if request else 'en').lower()
-        base_lang = lang.split('-')[0].split(',')[0]
-        return getattr(obj, f'name_{base_lang}', None) or getattr(obj, 'name_en', None) or getattr(obj, 'name_tr', None)
+        return translated(obj, 'name', self.context.get('request'))
 
 
 # --- SİPARİŞ SERIALIZERS ---
@@ -120,7 +181,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
         fields = ['id', 'product_name', 'size_value', 'price', 'quantity', 'line_total']
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
 
     class Meta:
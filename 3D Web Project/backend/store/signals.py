@@ -0,0 +1,84 @@
+"""
+Saklı fiyat kolonlarını (ProductSize.effective_price / discount_ends_at)
+ürün fiyatı ve kampanya değişikliklerinde güncel tutar; facet indeksini
+yeniler ve katalog önbelleğini geçersiz kılar.
+"""
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .cache import bump_catalog_version
+from .facets import remove_product_facets, sync_product_facets
+from .images import derivatives_for
+from .search import sync_search_index
+from .models import Product, Campaign, ProductSize, ProductColor, ProductImage, Category
+
+
+@receiver(post_save, sender=Product)
+def refresh_prices_on_product_save(sender, instance, created, update_fields=None, **kwargs):
+    # Yeni ürünün henüz bedeni yok; fiyata dokunmayan kayıtlar da atlanır
+    if created or (update_fields is not None and 'price' not in update_fields):
+        return
+    ProductSize.objects.filter(product=instance).refresh_effective_prices()
+
+
+@receiver(post_save, sender=Campaign)
+def refresh_prices_on_campaign_save(sender, instance, **kwargs):
+    ProductSize.objects.filter(campaign=instance).refresh_effective_prices()
+
+
+@receiver(post_delete, sender=Campaign)
+def refresh_prices_on_campaign_delete(sender, instance, **kwargs):
+    # SET_NULL sonrası kampanyasız kalan ama hâlâ indirimli görünen bedenler
+    ProductSize.objects.filter(campaign__isnull=True, discount_ends_at__isnull=False).refresh_effective_prices()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def sync_product_search_index(sender, instance, **kwargs):
+    # Yalnızca SQLite FTS tablosu için; PostgreSQL'de trigger günceller
+    sync_search_index([instance.pk])
+
+
+@receiver(post_save, sender=Product)
+def sync_facets_on_product_save(sender, instance, **kwargs):
+    # Görünürlük / kategori / fiyat değişikliği; fiyat sinyali yukarıda önce çalışır
+    sync_product_facets([instance.pk])
+
+
+@receiver(pre_delete, sender=Product)
+def remove_facets_on_product_delete(sender, instance, **kwargs):
+    remove_product_facets([instance.pk])
+
+
+@receiver(post_save, sender=ProductSize)
+@receiver(post_delete, sender=ProductSize)
+@receiver(post_save, sender=ProductColor)
+@receiver(post_delete, sender=ProductColor)
+def sync_facets_on_variant_change(sender, instance, **kwargs):
+    sync_product_facets([instance.product_id])
+
+
+@receiver(post_save, sender=Product)
+def build_thumbnail_derivatives(sender, instance, **kwargs):
+    variants = derivatives_for(instance.thumbnail, instance.thumbnail_variants)
+    if variants is not None:
+        instance.thumbnail_variants = variants
+        Product.objects.filter(pk=instance.pk).update(thumbnail_variants=variants)
+
+
+@receiver(post_save, sender=ProductImage)
+def build_gallery_derivatives(sender, instance, **kwargs):
+    variants = derivatives_for(instance.image, instance.variants)
+    if variants is not None:
+        instance.variants = variants
+        ProductImage.objects.filter(pk=instance.pk).update(variants=variants)
+
+
+CATALOG_MODELS = (Product, ProductSize, ProductColor, ProductImage, Category, Campaign)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_catalog_cache(sender, **kwargs):
+    if sender in CATALOG_MODELS:
+        bump_catalog_version()
@@ -1,15 +1,42 @@
+import base64
 from decimal import Decimal
+import json
+import shutil
+import tempfile
+import threading
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError, connection
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from .models import Category, Product, ProductSize, ProductColor, Cart, CartItem, Order, Coupon
+from core.media import serve_media
+
+from .cache import catalog_cache
+from .counters import view_counts
+from .facets import facet_counts, rebuild_product_facets
+from .gltf import read_glb
+from .i18n import LanguageNegotiationMiddleware, negotiate_language
+from .models import (
+    Category, Product, ProductSize, ProductColor, ProductImage, Cart, CartItem, Order, OrderItem, Coupon, Campaign,
+    StockReservation, Favorite, ProductActivity, ProductCooccurrence, ProductRecommendation, RecommendationBuild,
+    FacetCount,
+)
+from .query_plans import seq_scans, sorts_in_memory
+from .ranking import compute_scores
+from .recommendations import build as build_recommendations, vectorized_available
+from .renderers import FastJSONRenderer, orjson
 
 User = get_user_model()
 
@@ -90,6 +117,17 @@ def make_coupon(code='TEST10', percentage=10, max_uses=100):
     )
 
 
+def make_campaign(percentage=20, starts_in=None, ends_in=None, active=True):
+    now = timezone.now()
+    return Campaign.objects.create(
+        name='Kampanya',
+        discount_percentage=percentage,
+        start_date=now + (starts_in or timezone.timedelta(days=-1)),
+        end_date=now + (ends_in or timezone.timedelta(days=7)),
+        is_active=active,
+    )
+
+
 class CategoryListTests(TestCase):
     def test_category_list_returns_all_categories(self):
         make_category(slug='home')
@@ -253,3 +291,1438 @@ class RemoveItemTests(TestCase):
         response = self.client.delete(reverse('cart-remove-item', kwargs={'item_id': self.item.id}))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['items'], [])
+
+
+class BatchCartItemsTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.product = make_product(name='BatchProd')
+        self.color = make_color(self.product)
+        self.sizes = [make_size(self.product, val=40 + i, stock=5) for i in range(6)]
+        self.cart = Cart.objects.create(user=self.user, is_completed=False)
+        self.kept = CartItem.objects.create(cart=self.cart, product=self.product, size=self.sizes[0], quantity=1)
+        self.dropped = CartItem.objects.create(cart=self.cart, product=self.product, size=self.sizes[1], quantity=1)
+
+    def patch(self, operations):
+        return self.client.patch(reverse('cart-batch-items'), {'operations': operations}, format='json')
+
+    def test_applies_add_set_remove_in_one_request(self):
+        response = self.patch([
+            {'op': 'set', 'item_id': self.kept.id, 'quantity': 3},
+            {'op': 'remove', 'item_id': self.dropped.id},
+            {'op': 'add', 'product_id': self.product.id, 'size_id': self.sizes[2].id, 'color_id': self.color.id, 'quantity': 2},
+            {'op': 'add', 'product_id': self.product.id, 'size_id': self.sizes[2].id, 'color_id': self.color.id},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        quantities = {item['size']: item['quantity'] for item in response.data['items']}
+        self.assertEqual(quantities, {self.sizes[0].id: 3, self.sizes[2].id: 3})
+        held = dict(StockReservation.objects.filter(cart=self.cart).values_list('size_id', 'quantity'))
+        self.assertEqual(held, {self.sizes[0].id: 3, self.sizes[2].id: 3})
+
+    def test_query_count_does_not_grow_with_operations(self):
+        def operations(items, sizes):
+            return [{'op': 'set', 'item_id': item.id, 'quantity': 2} for item in items] + [
+                {'op': 'add', 'product_id': self.product.id, 'size_id': size.id} for size in sizes
+            ]
+
+        with CaptureQueriesContext(connection) as two:
+            self.patch(operations([self.kept], self.sizes[2:3]))
+        with CaptureQueriesContext(connection) as six:
+            self.patch(operations([self.kept, self.dropped], self.sizes[3:6]))
+        self.assertEqual(len(six.captured_queries), len(two.captured_queries))
+
+    def test_insufficient_stock_rolls_back_every_operation(self):
+        response = self.patch([
+            {'op': 'remove', 'item_id': self.dropped.id},
+            {'op': 'set', 'item_id': self.kept.id, 'quantity': 6},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual((response.data['size_id'], response.data['available']), (self.sizes[0].id, 5))
+        self.assertEqual(self.cart.items.count(), 2)
+
+        response = self.patch([{'op': 'set', 'item_id': 999999, 'quantity': 1}])
+        self.assertEqual((response.status_code, response.data['index']), (status.HTTP_404_NOT_FOUND, 0))
+
+
+class MergeCartTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.product = make_product(name='MergeProd')
+        self.color = make_color(self.product)
+        self.size = make_size(self.product, val=40, stock=4)
+        self.cart = Cart.objects.create(user=self.user, is_completed=False)
+        CartItem.objects.create(cart=self.cart, product=self.product, size=self.size, color=self.color, quantity=1)
+
+    def test_merges_lines_and_reports_each_one(self):
+        other = make_product(name='MergeOther')
+        hidden = make_product(name='MergeHidden', visible=False)
+        response = self.client.post(reverse('cart-merge-cart'), [
+            {'product_id': self.product.id, 'size_id': self.size.id, 'color_id': self.color.id, 'quantity': 2},
+            {'product_id': self.product.id, 'size_id': self.size.id, 'quantity': 5},
+            {'product_id': hidden.id, 'size_id': make_size(hidden, val=40).id, 'quantity': 1},
+            {'product_id': other.id, 'size_id': self.size.id, 'quantity': 1},
+            {'product_id': self.product.id, 'size_id': self.size.id, 'quantity': 1},
+            {'product_id': 'x'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([line['status'] for line in response.data['merge_report']], [
+            'merged', 'partial', 'not_found', 'not_found', 'out_of_stock', 'invalid',
+        ])
+        self.assertEqual(response.data['merge_report'][1]['quantity'], 1)
+        quantities = sorted(item['quantity'] for item in response.data['items'])
+        self.assertEqual(quantities, [1, 3])
+        self.assertEqual(StockReservation.objects.get(cart=self.cart, size=self.size).quantity, 4)
+
+    def test_query_count_is_independent_of_line_count(self):
+        sizes = [make_size(self.product, val=41 + i, stock=5) for i in range(30)]
+
+        def merge(count):
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.post(reverse('cart-merge-cart'), [
+                    {'product_id': self.product.id, 'size_id': size.id, 'color_id': self.color.id, 'quantity': 1}
+                    for size in sizes[:count]
+                ], format='json')
+            return len(ctx.captured_queries)
+
+        self.assertEqual(merge(3), merge(30))
+
+
+class EffectivePriceTests(TestCase):
+    def setUp(self):
+        self.product = make_product(name='PriceProd', price='100.00')
+        self.size = make_size(self.product, val=42, stock=5)
+
+    def test_effective_price_is_stored_on_save(self):
+        self.assertEqual(self.size.effective_price, Decimal('100.00'))
+        self.assertIsNone(self.size.discount_ends_at)
+
+        self.size.price_override = Decimal('80.00')
+        self.size.save()
+        self.size.refresh_from_db()
+        self.assertEqual(self.size.current_price, Decimal('80.00'))
+
+    def test_product_price_change_refreshes_sizes(self):
+        self.product.price = Decimal('150.00')
+        self.product.save()
+
+        self.size.refresh_from_db()
+        self.assertEqual(self.size.effective_price, Decimal('150.00'))
+
+    def test_campaign_save_and_delete_refresh_sizes(self):
+        campaign = make_campaign(percentage=25)
+        self.size.campaign = campaign
+        self.size.save()
+        self.assertEqual(self.size.effective_price, Decimal('75.00'))
+        self.assertEqual(self.size.discount_ends_at, campaign.end_date)
+
+        campaign.is_active = False
+        campaign.save()
+        self.size.refresh_from_db()
+        self.assertEqual(self.size.effective_price, Decimal('100.00'))
+
+        campaign.is_active = True
+        campaign.save()
+        campaign.delete()
+        self.size.refresh_from_db()
+        self.assertEqual(self.size.effective_price, Decimal('100.00'))
+        self.assertIsNone(self.size.discount_ends_at)
+
+    def test_refresh_command_applies_campaign_boundaries(self):
+        upcoming = make_campaign(percentage=50, starts_in=timezone.timedelta(days=1))
+        self.size.campaign = upcoming
+        self.size.save()
+        self.assertEqual(self.size.effective_price, Decimal('100.00'))
+
+        # Kampanya başladı: sinyal yok, komut yakalamalı
+        Campaign.objects.filter(pk=upcoming.pk).update(start_date=timezone.now() - timezone.timedelta(minutes=1))
+        call_command('refresh_effective_prices', stdout=StringIO())
+        self.size.refresh_from_db()
+        self.assertEqual(self.size.effective_price, Decimal('50.00'))
+
+        # Kampanya bitti
+        ended = timezone.now() - timezone.timedelta(seconds=1)
+        Campaign.objects.filter(pk=upcoming.pk).update(end_date=ended)
+        ProductSize.objects.filter(pk=self.size.pk).update(discount_ends_at=ended)
+        call_command('refresh_effective_prices', stdout=StringIO())
+        self.size.refresh_from_db()
+        self.assertEqual(self.size.effective_price, Decimal('100.00'))
+
+    def test_product_list_filters_by_price_range(self):
+        cheap = make_product(name='Cheap', price='20.00')
+        make_size(cheap, val=40)
+
+        response = self.client.get(reverse('product-list'), {'min_price': '50', 'max_price': '120'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = get_list_data(response)
+        self.assertEqual([p['id'] for p in results], [self.product.id])
+
+
+class CartTotalsTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.cart = Cart.objects.create(user=self.user, is_completed=False)
+
+    def add_lines(self, count, price='10.00'):
+        product = make_product(name=f'Tot{CartItem.objects.count()}', price=price)
+        for i in range(count):
+            size = make_size(product, val=36 + i, stock=10)
+            CartItem.objects.create(cart=self.cart, product=product, size=size, quantity=2)
+
+    def test_with_totals_applies_coupon(self):
+        self.add_lines(3)  # 3 x 2 x 10 = 60
+        self.cart.coupon = make_coupon(percentage=10)
+        self.cart.save()
+
+        cart = Cart.objects.with_totals().get(pk=self.cart.pk)
+        self.assertEqual(cart.total_price_before_coupon, Decimal('60.00'))
+        self.assertEqual(cart.discount_amount, Decimal('6.00'))
+        self.assertEqual(cart.total_price, Decimal('54.00'))
+
+        Coupon.objects.filter(pk=self.cart.coupon_id).update(discount_type='amount', discount_value=Decimal('100'))
+        cart = Cart.objects.with_totals().get(pk=self.cart.pk)
+        self.assertEqual(cart.total_price, Decimal('0.00'))
+
+    def test_with_totals_rounds_percentage_discount_like_python(self):
+        self.add_lines(1, price='16.67')  # 2 x 16.67 = 33.34
+        self.cart.coupon = make_coupon(percentage=15)  # 5.001
+        self.cart.save()
+
+        cart = Cart.objects.with_totals().get(pk=self.cart.pk)
+        self.assertEqual(cart.discount_amount, Decimal('5.00'))
+        self.assertEqual(cart.total_price, Decimal('28.34'))
+        self.assertEqual(cart.total_price, Cart.objects.get(pk=self.cart.pk).total_price)
+
+    def test_with_totals_empty_cart_is_zero(self):
+        cart = Cart.objects.with_totals().get(pk=self.cart.pk)
+        self.assertEqual(cart.total_price, Decimal('0.00'))
+
+    def test_my_cart_query_count_is_constant(self):
+        self.add_lines(1)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse('cart-my-cart'))
+
+        self.add_lines(8)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(reverse('cart-my-cart'))
+
+        self.assertEqual(len(response.data['items']), 9)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+
+class CheckoutTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.product = make_product(name='CheckoutProd', price='50.00')
+        self.cart = Cart.objects.create(user=self.user, is_completed=False)
+
+    def add_line(self, stock=10, quantity=1):
+        size = make_size(self.product, val=30 + self.product.sizes.count(), stock=stock)
+        CartItem.objects.create(cart=self.cart, product=self.product, size=size, quantity=quantity)
+        return size
+
+    def test_checkout_creates_order_and_decrements_stock(self):
+        size_a = self.add_line(stock=5, quantity=2)
+        size_b = self.add_line(stock=3, quantity=3)
+
+        response = self.client.post(reverse('cart-checkout'))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Decimal(str(response.data['total'])), Decimal('250.00'))
+        self.assertEqual(len(response.data['items']), 2)
+
+        size_a.refresh_from_db()
+        size_b.refresh_from_db()
+        self.assertEqual((size_a.stock, size_b.stock), (3, 0))
+        self.cart.refresh_from_db()
+        self.assertTrue(self.cart.is_completed)
+
+    def test_checkout_rolls_back_when_any_line_lacks_stock(self):
+        size_a = self.add_line(stock=5, quantity=2)
+        self.add_line(stock=1, quantity=2)
+
+        response = self.client.post(reverse('cart-checkout'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Yetersiz stok', response.data['error'])
+
+        size_a.refresh_from_db()
+        self.assertEqual(size_a.stock, 5)
+        self.assertFalse(Order.objects.exists())
+        self.cart.refresh_from_db()
+        self.assertFalse(self.cart.is_completed)
+
+    def test_checkout_query_count_is_independent_of_cart_size(self):
+        self.add_line()
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(reverse('cart-checkout'))
+
+        self.cart = Cart.objects.create(user=self.user, is_completed=False)
+        for _ in range(6):
+            self.add_line()
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post(reverse('cart-checkout'))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(OrderItem.objects.filter(order_id=response.data['id']).count(), 6)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class CheckoutConcurrencyTests(TransactionTestCase):
+    def test_concurrent_checkouts_never_oversell(self):
+        product = make_product(name='DropProd')
+        size = make_size(product, val=42, stock=3)
+        clients = []
+        for i in range(8):
+            user = make_user(email=f'buyer{i}@shop.com')
+            cart = Cart.objects.create(user=user, is_completed=False)
+            CartItem.objects.create(cart=cart, product=product, size=size, quantity=1)
+            client = APIClient()
+            client.force_authenticate(user=user)
+            clients.append(client)
+
+        barrier = threading.Barrier(len(clients))
+        codes = []
+
+        def buy(client):
+            try:
+                barrier.wait()
+                codes.append(client.post(reverse('cart-checkout')).status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buy, args=(c,)) for c in clients]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        size.refresh_from_db()
+        self.assertEqual(size.stock, 0)
+        self.assertEqual(codes.count(status.HTTP_201_CREATED), 3)
+        self.assertEqual(Order.objects.count(), 3)
+
+
+class FavoriteTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.products = [make_product(name=f'Fav{i}') for i in range(12)]
+
+    def toggle(self, product, **extra):
+        return self.client.post(reverse('favorite-toggle'), {'product_id': product.pk, **extra}, format='json')
+
+    def test_toggle_updates_counter(self):
+        product = self.products[0]
+        response = self.toggle(product)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'product_id': product.pk, 'is_favorite': True, 'favorite_count': 1})
+        # Açık durum isteği idempotent: sayaç iki kez artmaz
+        self.assertEqual(self.toggle(product, favorite=True).data['favorite_count'], 1)
+        response = self.toggle(product)
+        self.assertFalse(response.data['is_favorite'])
+        self.assertEqual(response.data['favorite_count'], 0)
+        self.assertFalse(Favorite.objects.filter(user=self.user).exists())
+
+    def test_toggle_rejects_hidden_product(self):
+        self.assertEqual(self.toggle(make_product(visible=False)).status_code, 404)
+        self.assertEqual(self.client.post(reverse('favorite-toggle'), {}, format='json').status_code, 400)
+
+    def test_check_uses_one_query_for_a_grid(self):
+        for product in self.products[:3]:
+            Favorite.objects.add(self.user, product.pk)
+        ids = ','.join(str(product.pk) for product in self.products)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('favorite-check'), {'ids': ids})
+        self.assertEqual(response.data['favorited'], sorted(product.pk for product in self.products[:3]))
+        self.assertEqual(self.client.get(reverse('favorite-check'), {'ids': 'a,b'}).status_code, 400)
+
+    def test_list_returns_latest_first(self):
+        first, second = self.products[:2]
+        Favorite.objects.add(self.user, first.pk)
+        Favorite.objects.add(self.user, second.pk)
+        Favorite.objects.add(make_user('other@shop.com'), self.products[2].pk)
+        response = self.client.get(reverse('favorite-list'))
+        self.assertEqual([row['id'] for row in response.data['results']], [second.pk, first.pk])
+        self.assertIn('min_price', response.data['results'][0])
+
+    def test_reconcile_fixes_drifted_counts(self):
+        first, second = self.products[:2]
+        Favorite.objects.add(self.user, first.pk)
+        Favorite.objects.create(user=self.user, product=second)
+        Product.objects.filter(pk=first.pk).update(favorite_count=7)
+        Product.objects.filter(pk=self.products[2].pk).update(favorite_count=3)
+
+        out = StringIO()
+        call_command('reconcile_favorite_counts', dry_run=True, stdout=out)
+        self.assertIn('3 ürünün', out.getvalue())
+        self.assertEqual(Product.objects.get(pk=first.pk).favorite_count, 7)
+
+        call_command('reconcile_favorite_counts', batch_size=2, stdout=StringIO())
+        counts = dict(Product.objects.filter(pk__in=[p.pk for p in self.products[:3]]).values_list('pk', 'favorite_count'))
+        self.assertEqual(counts, {first.pk: 1, second.pk: 1, self.products[2].pk: 0})
+
+
+class RankingTests(TestCase):
+    def setUp(self):
+        catalog_cache().clear()
+        self.today = timezone.localdate()
+
+    def days_ago(self, n):
+        return self.today - timezone.timedelta(days=n)
+
+    def test_bump_increments_daily_bucket(self):
+        product = make_product()
+        ProductActivity.objects.bump('views', {product.pk: 2})
+        ProductActivity.objects.bump('views', {product.pk: 3})
+        ProductActivity.objects.bump('sales', {product.pk: 1})
+        ProductActivity.objects.bump('views', {product.pk: 1}, day=self.days_ago(1))
+        rows = ProductActivity.objects.filter(product=product).order_by('day').values_list('day', 'views', 'sales')
+        self.assertEqual(list(rows), [(self.days_ago(1), 1, 0), (self.today, 5, 1)])
+        with self.assertRaises(ValueError):
+            ProductActivity.objects.bump('clicks', {product.pk: 1})
+
+    def test_signals_are_recorded(self):
+        product = make_product()
+        size = make_size(product, val=40, stock=5)
+        user = make_user()
+        client = APIClient()
+        client.force_authenticate(user=user)
+        view_counts.add(product.pk)
+        Favorite.objects.add(user, product.pk)
+        client.post(reverse('cart-add-to-cart'), {'product_id': product.pk, 'size_id': size.pk, 'quantity': 2}, format='json')
+        self.assertEqual(client.post(reverse('cart-checkout')).status_code, 201)
+        activity = ProductActivity.objects.get(product=product, day=self.today)
+        self.assertEqual(
+            (activity.views, activity.favorites, activity.cart_adds, activity.sales), (1, 1, 1, 2),
+        )
+
+    @override_settings(TRENDING_HALF_LIFE_DAYS=2, TRENDING_WINDOW_DAYS=14, BESTSELLING_WINDOW_DAYS=30)
+    def test_scores_decay_and_drive_ordering(self):
+        old_hit, rising, steady, stale = [make_product(name=name) for name in ('Old', 'Rising', 'Steady', 'Stale')]
+        ProductActivity.objects.bump('views', {old_hit.pk: 400}, day=self.days_ago(10))
+        ProductActivity.objects.bump('sales', {old_hit.pk: 9}, day=self.days_ago(20))
+        ProductActivity.objects.bump('views', {rising.pk: 40}, day=self.today)
+        ProductActivity.objects.bump('sales', {steady.pk: 3}, day=self.days_ago(2))
+        ProductActivity.objects.bump('sales', {stale.pk: 50}, day=self.days_ago(45))
+        Product.objects.filter(pk=stale.pk).update(trending_score=99, recent_sales=50)
+
+        self.assertEqual(compute_scores(), 4)
+        scores = dict(Product.objects.values_list('pk', 'trending_score'))
+        # 400 görüntülenme * 0.5^(10/2) = 12.5 < bugünkü 40
+        self.assertAlmostEqual(scores[old_hit.pk], 12.5)
+        self.assertEqual(scores[rising.pk], 40)
+        self.assertAlmostEqual(scores[steady.pk], 30)
+        self.assertEqual(scores[stale.pk], 0)
+        self.assertFalse(ProductActivity.objects.filter(product=stale).exists())
+        # Değişiklik yoksa yazma da yok
+        self.assertEqual(compute_scores(), 0)
+
+        response = self.client.get(reverse('product-list'), {'ordering': 'trending'})
+        self.assertEqual([row['id'] for row in response.data['results']][:3], [rising.pk, steady.pk, old_hit.pk])
+        response = self.client.get(reverse('product-list'), {'ordering': 'bestselling', 'pagination': 'cursor'})
+        self.assertEqual([row['id'] for row in response.data['results']][:2], [old_hit.pk, steady.pk])
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        catalog_cache().clear()
+        self.user = make_user()
+        self.a, self.b, self.c, self.d = [make_product(name=name) for name in 'ABCD']
+        for basket in ((self.a, self.b), (self.a, self.b, self.c), (self.a, self.c), (self.d,)):
+            self.order(*basket)
+        self.order(self.a, self.d, status='cancelled')
+
+    def order(self, *products, status='paid'):
+        order = Order.objects.create(user=self.user, total=100, status=status)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, product_name=product.name_en, size_value=40, price=50)
+            for product in products
+        ])
+        return order
+
+    def recommendations(self):
+        rows = ProductRecommendation.objects.values_list('product', 'related', 'orders')
+        result = {}
+        for product, related, orders in rows:
+            result.setdefault(product, []).append((related, orders))
+        return result
+
+    def test_full_build_scores_co_purchases(self):
+        record = build_recommendations(vectorized=False, settle_seconds=0)
+        self.assertTrue(record.full)
+        self.assertEqual(record.orders, 5)
+        self.assertEqual(self.recommendations(), {
+            self.a.pk: [(self.b.pk, 2), (self.c.pk, 2)],
+            self.b.pk: [(self.a.pk, 2), (self.c.pk, 1)],
+            self.c.pk: [(self.a.pk, 2), (self.b.pk, 1)],
+        })
+        score = ProductRecommendation.objects.get(product=self.b, related=self.c).score
+        # 1 / sqrt(2 * 2): iptal edilen sipariş sayılmaz
+        self.assertAlmostEqual(score, 0.5)
+
+    def test_settling_orders_wait_for_next_run(self):
+        record = build_recommendations(vectorized=False, settle_seconds=3600)
+        self.assertEqual((record.orders, record.products), (0, 0))
+        self.assertFalse(ProductRecommendation.objects.exists())
+
+    def test_incremental_build_matches_full_rebuild(self):
+        build_recommendations(vectorized=False, settle_seconds=0)
+        latest = self.order(self.c, self.d)
+        record = build_recommendations(vectorized=False, settle_seconds=0)
+        self.assertFalse(record.full)
+        self.assertEqual(record.orders, 1)
+        # Sonraki artımlı çalıştırma bu siparişten sonrasını işler
+        self.assertEqual(RecommendationBuild.objects.first().last_order_id, latest.pk)
+        incremental = self.recommendations()
+        scores = dict(ProductRecommendation.objects.values_list('pk', 'score'))
+
+        build_recommendations(full=True, vectorized=False, settle_seconds=0)
+        self.assertEqual(self.recommendations(), incremental)
+        self.assertEqual(incremental[self.d.pk], [(self.c.pk, 1)])
+        self.assertEqual(sorted(scores.values()), sorted(ProductRecommendation.objects.values_list('score', flat=True)))
+        self.assertEqual(ProductCooccurrence.objects.get(product=self.c, other=self.c).orders, 3)
+
+    @skipUnless(vectorized_available(), 'numpy/scipy kurulu değil')
+    def test_vectorized_build_matches_python(self):
+        build_recommendations(vectorized=False, settle_seconds=0)
+        expected = list(ProductRecommendation.objects.values_list('product', 'related', 'rank', 'score', 'orders'))
+        build_recommendations(full=True, vectorized=True, settle_seconds=0)
+        actual = list(ProductRecommendation.objects.values_list('product', 'related', 'rank', 'score', 'orders'))
+        self.assertEqual(actual, expected)
+        self.order(self.c, self.d)
+        build_recommendations(vectorized=True, settle_seconds=0)
+        self.assertEqual(self.recommendations()[self.d.pk], [(self.c.pk, 1)])
+
+    def test_related_endpoint_is_cached_and_falls_back_to_category(self):
+        build_recommendations(vectorized=False, settle_seconds=0)
+        url = reverse('product-related', kwargs={'id': self.a.pk})
+        response = self.client.get(url)
+        self.assertEqual([row['id'] for row in response.data], [self.b.pk, self.c.pk])
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+        lonely = make_product(category=self.d.category, name='Lonely')
+        response = self.client.get(reverse('product-related', kwargs={'id': lonely.pk}))
+        self.assertEqual([row['id'] for row in response.data], [self.d.pk])
+        self.assertEqual(self.client.get(reverse('product-related', kwargs={'id': 999999})).status_code, 404)
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        catalog_cache().clear()
+        self.category = make_category()
+        self.shoe = make_product(category=self.category, name='Shoe', price='100.00')
+        self.shoe_40 = make_size(self.shoe, val=40, stock=0)
+        make_size(self.shoe, val=42, stock=5)
+        make_color(self.shoe, name='Kırmızı')
+        make_color(self.shoe, name='Mavi')
+        self.boot = make_product(category=self.category, name='Boot', price='250.00')
+        self.boot_40 = make_size(self.boot, val=40, stock=3)
+        make_color(self.boot, name='Siyah')
+
+    def ids(self, **params):
+        response = self.client.get(reverse('product-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(p['id'] for p in get_list_data(response))
+
+    def stored_counts(self):
+        return dict(
+            ((row.category_id, row.facet, row.value), row.products)
+            for row in FacetCount.objects.filter(products__gt=0)
+        )
+
+    def test_filters_match_within_one_size_and_color(self):
+        self.assertEqual(self.ids(size='40', in_stock='1'), [self.boot.id])
+        self.assertEqual(self.ids(size='40,42', color='Kırmızı'), [self.shoe.id])
+        self.assertEqual(self.ids(color='Siyah,Mavi', min_price='200'), [self.boot.id])
+        self.assertEqual(self.ids(size='42', category=self.category.id, in_stock='true'), [self.shoe.id])
+
+        response = self.client.get(reverse('product-list'), {'size': 'büyük'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'Geçersiz beden.')
+
+    def test_facet_counts_from_index_and_with_filters(self):
+        with self.assertNumQueries(1):
+            facets = facet_counts({}, category_id=self.category.id)
+        self.assertEqual(facets['size'], [{'value': '40', 'count': 2}, {'value': '42', 'count': 1}])
+        self.assertEqual([c['value'] for c in facets['color']], ['Kırmızı', 'Mavi', 'Siyah'])
+        self.assertEqual(facets['price'], [
+            {'min': '100', 'max': '200', 'count': 1}, {'min': '200', 'max': '500', 'count': 1},
+        ])
+        self.assertEqual(facets['in_stock'], 2)
+
+        # Her facet kendi süzgeci dışındakilere göre sayılır
+        response = self.client.get(reverse('product-list'), {'size': '40', 'in_stock': '1', 'facets': '1'})
+        facets = response.data['facets']
+        self.assertEqual(facets['size'], [{'value': '40', 'count': 1}, {'value': '42', 'count': 1}])
+        self.assertEqual(facets['color'], [{'value': 'Siyah', 'count': 1}])
+        self.assertEqual(facets['in_stock'], 1)
+        self.assertNotIn('facets', self.client.get(reverse('product-list')).data)
+
+    def test_index_follows_stock_price_and_catalog_changes(self):
+        ProductSize.objects.decrement_stock({self.boot_40.pk: 3})
+        self.assertEqual(self.ids(size='40', in_stock='1'), [])
+
+        self.shoe.price = Decimal('30.00')
+        self.shoe.save()
+        self.assertEqual(self.ids(max_price='50'), [self.shoe.id])
+
+        self.boot.is_visible = False
+        self.boot.save()
+        self.assertEqual(self.ids(color='Siyah'), [])
+        make_color(self.shoe, name='Siyah')
+        self.assertEqual(self.ids(color='Siyah'), [self.shoe.id])
+
+        self.shoe.delete()
+        stored = self.stored_counts()
+        rebuild_product_facets()
+        self.assertEqual(stored, self.stored_counts())
+        self.assertEqual(stored, {})
+
+
+class ImportProductsTests(TestCase):
+    def setUp(self):
+        self.category = make_category(slug='shoes')
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def feed(self, name, content):
+        path = f'{self.dir}/{name}'
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def run_import(self, path, *args):
+        out = StringIO()
+        call_command('import_products', path, *args, stdout=out)
+        return out.getvalue()
+
+    def row(self, slug, **extra):
+        return json.dumps({
+            'slug': slug, 'name_tr': 'Koşu', 'name_en': 'Runner', 'category_slug': 'shoes', 'price': '100.00',
+            'sizes': [{'size_value': 40, 'stock': 3}, {'size_value': 41, 'stock': 0, 'price_override': '90'}],
+            'colors': [{'name': 'Siyah', 'hex_code': '#000000'}],
+            **extra,
+        }, ensure_ascii=False)
+
+    def test_jsonl_upserts_products_sizes_and_colors(self):
+        path = self.feed('feed.jsonl', '\n'.join([
+            self.row('runner', name_de='Läufer', description_de='Schuh'),
+            '{bozuk',
+            self.row('walker', category_slug='yok'),
+            self.row('trail'),
+        ]))
+        out = self.run_import(path, '--batch-size', '1')
+        self.assertIn('satır 2: JSON hatası', out)
+        self.assertIn('satır 3: Kategori bulunamadı: yok', out)
+        self.assertIn('2 yeni, 0 güncellenen ürün, 4 beden, 2 renk, 2 hata', out)
+
+        runner = Product.objects.get(slug='runner')
+        self.assertEqual(runner.name_de, 'Läufer')
+        self.assertEqual(
+            list(runner.sizes.values_list('size_value', 'effective_price')),
+            [(40.0, Decimal('100.00')), (41.0, Decimal('90.00'))],
+        )
+        self.assertEqual(self.client.get(reverse('product-list'), {'size': '40', 'color': 'Siyah'}).data['count'], 2)
+
+        # İkinci besleme: fiyat / stok değişir, yeni renk eklenir, name_de olmadığı için korunur
+        path = self.feed('update.jsonl', self.row(
+            'runner', price='80.00', sizes=[{'size_value': 40, 'stock': 0}],
+            colors=[{'name': 'Siyah', 'hex_code': '#111111'}, {'name': 'Beyaz', 'hex_code': '#ffffff'}],
+        ))
+        self.assertIn('0 yeni, 1 güncellenen ürün', self.run_import(path))
+        runner.refresh_from_db()
+        self.assertEqual((runner.price, runner.name_de), (Decimal('80.00'), 'Läufer'))
+        self.assertEqual(runner.sizes.get(size_value=40).effective_price, Decimal('80.00'))
+        self.assertEqual(dict(runner.colors.values_list('name', 'hex_code')), {'Siyah': '#111111', 'Beyaz': '#ffffff'})
+        in_stock = get_list_data(self.client.get(reverse('product-list'), {'size': '40', 'in_stock': '1'}))
+        self.assertEqual([p['slug'] for p in in_stock], ['trail'])
+
+    def test_csv_dry_run_writes_nothing(self):
+        path = self.feed('feed.csv', (
+            'slug,category_slug,name_tr,name_en,price,sizes,colors\n'
+            'csv-runner,shoes,Koşu,Runner,120,40:5;41:2:110,Mavi:#0000ff\n'
+            'csv-bad,shoes,Kötü,Bad,abc,,\n'
+        ))
+        out = self.run_import(path, '--dry-run')
+        self.assertIn('(dry-run, değişiklik yapılmadı)', out)
+        self.assertIn('satır 3: Geçersiz fiyat: abc', out)
+        self.assertFalse(Product.objects.filter(slug='csv-runner').exists())
+
+        self.run_import(path)
+        product = Product.objects.get(slug='csv-runner')
+        self.assertEqual(product.sizes.get(size_value=41).effective_price, Decimal('110.00'))
+        self.assertEqual(list(product.colors.values_list('name', flat=True)), ['Mavi'])
+
+
+class QueryPlanTests(TestCase):
+    def test_seq_scan_detection(self):
+        pg_plan = (
+            'Limit  (cost=0.29..2.10 rows=24 width=8)\n'
+            '  ->  Seq Scan on store_coupon  (cost=0.00..35.50 rows=3 width=8)\n'
+            '        Filter: (is_active AND (valid_from <= now()))'
+        )
+        self.assertEqual(seq_scans(pg_plan, 'postgresql'), {'store_coupon'})
+        sqlite_plan = '3 0 0 SCAN store_product USING INDEX product_visible_newest_idx\n7 0 0 SCAN store_review'
+        self.assertEqual(seq_scans(sqlite_plan, 'sqlite'), {'store_review'})
+        self.assertFalse(sorts_in_memory(sqlite_plan, 'sqlite'))
+        self.assertTrue(sorts_in_memory('5 0 0 USE TEMP B-TREE FOR ORDER BY', 'sqlite'))
+
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command('check_query_plans', products=2000, users=200, stdout=out)
+        self.assertNotIn('SIRALI TARAMA', out.getvalue())
+        self.assertFalse(Product.objects.filter(slug__startswith='query-plans').exists())
+
+
+class AtomicCartAddTests(TransactionTestCase):
+    # SQLite paylaşımlı önbellekte eşzamanlı yazarlar "table is locked" alır
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_concurrent_adds_never_lose_updates(self):
+        product = make_product(name='HotProd')
+        size = make_size(product, val=42, stock=100)
+        color = make_color(product)
+        cart = Cart.objects.create(user=make_user(), is_completed=False)
+        workers = 8
+        barrier = threading.Barrier(workers)
+        errors = []
+
+        def add(item_color):
+            try:
+                barrier.wait()
+                for _ in range(5):
+                    cart.add_item(product=product, size=size, color=item_color, quantity=1)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=add, args=(color if i % 2 else None,)) for i in range(workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        quantities = dict(CartItem.objects.filter(cart=cart).values_list('color_id', 'quantity'))
+        self.assertEqual(quantities, {None: 20, color.id: 20})
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_concurrent_batch_patches_never_lose_updates(self):
+        product = make_product(name='HotBatch')
+        size = make_size(product, val=42, stock=200)
+        color = make_color(product)
+        user = make_user()
+        cart = Cart.objects.create(user=user, is_completed=False)
+        cart.add_item(product=product, size=size, quantity=1)
+        workers = 8
+        barrier = threading.Barrier(workers)
+        errors = []
+
+        def patch(use_batch):
+            client = APIClient()
+            client.force_authenticate(user=user)
+            try:
+                barrier.wait()
+                for _ in range(5):
+                    if use_batch:
+                        response = client.patch(reverse('cart-batch-items'), {'operations': [
+                            {'op': 'add', 'product_id': product.pk, 'size_id': size.pk},
+                            {'op': 'add', 'product_id': product.pk, 'size_id': size.pk, 'color_id': color.pk},
+                        ]}, format='json')
+                    else:
+                        response = client.post(reverse('cart-add-to-cart'), {
+                            'product_id': product.pk, 'size_id': size.pk, 'color_id': color.pk,
+                        }, format='json')
+                    if response.status_code not in (200, 201):
+                        errors.append(response.data)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        # Yarısı PATCH /cart/items/, yarısı add_to_cart: biri diğerinin artışını ezmemeli
+        threads = [threading.Thread(target=patch, args=(i % 2 == 0,)) for i in range(workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        quantities = dict(CartItem.objects.filter(cart=cart).values_list('color_id', 'quantity'))
+        self.assertEqual(quantities, {None: 1 + 20, color.id: 20 + 20})
+        self.assertEqual(StockReservation.objects.get(cart=cart, size=size).quantity, 81)
+
+    def test_one_active_cart_per_user(self):
+        user = make_user()
+        Cart.objects.create(user=user, is_completed=False)
+        Cart.objects.create(user=user, is_completed=True)
+        with self.assertRaises(IntegrityError):
+            Cart.objects.create(user=user, is_completed=False)
+
+
+class StockReservationTests(TestCase):
+    def setUp(self):
+        self.product = make_product(name='HoldProd')
+        self.size = make_size(self.product, val=40, stock=3)
+        self.buyer = make_user(email='buyer@shop.com')
+        self.rival = make_user(email='rival@shop.com')
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+    def add(self, user, quantity):
+        return self.client_for(user).post(reverse('cart-add-to-cart'), {
+            'product_id': self.product.id,
+            'size_id': self.size.id,
+            'quantity': quantity,
+        })
+
+    def test_add_to_cart_holds_stock_against_other_carts(self):
+        self.assertEqual(self.add(self.buyer, 2).status_code, status.HTTP_201_CREATED)
+
+        response = self.add(self.rival, 2)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Mevcut: 1', response.data['error'])
+
+        detail = self.client.get(reverse('product-detail', kwargs={'id': self.product.id}))
+        self.assertEqual(detail.data['sizes'][0]['available_stock'], 1)
+
+    def test_expired_holds_are_released_and_swept(self):
+        self.add(self.buyer, 3)
+        StockReservation.objects.update(expires_at=timezone.now() - timezone.timedelta(seconds=1))
+
+        self.assertEqual(self.add(self.rival, 3).status_code, status.HTTP_201_CREATED)
+        call_command('expire_stock_reservations', stdout=StringIO())
+        self.assertEqual(StockReservation.objects.count(), 1)
+
+        # Süresi dolan sepet, başkasının tuttuğu stoğu checkout'ta alamaz
+        response = self.client_for(self.buyer).post(reverse('cart-checkout'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.size.refresh_from_db()
+        self.assertEqual(self.size.stock, 3)
+
+    def test_remove_and_checkout_release_holds(self):
+        self.add(self.buyer, 2)
+        item = CartItem.objects.get(cart__user=self.buyer)
+        self.client_for(self.buyer).delete(reverse('cart-remove-item', kwargs={'item_id': item.id}))
+        self.assertFalse(StockReservation.objects.exists())
+
+        self.add(self.buyer, 1)
+        response = self.client_for(self.buyer).post(reverse('cart-checkout'))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(StockReservation.objects.exists())
+        self.size.refresh_from_db()
+        self.assertEqual(self.size.available_stock, 2)
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        self.product = make_product(name='Cached')
+
+    def test_second_request_is_served_from_cache(self):
+        first = self.client.get(reverse('product-list'))
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('product-list'))
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+
+    def test_cache_is_keyed_by_language_and_params(self):
+        self.client.get(reverse('product-list'), HTTP_ACCEPT_LANGUAGE='tr')
+        self.assertEqual(self.client.get(reverse('product-list'), HTTP_ACCEPT_LANGUAGE='en')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(reverse('product-list'), {'page': 1})['X-Cache'], 'MISS')
+
+    def test_catalog_changes_invalidate_cache(self):
+        self.client.get(reverse('product-list'))
+        make_color(self.product)
+
+        response = self.client.get(reverse('product-list'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(get_list_data(response)[0]['colors']), 1)
+
+    def test_checkout_invalidates_cached_stock(self):
+        size = make_size(self.product, val=40, stock=5)
+        client = APIClient()
+        client.force_authenticate(user=make_user())
+        with self.captureOnCommitCallbacks(execute=True):
+            client.post(reverse('cart-add-to-cart'), {'product_id': self.product.pk, 'size_id': size.pk, 'quantity': 2}, format='json')
+        first = self.client.get(reverse('product-list'))
+        self.assertEqual(get_list_data(first)[0]['sizes'][0]['stock'], 5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(client.post(reverse('cart-checkout')).status_code, 201)
+        response = self.client.get(reverse('product-list'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(get_list_data(response)[0]['sizes'][0]['stock'], 3)
+
+
+class ConditionalCatalogTests(TestCase):
+    def setUp(self):
+        self.product = make_product(name='Etag')
+        self.size = make_size(self.product, val=40)
+
+    def test_matching_etag_returns_304_without_serializing(self):
+        first = self.client.get(reverse('product-list'))
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('Accept-Language', first['Vary'])
+        self.assertEqual(first['Cache-Control'], 'no-cache')
+
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('product-list'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b'')
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_etag_changes_with_data_language_and_params(self):
+        etag = self.client.get(reverse('category-list'))['ETag']
+        self.assertNotEqual(self.client.get(reverse('category-list'), HTTP_ACCEPT_LANGUAGE='tr')['ETag'], etag)
+        self.assertNotEqual(self.client.get(reverse('category-list'), {'page': 1})['ETag'], etag)
+
+        list_etag = self.client.get(reverse('product-list'))['ETag']
+        self.size.delete()
+        self.assertEqual(self.client.get(reverse('product-list'), HTTP_IF_NONE_MATCH=list_etag).status_code, 200)
+
+    def test_stamp_tracks_updated_at_from_other_processes(self):
+        etag = self.client.get(reverse('product-list'))['ETag']
+        # Sinyalsiz (başka süreçte yapılmış gibi) yazma: yalnızca updated_at değişir
+        ProductSize.objects.filter(pk=self.size.pk).update(
+            stock=0, updated_at=timezone.now() + timezone.timedelta(seconds=1)
+        )
+        from .cache import catalog_cache
+        catalog_cache().clear()
+        self.assertNotEqual(self.client.get(reverse('product-list'))['ETag'], etag)
+
+    def test_detail_304_still_counts_view(self):
+        url = reverse('product-detail', kwargs={'id': self.product.id})
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=f'W/{etag}')
+        self.assertEqual(response.status_code, 304)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.view_count, 2)
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.product = make_product(name='Kart', price='100.00')
+        make_size(self.product, val=40, stock=0, override='70.00')
+        make_size(self.product, val=41, stock=3)
+        make_color(self.product)
+
+    def test_card_view_is_compact_and_skips_relations(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('product-list'), {'view': 'card'})
+        card = get_list_data(response)[0]
+        self.assertEqual(set(card), {
+            'id', 'slug', 'display_name', 'price', 'min_price', 'currency', 'has_stock', 'has_3d',
+            'thumbnail', 'thumbnail_srcset',
+        })
+        self.assertEqual(Decimal(card['min_price']), Decimal('70.00'))
+        self.assertTrue(card['has_stock'])
+        self.assertFalse(card['has_3d'])
+        sql = ' '.join(query['sql'] for query in ctx.captured_queries)
+        self.assertNotIn('FROM "store_productcolor" WHERE', sql)
+        self.assertNotIn('FROM "store_productimage" WHERE', sql)
+
+    def test_expand_and_fields_params(self):
+        card = get_list_data(self.client.get(reverse('product-list'), {'view': 'card', 'expand': 'colors'}))[0]
+        self.assertEqual(len(card['colors']), 1)
+        self.assertNotIn('sizes', card)
+
+        full = get_list_data(self.client.get(reverse('product-list'), {'fields': 'id,display_name'}))[0]
+        self.assertEqual(set(full), {'id', 'display_name'})
+
+        detail = self.client.get(reverse('product-detail', kwargs={'id': self.product.id}), {'fields': 'id,sizes'})
+        self.assertEqual(set(detail.data), {'id', 'sizes'})
+        self.assertEqual(len(detail.data['sizes']), 2)
+
+
+class PlainSerializerTests(TestCase):
+    """API_PLAIN_SERIALIZERS açıkken liste çıktısı ModelSerializer ile bire bir aynı olmalı."""
+
+    def setUp(self):
+        category = make_category()
+        for i in range(3):
+            product = make_product(category=category, name=f'Düz {i}', price='100.00')
+            make_size(product, val=40, stock=2, override='80.00')
+            make_size(product, val=41, stock=0)
+            make_color(product)
+            ProductImage.objects.create(product=product, image=f'products/gallery/duz-{i}.png', order=i)
+        self.user = make_user()
+        for total in ('10.00', '25.50'):
+            order = Order.objects.create(user=self.user, total=Decimal(total))
+            OrderItem.objects.create(order=order, product_name='Düz 0', size_value=40, price=Decimal('12.50'), quantity=2)
+
+    def both(self, client, url, params):
+        results = []
+        for plain in (False, True):
+            catalog_cache().clear()
+            with override_settings(API_PLAIN_SERIALIZERS=plain):
+                response = client.get(url, params, HTTP_ACCEPT_LANGUAGE='de')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            results.append(response.json())
+        return results
+
+    def test_product_list_matches_serializer(self):
+        for params in ({}, {'view': 'card'}, {'view': 'card', 'expand': 'sizes,images'},
+                       {'fields': 'id,display_name,colors'}, {'pagination': 'cursor'}):
+            serialized, plain = self.both(self.client, reverse('product-list'), params)
+            self.assertEqual(plain, serialized, params)
+
+    def test_order_list_matches_serializer(self):
+        serialized, plain = self.both(jwt_client(self.user), reverse('order-list'), {})
+        self.assertEqual(plain, serialized)
+        self.assertEqual(plain['results'][0]['items'][0]['line_total'], 25.0)
+
+    @skipUnless(orjson is not None, 'orjson kurulu değil')
+    def test_fast_renderer_matches_drf_output(self):
+        from rest_framework.renderers import JSONRenderer
+        data = {
+            'price': Decimal('12.50'), 'when': timezone.now(), 'text': 'ayakkabı \u2028', 'items': [1, None, True],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class LanguageNegotiationTests(TestCase):
+    def test_q_values_and_whitelist(self):
+        self.assertEqual(negotiate_language('de-CH;q=0.5, tr, en;q=0.8'), 'tr')
+        self.assertEqual(negotiate_language('fr-FR, en;q=0.2, de;q=0.7'), 'de')
+        self.assertEqual(negotiate_language('en;q=0, tr;q=0.1'), 'tr')
+        self.assertEqual(negotiate_language('fr, *;q=0.5'), 'en')
+        self.assertEqual(negotiate_language(''), 'en')
+
+    def test_middleware_resolves_language_once(self):
+        request = RequestFactory().get('/', HTTP_ACCEPT_LANGUAGE='tr-TR,tr;q=0.9,en;q=0.8')
+        response = LanguageNegotiationMiddleware(lambda req: HttpResponse())(request)
+        self.assertEqual(request.catalog_language, 'tr')
+        self.assertEqual(response['Content-Language'], 'tr')
+
+    def test_listing_reads_only_active_language(self):
+        product = make_product(name='Dil')
+        Product.objects.filter(pk=product.pk).update(name_de='Sprache')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('product-list'), {'view': 'card'}, HTTP_ACCEPT_LANGUAGE='de;q=0.9, fr')
+        self.assertEqual(get_list_data(response)[0]['display_name'], 'Sprache')
+        sql = next(q['sql'] for q in ctx.captured_queries if 'FROM "store_product"' in q['sql'] and 'LIMIT' in q['sql'])
+        # name_tr yalnızca COALESCE içinde geçer; açıklamalar hiç okunmaz
+        for column in ('"name_tr", ', '"description_en"', '"description_tr"'):
+            self.assertNotIn(f'"store_product".{column}', sql)
+
+        detail = self.client.get(reverse('product-detail', kwargs={'id': product.id}), HTTP_ACCEPT_LANGUAGE='fr')
+        self.assertEqual(detail.data['display_name'], 'Dil EN')
+        self.assertEqual(detail.data['display_description'], 'Sample description')
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=3600)
+class AsyncCatalogTests(TestCase):
+    """Async uçlar senkron karşılıklarıyla aynı gövdeyi ve hata yanıtlarını döner."""
+
+    def tearDown(self):
+        view_counts.stop()
+
+    def setUp(self):
+        category = make_category()
+        self.products = [make_product(category=category, name=f'Async {i}') for i in range(14)]
+        make_size(self.products[0], val=40, stock=3, override='80.00')
+        make_color(self.products[0])
+        self.user = make_user()
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    async def both(self, sync_name, async_name, params=None, kwargs=None, **headers):
+        catalog_cache().clear()
+        sync_response = await sync_to_async(self.client.get)(
+            reverse(sync_name, kwargs=kwargs), params or {}, headers=headers,
+        )
+        catalog_cache().clear()
+        async_response = await self.async_client.get(reverse(async_name, kwargs=kwargs), params or {}, headers=headers)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        # Sayfa linkleri async yolunu gösterir
+        self.assertEqual(json.loads(async_response.content.replace(b'/async/', b'/')), sync_response.json())
+        return sync_response, async_response
+
+    async def test_catalog_endpoints_match_sync_views(self):
+        for params in ({}, {'page': 2}, {'view': 'card', 'expand': 'sizes'}, {'pagination': 'cursor'}, {'facets': '1'}):
+            await self.both('product-list', 'async-product-list', params, **{'Accept-Language': 'tr'})
+        await self.both('category-list', 'async-category-list')
+        _, async_response = await self.both('product-detail', 'async-product-detail', kwargs={'id': self.products[0].id})
+        not_modified = await self.async_client.get(
+            reverse('async-product-detail', kwargs={'id': self.products[0].id}),
+            headers={'If-None-Match': async_response['ETag']},
+        )
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_errors_match_sync_views(self):
+        await self.both('product-list', 'async-product-list', {'page': 9})
+        await self.both('product-list', 'async-product-list', {'min_price': 'abc'})
+        await self.both('product-detail', 'async-product-detail', kwargs={'id': 999999})
+
+    async def test_my_cart(self):
+        anonymous = await self.async_client.get(reverse('async-my-cart'))
+        self.assertEqual(anonymous.json(), {'items': []})
+        await self.both('cart-my-cart', 'async-my-cart', Authorization=f'Bearer {self.token}')
+
+
+class BufferedViewCountTests(TestCase):
+    def tearDown(self):
+        view_counts.stop()
+
+    @override_settings(VIEW_COUNT_FLUSH_INTERVAL=3600)
+    def test_views_are_buffered_and_flushed_in_one_statement(self):
+        first = make_product(name='Viewed A')
+        second = make_product(name='Viewed B')
+        for product in (first, first, first, second):
+            self.client.get(reverse('product-detail', kwargs={'id': product.id}))
+
+        first.refresh_from_db()
+        self.assertEqual(first.view_count, 0)
+        self.assertEqual(view_counts.pending(), {first.id: 3, second.id: 1})
+
+        # Savepoint içinde sayaç UPDATE'i + günlük etkinlik kovası upsert'i; ürün sayısından bağımsız
+        with self.assertNumQueries(4):
+            self.assertEqual(view_counts.flush(), 2)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.view_count, second.view_count), (3, 1))
+        self.assertEqual(
+            dict(ProductActivity.objects.values_list('product', 'views')), {first.id: 3, second.id: 1},
+        )
+
+    @override_settings(VIEW_COUNT_FLUSH_INTERVAL=3600)
+    def test_failed_flush_is_rolled_back_and_requeued(self):
+        product = make_product(name='Viewed')
+        view_counts.add(product.id, 2)
+        with mock.patch.object(ProductActivity.objects, 'bump', side_effect=DatabaseError):
+            self.assertEqual(view_counts.flush(), 0)
+        product.refresh_from_db()
+        self.assertEqual(product.view_count, 0)
+        self.assertEqual(view_counts.pending(), {product.id: 2})
+
+        self.assertEqual(view_counts.flush(), 1)
+        product.refresh_from_db()
+        self.assertEqual(product.view_count, 2)
+
+
+class ProductSearchTests(TestCase):
+    def setUp(self):
+        self.shoes = make_product(name='Koşu Ayakkabısı')
+        self.shoes.name_en = 'Running Shoes'
+        self.shoes.name_de = 'Laufschuhe'
+        self.shoes.save()
+        self.shirt = make_product(name='Gömlek')
+
+    def search(self, query, lang='en'):
+        response = self.client.get(reverse('product-list'), {'q': query}, HTTP_ACCEPT_LANGUAGE=lang)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [p['id'] for p in get_list_data(response)]
+
+    def test_search_matches_every_language_and_prefixes(self):
+        self.assertEqual(self.search('running'), [self.shoes.id])
+        self.assertEqual(self.search('laufsch', lang='de'), [self.shoes.id])
+        self.assertEqual(self.search('ayakkabı', lang='tr'), [self.shoes.id])
+
+    def test_search_index_follows_updates_and_deletes(self):
+        self.shirt.name_en = 'Running Shirt'
+        self.shirt.save()
+        self.assertCountEqual(self.search('running'), [self.shoes.id, self.shirt.id])
+
+        self.shoes.delete()
+        self.assertEqual(self.search('running'), [self.shirt.id])
+
+
+class KeysetPaginationTests(TestCase):
+    def collect(self, client, url, params):
+        ids, previous = [], None
+        response = client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            ids += [row['id'] for row in response.data['results']]
+            previous = response.data['previous'] or previous
+            if not response.data['next']:
+                return ids, previous
+            response = client.get(response.data['next'])
+
+    def test_products_page_through_ties_without_gaps(self):
+        category = make_category()
+        products = [make_product(category=category, name=f'Keyset {i}') for i in range(30)]
+        # Çok sayıda eşit view_count: id ile ayrılmalı
+        for i, product in enumerate(products):
+            Product.objects.filter(pk=product.pk).update(view_count=i % 3)
+
+        ids, previous = self.collect(self.client, reverse('product-list'), {'pagination': 'cursor', 'ordering': 'popular'})
+        expected = list(Product.objects.order_by('-view_count', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+        back = self.client.get(previous)
+        self.assertEqual([row['id'] for row in back.data['results']], expected[12:24])
+
+    def test_page_number_mode_is_default(self):
+        make_product(name='Paged')
+        response = self.client.get(reverse('product-list'))
+        self.assertEqual(response.data['count'], 1)
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse('product-list'), {'cursor': 'bozuk'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_well_formed_cursor_with_bad_value_returns_404(self):
+        make_product(name='Keyset')
+        for ordering, value in (('popular', 'x'), ('newest', 'garbage')):
+            token = base64.urlsafe_b64encode(json.dumps({'v': value, 'pk': 1}).encode()).decode()
+            response = self.client.get(
+                reverse('product-list'), {'pagination': 'cursor', 'ordering': ordering, 'cursor': token},
+            )
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, ordering)
+
+    def test_orders_support_cursor_mode(self):
+        user = make_user()
+        client = APIClient()
+        client.force_authenticate(user=user)
+        orders = [Order.objects.create(user=user, total=Decimal('10.00')) for _ in range(15)]
+
+        ids, _ = self.collect(client, reverse('order-list'), {'pagination': 'cursor'})
+        self.assertEqual(ids, [o.pk for o in reversed(orders)])
+
+
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def png(self, width, height):
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new('RGBA', (width, height), (200, 30, 30, 128)).save(buffer, 'PNG')
+        return SimpleUploadedFile('thumb.png', buffer.getvalue(), content_type='image/png')
+
+    def test_upload_generates_resized_variants_and_srcset(self):
+        product = make_product(name='Imaged')
+        product.thumbnail = self.png(500, 250)
+        product.save()
+
+        widths = product.thumbnail_variants['widths']
+        self.assertEqual(sorted(widths, key=int), ['200', '400'])
+        self.assertIn('webp', widths['200'])
+        self.assertIn('jpeg', widths['200'])
+
+        response = self.client.get(reverse('product-detail', kwargs={'id': product.id}))
+        self.assertIn('400w', response.data['thumbnail_srcset']['webp'])
+        self.assertTrue(response.data['thumbnail_srcset']['jpeg'].startswith('http'))
+
+    def test_unreadable_image_is_recorded_once(self):
+        product = make_product(name='Broken')
+        self.assertEqual(product.thumbnail_variants, {'source': product.thumbnail.name, 'widths': {}})
+        self.assertEqual(self.client.get(reverse('product-list')).data['results'][0]['thumbnail_srcset'], {})
+
+    def test_backfill_command_processes_missing_variants(self):
+        product = make_product(name='Backfill')
+        product.thumbnail = self.png(900, 900)
+        product.save()
+        Product.objects.filter(pk=product.pk).update(thumbnail_variants={})
+
+        call_command('generate_image_derivatives', workers=1, stdout=StringIO())
+        product.refresh_from_db()
+        self.assertEqual(sorted(product.thumbnail_variants['widths'], key=int), ['200', '400', '800'])
+
+
+def make_glb(texture_size=2048):
+    """Dokulu bir kare + sahneye bağlı olmayan ikinci bir mesh içeren küçük GLB."""
+    import json
+    import struct
+    from PIL import Image
+
+    positions = b''.join(struct.pack('<fff', *p) for p in [(-1, -1, 0), (1, -1, 0), (1, 1, 0), (-1, 1, 0)])
+    normals = struct.pack('<fff', 0, 0, 1) * 4
+    uvs = b''.join(struct.pack('<ff', *t) for t in [(0, 0), (1, 0), (1, 1), (0, 1)])
+    indices = struct.pack('<6H', 0, 1, 2, 0, 2, 3) + b'\0\0'
+    png = BytesIO()
+    Image.new('RGB', (texture_size, texture_size), (200, 40, 40)).save(png, 'PNG')
+    png = png.getvalue() + b'\0' * (-len(png.getvalue()) % 4)
+
+    views, blob = [], b''
+    for data in (positions, normals, uvs, indices, png):
+        views.append({'buffer': 0, 'byteOffset': len(blob), 'byteLength': len(data)})
+        blob += data
+    gltf = {
+        'asset': {'version': '2.0'},
+        'scenes': [{'nodes': [0]}],
+        'nodes': [{'mesh': 0, 'children': [1]}, {'name': 'empty'}, {'mesh': 1}],
+        'meshes': [
+            {'primitives': [{'attributes': {'POSITION': 0, 'NORMAL': 1, 'TEXCOORD_0': 2}, 'indices': 3, 'material': 0}]},
+            {'primitives': [{'attributes': {'POSITION': 4}}]},
+        ],
+        'materials': [{'pbrMetallicRoughness': {'baseColorTexture': {'index': 0}}}],
+        'textures': [{'source': 0}],
+        'images': [{'bufferView': 4, 'mimeType': 'image/png'}],
+        'accessors': [
+            {'bufferView': 0, 'count': 4, 'type': 'VEC3', 'componentType': 5126, 'min': [-1, -1, 0], 'max': [1, 1, 0]},
+            {'bufferView': 1, 'count': 4, 'type': 'VEC3', 'componentType': 5126},
+            {'bufferView': 2, 'count': 4, 'type': 'VEC2', 'componentType': 5126},
+            {'bufferView': 3, 'count': 6, 'type': 'SCALAR', 'componentType': 5123},
+            {'bufferView': 0, 'count': 4, 'type': 'VEC3', 'componentType': 5126, 'min': [-1, -1, 0], 'max': [1, 1, 0]},
+        ],
+        'bufferViews': views,
+        'buffers': [{'byteLength': len(blob)}],
+    }
+    document = json.dumps(gltf).encode()
+    document += b' ' * (-len(document) % 4)
+    body = struct.pack('<II', len(document), 0x4E4F534A) + document + struct.pack('<II', len(blob), 0x004E4942) + blob
+    return b'glTF' + struct.pack('<II', 2, 12 + len(body)) + body
+
+
+class Model3DPipelineTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def product_with_model(self, data, name='model.glb'):
+        product = make_product(name='3D')
+        product.model_3d = SimpleUploadedFile(name, data)
+        product.save()
+        return product
+
+    def test_command_builds_lite_variant_metadata_and_poster(self):
+        product = self.product_with_model(make_glb())
+        call_command('process_3d_models', stdout=StringIO())
+        product.refresh_from_db()
+
+        meta = product.model_3d_meta
+        self.assertTrue(meta['valid'])
+        self.assertEqual((meta['vertices'], meta['triangles'], meta['max_texture_size']), (8, 3, 2048))
+        self.assertEqual((meta['lite']['nodes'], meta['lite']['triangles']), (1, 2))
+        self.assertEqual(meta['lite']['max_texture_size'], 1024)
+        self.assertLess(meta['lite']['file_size'], meta['file_size'])
+        self.assertTrue(product.model_3d_poster.name.endswith('.png'))
+
+        with product.model_3d_lite.open('rb') as fh:
+            gltf, _ = read_glb(fh.read())
+        self.assertIn('KHR_mesh_quantization', gltf['extensionsRequired'])
+
+        response = self.client.get(reverse('product-detail', kwargs={'id': product.id}))
+        self.assertTrue(response.data['model_3d_lite'].endswith('.glb'))
+        self.assertEqual(response.data['model_3d_meta']['lite']['triangles'], 2)
+
+    def test_uploaded_poster_is_kept_and_unchanged_models_are_skipped(self):
+        product = self.product_with_model(make_glb(texture_size=64))
+        product.model_3d_poster = SimpleUploadedFile('poster.png', b'poster')
+        product.save()
+        poster = product.model_3d_poster.name
+
+        call_command('process_3d_models', stdout=StringIO())
+        product.refresh_from_db()
+        self.assertEqual(product.model_3d_poster.name, poster)
+        self.assertNotIn('poster', product.model_3d_meta)
+
+        out = StringIO()
+        call_command('process_3d_models', stdout=out)
+        self.assertIn('0 model işlendi', out.getvalue())
+
+    def test_invalid_model_is_recorded_without_lite_variant(self):
+        product = self.product_with_model(b'not a model at all', name='broken.glb')
+        call_command('process_3d_models', stdout=StringIO())
+        product.refresh_from_db()
+
+        self.assertFalse(product.model_3d_meta['valid'])
+        self.assertTrue(product.model_3d_meta['errors'])
+        self.assertFalse(product.model_3d_lite)
+
+
+@override_settings(MEDIA_ACCEL_REDIRECT='', MEDIA_SENDFILE=False, MEDIA_CACHE_MAX_AGE=3600)
+class MediaServingTests(TestCase):
+    def setUp(self):
+        import os
+
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.factory = RequestFactory()
+        os.makedirs(os.path.join(self.media_root, 'products', 'models'))
+        self.body = bytes(range(256)) * 4
+        self.write('products/models/chair.glb', self.body)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def write(self, name, data):
+        import os
+
+        with open(os.path.join(self.media_root, name), 'wb') as fh:
+            fh.write(data)
+
+    def get(self, path, **headers):
+        return serve_media(self.factory.get('/media/' + path, headers=headers), path)
+
+    def test_full_response_and_conditional_304(self):
+        response = self.get('products/models/chair.glb')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.body)
+        self.assertEqual(response['Content-Type'], 'model/gltf-binary')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+        etag = response['ETag']
+
+        self.assertEqual(self.get('products/models/chair.glb', if_none_match=etag).status_code, 304)
+        not_modified = self.get('products/models/chair.glb', if_modified_since=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], etag)
+
+        self.write('products/models/chair.glb', b'changed')
+        self.assertEqual(self.get('products/models/chair.glb', if_none_match=etag).status_code, 200)
+
+    def test_byte_ranges(self):
+        response = self.get('products/models/chair.glb', range='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.body[2:6])
+        self.assertEqual(response['Content-Range'], f'bytes 2-5/{len(self.body)}')
+
+        suffix = self.get('products/models/chair.glb', range='bytes=-3')
+        self.assertEqual(b''.join(suffix.streaming_content), self.body[-3:])
+        self.assertEqual(self.get('products/models/chair.glb', range=f'bytes={len(self.body)}-').status_code, 416)
+        # Kaynak değiştiyse (If-Range eşleşmiyor) dosyanın tamamı gönderilir
+        self.assertEqual(self.get('products/models/chair.glb', range='bytes=0-1', if_range='"stale"').status_code, 200)
+
+    def test_hashed_names_sidecars_and_proxy_offload(self):
+        import gzip
+
+        self.write('products/models/0123456789abcdef.glb', self.body)
+        self.write('products/models/0123456789abcdef.glb.gz', gzip.compress(self.body))
+        response = self.get('products/models/0123456789abcdef.glb', accept_encoding='gzip, br;q=0')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.body)
+
+        ranged = self.get('products/models/0123456789abcdef.glb', accept_encoding='gzip', range='bytes=0-3')
+        self.assertFalse(ranged.has_header('Content-Encoding'))
+
+        with override_settings(MEDIA_ACCEL_REDIRECT='/protected-media/'):
+            offloaded = self.get('products/models/chair.glb')
+        self.assertEqual(offloaded['X-Accel-Redirect'], '/protected-media/products/models/chair.glb')
+        self.assertEqual(offloaded.content, b'')
+
+        with self.assertRaises(Http404):
+            self.get('../../etc/passwd')
@@ -1,14 +1,24 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProductListView, CategoryListView, ProductDetailView, CartViewSet, OrderViewSet
+from .views import (
+    ProductListView, CategoryListView, ProductDetailView, RelatedProductsView, CartViewSet, OrderViewSet, FavoriteViewSet,
+)
+from .async_views import AsyncProductListView, AsyncProductDetailView, AsyncCategoryListView, AsyncMyCartView
 
 router = DefaultRouter()
 router.register(r'cart', CartViewSet, basename='cart')
 router.register(r'orders', OrderViewSet, basename='order')
+router.register(r'favorites', FavoriteViewSet, basename='favorite')
 
 urlpatterns = [
     path('products/', ProductListView.as_view(), name='product-list'),
     path('products/<int:id>/', ProductDetailView.as_view(), name='product-detail'),
+    path('products/<int:id>/related/', RelatedProductsView.as_view(), name='product-related'),
     path('categories/', CategoryListView.as_view(), name='category-list'),
+    # Aynı uçların async (ASGI) sürümleri, bkz. store/async_views.py
+    path('async/products/', AsyncProductListView.as_view(), name='async-product-list'),
+    path('async/products/<int:id>/', AsyncProductDetailView.as_view(), name='async-product-detail'),
+    path('async/categories/', AsyncCategoryListView.as_view(), name='async-category-list'),
+    path('async/cart/my_cart/', AsyncMyCartView.as_view(), name='async-my-cart'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
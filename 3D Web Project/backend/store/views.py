@@ -1,58 +1,252 @@
+from collections import defaultdict
+
 from rest_framework import generics, viewsets, status
 from rest_framework.decorators import action
-from rest_framework.filters import SearchFilter
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
-from django.db import transaction
-from django.db.models import F
-
-from .models import Product, Category, Cart, CartItem, ProductSize, Coupon, Order, OrderItem
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Prefetch, Sum
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+from .models import (
+    Product, Category, Cart, CartItem, ProductSize, ProductColor, Coupon, Order, OrderItem,
+    StockReservation, InsufficientStock, Favorite, ProductActivity,
+)
+from .cache import (
+    catalog_cache, catalog_cache_key, catalog_etag, record_hit, record_miss,
+)
+from .counters import view_counts
+from .facets import TRUTHY, facet_counts, facet_filters, filter_products
+from .i18n import localized, request_language
+from .pagination import CatalogPagination, KEYSET_ORDERINGS
+from .plain import PLAIN_SERIALIZERS, plain_serializers_enabled
+from .recommendations import recommendation_settings
+from .search import search_products
 from .serializers import (
-    ProductListSerializer, ProductDetailSerializer, CartSerializer, CategorySerializer,
-    OrderSerializer,
+    ProductListSerializer, ProductCardSerializer, ProductDetailSerializer, CartSerializer,
+    CategorySerializer, OrderSerializer, selected_fields,
 )
 
 
 # --- ÜRÜN VE KATEGORİ VİEWLARI ---
 
-class CategoryListView(generics.ListAPIView):
+class ConditionalGetMixin:
+    """
+    Gövdeyi hazırlamadan önce katalog ETag'ini hesaplar; If-None-Match eşleşirse
+    serileştirme yapmadan 304 döner. Cache-Control: no-cache ile tarayıcı yanıtı
+    saklar ama her seferinde doğrulatır (SPA'nın tekrar eden istekleri 304 alır).
+    """
+
+    def not_modified(self, request, *args, **kwargs):
+        """304 dönülürken de çalışması gereken yan etkiler için."""
+
+    def get(self, request, *args, **kwargs):
+        etag = catalog_etag(request)
+        client_etags = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in [tag.removeprefix('W/') for tag in client_etags]:
+            self.not_modified(request, *args, **kwargs)
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().get(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Cache-Control'] = 'no-cache'
+        patch_vary_headers(response, ('Accept-Language',))
+        return response
+
+
+class CatalogCacheMixin:
+    """Liste yanıtını (dil + query parametreleri anahtarıyla) katalog önbelleğinden döner."""
+    cache_prefix = None
+
+    def list(self, request, *args, **kwargs):
+        cache = catalog_cache()
+        key = catalog_cache_key(self.cache_prefix, request)
+        data = cache.get(key)
+        if data is not None:
+            record_hit()
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        record_miss()
+        response = super().list(request, *args, **kwargs)
+        cache.set(key, response.data, getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300))
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class PlainListMixin:
+    """
+    settings.API_PLAIN_SERIALIZERS açıkken listeyi ModelSerializer yerine
+    store.plain ile values() satırlarından kurar (çıktı aynıdır).
+    """
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        plain_class = PLAIN_SERIALIZERS.get(serializer_class)
+        if plain_class is None or not plain_serializers_enabled():
+            return super().list(request, *args, **kwargs)
+
+        plain = plain_class(serializer_class, request)
+        # Keyset cursor'ı sıralama alanını satırdan okur
+        orderings = getattr(self, 'keyset_orderings', KEYSET_ORDERINGS).values()
+        queryset = plain.values(self.filter_queryset(self.get_queryset()), extra=orderings)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(plain.build(queryset))
+        return self.get_paginated_response(plain.build(page))
+
+
+def product_prefetches(fields):
+    """Yalnızca yanıtta yer alacak ilişkileri prefetch eder (?fields= / ?expand=)."""
+    prefetches = {
+        'sizes': Prefetch('sizes', queryset=ProductSize.objects.with_available()),
+        'colors': 'colors',
+        'images': 'images',
+    }
+    return [lookup for name, lookup in prefetches.items() if name in fields]
+
+
+class CategoryListView(ConditionalGetMixin, CatalogCacheMixin, generics.ListAPIView):
     """Kategorileri listeler"""
-    queryset = Category.objects.all()
+    cache_prefix = 'categories'
     serializer_class = CategorySerializer
 
+    def get_queryset(self):
+        fields = selected_fields(self.serializer_class, self.request)
+        return localized(Category.objects.all(), request_language(self.request), fields)
+
+
+class FacetCountMixin:
+    """?facets=1 ile liste yanıtına facet sayılarını ekler (önbelleğe yanıtla birlikte girer)."""
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if wants_facets(request):
+            response.data['facets'] = self.get_facet_counts()
+        return response
+
+
+def wants_facets(request):
+    return request.query_params.get('facets', '').lower() in TRUTHY
+
 
-class ProductListView(generics.ListAPIView):
-    """Görünür ürünleri listeler. Arama (search) ve kategori (category) filtresi destekler."""
-    serializer_class = ProductListSerializer
-    filter_backends = [SearchFilter]
-    search_fields = ['name_tr', 'name_en', 'description_tr', 'description_en']
+class ProductListView(ConditionalGetMixin, CatalogCacheMixin, FacetCountMixin, PlainListMixin, generics.ListAPIView):
+    """Görünür ürünleri listeler. Tam metin arama (q; eski adıyla search), kategori
+    (category), beden (size), renk (color; ikisi de virgülle birden çok değer),
+    fiyat aralığı (min_price / max_price, net beden fiyatına göre) ve in_stock
+    filtresi destekler; beden/renk/fiyat/stok süzgeçleri aynı beden x renk
+    birleşiminde sağlanmalıdır (bkz. store/facets.py). Arama sonuçları alaka
+    puanına göre, diğerleri ?ordering= (newest / popular / favorites / trending /
+    bestselling) ile sıralanır; ?pagination=cursor keyset sayfalamayı açar.
+    ?view=card kısa kart gösterimini, ?facets=1 facet sayılarını döner."""
+    cache_prefix = 'products'
+    pagination_class = CatalogPagination
+
+    def get_serializer_class(self):
+        if self.request.query_params.get('view') == 'card':
+            return ProductCardSerializer
+        return ProductListSerializer
 
     def get_queryset(self):
-        qs = Product.objects.filter(is_visible=True).select_related('category').prefetch_related(
-            'sizes', 'colors', 'images'
-        )
+        serializer_class = self.get_serializer_class()
+        fields = selected_fields(serializer_class, self.request)
+        qs = Product.objects.filter(is_visible=True).prefetch_related(*product_prefetches(fields))
+        qs = localized(qs, request_language(self.request), fields)
+        if serializer_class is ProductCardSerializer:
+            qs = qs.with_card_fields()
         category_id = self.request.query_params.get('category')
         if category_id:
             qs = qs.filter(category_id=category_id)
-        return qs
 
+        # Beden / renk / fiyat / stok: ProductFacet indeksinde tek alt sorgu
+        qs = filter_products(qs, facet_filters(self.request.query_params))
+
+        query = self.search_query()
+        if query:
+            return search_products(qs, query, request_language(self.request))
+
+        field = KEYSET_ORDERINGS.get(self.request.query_params.get('ordering'), 'created_at')
+        return qs.order_by(f'-{field}', '-id')
+
+    def search_query(self):
+        return self.request.query_params.get('q') or self.request.query_params.get('search')
+
+    def get_facet_counts(self):
+        params = self.request.query_params
+        products = None
+        query = self.search_query()
+        if query:
+            searched = search_products(Product.objects.filter(is_visible=True), query, request_language(self.request))
+            products = searched.order_by().values('pk')
+        return facet_counts(facet_filters(params), category_id=params.get('category'), products=products)
 
-class ProductDetailView(generics.RetrieveAPIView):
+
+class ProductDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     """Ürün detayını getirir"""
-    queryset = Product.objects.all().select_related('category').prefetch_related(
-        'sizes', 'colors', 'images'
-    )
     serializer_class = ProductDetailSerializer
     lookup_field = 'id'
 
+    def get_queryset(self):
+        fields = selected_fields(self.serializer_class, self.request)
+        qs = Product.objects.prefetch_related(*product_prefetches(fields))
+        return localized(qs, request_language(self.request), fields)
+
+    def not_modified(self, request, *args, **kwargs):
+        # Tarayıcı önbellekten gösterse de bir görüntülenmedir
+        view_counts.add(int(kwargs['id']))
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        Product.objects.filter(pk=instance.pk).update(view_count=F('view_count') + 1)
+        view_counts.add(instance.pk)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
+
+class RelatedProductsView(ConditionalGetMixin, CatalogCacheMixin, generics.ListAPIView):
+    """
+    Bu ürünle birlikte sık satın alınanlar (kart gösterimi). Öneriler
+    build_recommendations ile önceden hesaplanır; henüz öneri yoksa aynı
+    kategorinin trend ürünleri döner.
+    """
+    serializer_class = ProductCardSerializer
+    pagination_class = None
+
+    @property
+    def cache_prefix(self):
+        # Önbellek anahtarı yolu içermez: ürün id'si önekte
+        return f"related:{self.kwargs['id']}"
+
+    def get_queryset(self):
+        product = get_object_or_404(Product.objects.only('id', 'category_id'), pk=self.kwargs['id'], is_visible=True)
+        fields = selected_fields(self.serializer_class, self.request)
+        qs = Product.objects.filter(is_visible=True).with_card_fields().prefetch_related(*product_prefetches(fields))
+        qs = localized(qs, request_language(self.request), fields)
+
+        # filter'dan sonraki annotate aynı öneri join'ini kullanır
+        related = list(
+            qs.filter(recommended_for__product=product)
+            .annotate(recommendation_rank=F('recommended_for__rank')).order_by('recommendation_rank')
+        )
+        if related:
+            return related
+        top_k = recommendation_settings()['top_k']
+        return qs.filter(category_id=product.category_id).exclude(pk=product.pk).order_by('-trending_score', '-id')[:top_k]
+
+
 # --- SEPET (CART) VIEWSET ---
 
+CART_PREFETCH = ('items__product', 'items__size', 'items__color')
+# PATCH /cart/items/ isteğindeki en fazla işlem sayısı
+MAX_CART_OPERATIONS = 100
+
+
+class CheckoutConflict(Exception):
+    """Checkout transaction'ını geri almak için; mesajı kullanıcıya döner."""
+
+
 class CartViewSet(viewsets.ModelViewSet):
     serializer_class = CartSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -60,21 +254,52 @@ class CartViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         # Kullanıcının aktif (tamamlanmamış) sepetini döner (N+1 önlemi için prefetch)
         if self.request.user.is_authenticated:
-            return Cart.objects.filter(
+            return Cart.objects.with_totals().filter(
                 user=self.request.user, is_completed=False
-            ).prefetch_related('items__product', 'items__size', 'items__color')
+            ).prefetch_related(*CART_PREFETCH)
         return Cart.objects.none()
 
+    @staticmethod
+    def _size_quantity(cart, size):
+        """Sepette bu bedenden (tüm renkler) kaç adet olduğu."""
+        return cart.items.filter(size=size).aggregate(total=Sum('quantity'))['total'] or 0
+
+    @staticmethod
+    def _size_totals(cart, size_ids):
+        """{beden id: sepetteki toplam adet (tüm renkler)}; sepette kalmayan bedenler 0."""
+        totals = dict.fromkeys(size_ids, 0)
+        totals.update(
+            cart.items.filter(size_id__in=size_ids).order_by().values('size_id')
+            .annotate(total=Sum('quantity')).values_list('size_id', 'total')
+        )
+        return totals
+
+    @staticmethod
+    def _lock_cart(cart):
+        """
+        Sepet satırını ve kalemlerini kilitler; kalemler {(ürün, beden, renk): kalem}
+        olarak döner. Sepet bu arada siparişe dönüştüyse None.
+        """
+        if not list(Cart.objects.select_for_update().filter(pk=cart.pk, is_completed=False).values_list('pk')):
+            return None
+        return {
+            (item.product_id, item.size_id, item.color_id): item
+            for item in cart.items.select_for_update().only(
+                'id', 'cart_id', 'product_id', 'size_id', 'color_id', 'quantity',
+            )
+        }
+
+    def _fetch_cart(self, cart):
+        """Yanıt için sepeti toplamlarıyla (SQL) ve kalemleriyle (prefetch) yeniden yükler."""
+        return Cart.objects.with_totals().prefetch_related(*CART_PREFETCH).get(pk=cart.pk)
+
     @action(detail=False, methods=['get'])
     def my_cart(self, request):
         """Aktif sepeti liste değil, tekil obje olarak döner (Frontend dostu)"""
         if not request.user.is_authenticated:
             return Response({"items": []}, status=200)
         cart, _ = Cart.objects.get_or_create(user=request.user, is_completed=False)
-        cart = Cart.objects.prefetch_related(
-            'items__product', 'items__size', 'items__color'
-        ).get(pk=cart.pk)
-        return Response(CartSerializer(cart).data)
+        return Response(CartSerializer(self._fetch_cart(cart)).data)
 
     @action(detail=False, methods=['post'])
     def add_to_cart(self, request):
@@ -100,19 +325,29 @@ class CartViewSet(viewsets.ModelViewSet):
             if color_id:
                 color = product.colors.get(id=color_id)
 
-            if size.stock < quantity:
-                return Response({"error": f"Yetersiz stok. Mevcut: {size.stock}"}, status=400)
-
             cart, _ = Cart.objects.get_or_create(user=request.user, is_completed=False)
-            item = cart.add_item(product=product, size=size, color=color, quantity=quantity)
-
-            return Response(CartSerializer(cart).data, status=status.HTTP_201_CREATED)
+            with transaction.atomic():
+                # Önce atomik upsert, sonra rezervasyon sepetteki gerçek toplama çekilir;
+                # stok yetmezse ikisi birlikte geri alınır
+                cart.add_item(product=product, size=size, color=color, quantity=quantity)
+                StockReservation.objects.sync_cart_size(cart, size)
+                ProductActivity.objects.bump('cart_adds', {product.pk: 1})
+
+            return Response(CartSerializer(self._fetch_cart(cart)).data, status=status.HTTP_201_CREATED)
+        except InsufficientStock as e:
+            return Response({"error": str(e)}, status=400)
         except Exception as e:
             return Response({"error": str(e)}, status=400)
 
     @action(detail=False, methods=['post'])
     def merge_cart(self, request):
-        """LocalStorage sepetini DB ile birleştirir"""
+        """
+        LocalStorage sepetini DB ile birleştirir. Ürün/beden/renkler üç IN
+        sorgusuyla doğrulanır; kilitli sepet kalemlerine göre stoğa kırpılan
+        adetler artırımlı upsert ile eklenir. Yanıt sepetin yanında satır
+        başına sonucu (merge_report) içerir:
+        merged / partial (stok kadar eklendi) / out_of_stock / not_found / invalid.
+        """
         if not request.user.is_authenticated:
             return Response({"error": "Giriş yapmalısınız."}, status=401)
 
@@ -123,40 +358,101 @@ class CartViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        cart, _ = Cart.objects.get_or_create(user=request.user, is_completed=False)
-
-        for item_data in local_items:
+        report, rows = [], []
+        for index, item_data in enumerate(local_items):
             try:
-                product = Product.objects.get(id=item_data['product_id'], is_visible=True, is_available=True)
-                size = ProductSize.objects.get(id=item_data['size_id'], product=product)
-                color = None
                 color_id = item_data.get('color_id')
-                if color_id:
-                    color = product.colors.get(id=color_id)
-                quantity = int(item_data['quantity'])
-
-                if size.stock >= quantity:
-                    cart.add_item(product=product, size=size, color=color, quantity=quantity)
-            except:
+                row = (
+                    index, int(item_data['product_id']), int(item_data['size_id']),
+                    int(color_id) if color_id else None, int(item_data['quantity']),
+                )
+            except (AttributeError, KeyError, TypeError, ValueError):
+                report.append({"index": index, "status": "invalid", "error": "Geçersiz satır verisi."})
                 continue
+            if row[4] < 1:
+                report.append({"index": index, "status": "invalid", "error": "Miktar en az 1 olmalıdır."})
+                continue
+            rows.append(row)
+
+        cart, _ = Cart.objects.get_or_create(user=request.user, is_completed=False)
+        products = set(Product.objects.filter(
+            pk__in={row[1] for row in rows}, is_visible=True, is_available=True,
+        ).values_list('pk', flat=True))
+        sizes = dict(ProductSize.objects.filter(pk__in={row[2] for row in rows}).values_list('pk', 'product_id'))
+        colors = dict(ProductColor.objects.filter(
+            pk__in={row[3] for row in rows if row[3]},
+        ).values_list('pk', 'product_id'))
+
+        try:
+            with transaction.atomic():
+                # Sepet ve kalemleri kilitli okunur: stok kırpması, giriş sırasında
+                # gelen eklemeler dahil güncel adetlere göre yapılır
+                lines = self._lock_cart(cart)
+                if lines is None:
+                    return Response({"error": "Sepet aynı anda değişti, lütfen tekrar deneyin."}, status=409)
+                in_cart = defaultdict(int)
+                for item in lines.values():
+                    in_cart[item.size_id] += item.quantity
+                available = StockReservation.objects.available_for(
+                    cart, {row[2] for row in rows if sizes.get(row[2])}, lock=True,
+                )
 
-        return Response(CartSerializer(cart).data, status=200)
+                accepted_lines = defaultdict(int)
+                for index, product_id, size_id, color_id, quantity in rows:
+                    if product_id not in products:
+                        error = "Ürün bulunamadı."
+                    elif sizes.get(size_id) != product_id:
+                        error = "Beden bulunamadı."
+                    elif color_id and colors.get(color_id) != product_id:
+                        error = "Renk bulunamadı."
+                    else:
+                        error = None
+                    if error:
+                        report.append({"index": index, "status": "not_found", "error": error})
+                        continue
+
+                    accepted = min(quantity, max(available[size_id] - in_cart[size_id], 0))
+                    if not accepted:
+                        report.append({"index": index, "status": "out_of_stock", "quantity": 0})
+                        continue
+                    in_cart[size_id] += accepted
+                    accepted_lines[(product_id, size_id, color_id)] += accepted
+                    report.append({
+                        "index": index, "status": "merged" if accepted == quantity else "partial",
+                        "quantity": accepted,
+                    })
+
+                if accepted_lines:
+                    # Birleştirme yalnızca ekler: adetler mutlak değer değil artış olarak yazılır
+                    cart.add_items(accepted_lines)
+                    touched = {size_id for _, size_id, _ in accepted_lines}
+                    StockReservation.objects.hold_many(cart, self._size_totals(cart, touched))
+        except InsufficientStock as e:
+            return Response({"error": str(e), "size_id": e.size_id, "available": e.available}, status=400)
+        except IntegrityError:
+            return Response({"error": "Sepet aynı anda değişti, lütfen tekrar deneyin."}, status=409)
+
+        report.sort(key=lambda line: line["index"])
+        data = CartSerializer(self._fetch_cart(cart)).data
+        return Response({**data, "merge_report": report}, status=200)
 
     @action(detail=False, methods=['patch'], url_path=r'items/(?P<item_id>\d+)/quantity')
     def update_quantity(self, request, item_id=None):
         """Sepetteki öğenin miktarını günceller"""
         try:
-            item = CartItem.objects.get(id=item_id, cart__user=request.user)
+            item = CartItem.objects.select_related('cart', 'size').get(id=item_id, cart__user=request.user)
             new_qty = int(request.data.get('quantity'))
-
-            if item.size.stock < new_qty:
-                return Response({"error": "Stok yetersiz."}, status=400)
             if new_qty < 1:
                 return Response({"error": "Miktar en az 1 olmalıdır."}, status=400)
 
-            item.quantity = new_qty
-            item.save()
-            return Response(CartSerializer(item.cart).data)
+            with transaction.atomic():
+                other_lines = self._size_quantity(item.cart, item.size) - item.quantity
+                StockReservation.objects.hold(item.cart, item.size, other_lines + new_qty)
+                item.quantity = new_qty
+                item.save()
+            return Response(CartSerializer(self._fetch_cart(item.cart)).data)
+        except InsufficientStock:
+            return Response({"error": "Stok yetersiz."}, status=400)
         except CartItem.DoesNotExist:
             return Response({"error": "Ürün sepette bulunamadı."}, status=404)
 
@@ -164,13 +460,115 @@ class CartViewSet(viewsets.ModelViewSet):
     def remove_item(self, request, item_id=None):
         """Öğeyi sepetten tamamen siler"""
         try:
-            item = CartItem.objects.get(id=item_id, cart__user=request.user)
+            item = CartItem.objects.select_related('cart', 'size').get(id=item_id, cart__user=request.user)
             cart = item.cart
-            item.delete()
-            return Response(CartSerializer(cart).data, status=200)
+            with transaction.atomic():
+                item.delete()
+                StockReservation.objects.sync_cart_size(cart, item.size)
+            return Response(CartSerializer(self._fetch_cart(cart)).data, status=200)
         except CartItem.DoesNotExist:
             return Response({"error": "Öğe bulunamadı."}, status=404)
 
+    @action(detail=False, methods=['patch'], url_path='items')
+    def batch_items(self, request):
+        """
+        Birden çok sepet işlemini tek istekte uygular ve sepeti bir kez döner:
+        {"operations": [
+            {"op": "add", "product_id": 1, "size_id": 2, "color_id": 3, "quantity": 1},
+            {"op": "set", "item_id": 5, "quantity": 2},
+            {"op": "remove", "item_id": 6}
+        ]}
+        İşlemler sırayla uygulanır; biri geçersizse ya da stok yetmezse hiçbiri uygulanmaz.
+        """
+        if not request.user.is_authenticated:
+            return Response({"error": "Sepeti kaydetmek için giriş yapmalısınız."}, status=401)
+
+        operations = request.data.get('operations') if isinstance(request.data, dict) else request.data
+        if not isinstance(operations, list) or not operations:
+            return Response({"error": "Geçersiz veri formatı. İşlem listesi bekleniyor."}, status=400)
+        if len(operations) > MAX_CART_OPERATIONS:
+            return Response({"error": f"Tek istekte en fazla {MAX_CART_OPERATIONS} işlem gönderilebilir."}, status=400)
+
+        parsed = []
+        for index, operation in enumerate(operations):
+            try:
+                op = operation.get('op')
+                if op == 'add':
+                    color_id = operation.get('color_id')
+                    parsed.append((op, int(operation['product_id']), int(operation['size_id']),
+                                   int(color_id) if color_id else None, int(operation.get('quantity', 1))))
+                elif op == 'set':
+                    parsed.append((op, int(operation['item_id']), int(operation['quantity'])))
+                elif op == 'remove':
+                    parsed.append((op, int(operation['item_id'])))
+                else:
+                    return Response({"error": "Bilinmeyen işlem. (add / set / remove)", "index": index}, status=400)
+            except (AttributeError, KeyError, TypeError, ValueError):
+                return Response({"error": "Geçersiz işlem verisi.", "index": index}, status=400)
+            if op in ('add', 'set') and parsed[-1][-1] < 1:
+                return Response({"error": "Miktar en az 1 olmalıdır.", "index": index}, status=400)
+
+        cart, _ = Cart.objects.get_or_create(user=request.user, is_completed=False)
+
+        # Eklenecek beden/renkler tek sorguda doğrulanır
+        adds = [operation for operation in parsed if operation[0] == 'add']
+        sizes = dict(ProductSize.objects.filter(
+            pk__in={operation[2] for operation in adds}, product__is_visible=True, product__is_available=True,
+        ).values_list('pk', 'product_id')) if adds else {}
+        color_ids = {operation[3] for operation in adds if operation[3]}
+        colors = dict(ProductColor.objects.filter(pk__in=color_ids).values_list('pk', 'product_id')) if color_ids else {}
+
+        try:
+            with transaction.atomic():
+                # Kalemler kilitli okunur: eşzamanlı bir PATCH ya da add_to_cart bu
+                # transaction'ı bekler, hesaplanan adetler onların artışını ezmez
+                lines = self._lock_cart(cart)
+                if lines is None:
+                    return Response({"error": "Sepet aynı anda değişti, lütfen tekrar deneyin."}, status=409)
+                items = {item.pk: item for item in lines.values()}
+
+                removed, touched_sizes, new_lines = set(), set(), defaultdict(int)
+                for index, operation in enumerate(parsed):
+                    if operation[0] == 'add':
+                        _, product_id, size_id, color_id, quantity = operation
+                        if sizes.get(size_id) != product_id or (color_id and colors.get(color_id) != product_id):
+                            return Response({"error": "Ürün, beden veya renk bulunamadı.", "index": index}, status=404)
+                        item = lines.get((product_id, size_id, color_id))
+                        if item is None:
+                            new_lines[(product_id, size_id, color_id)] += quantity
+                        else:
+                            item.quantity += quantity
+                    else:
+                        item = items.get(operation[1])
+                        if item is None or item.pk in removed:
+                            return Response({"error": "Ürün sepette bulunamadı.", "index": index}, status=404)
+                        size_id = item.size_id
+                        if operation[0] == 'set':
+                            item.quantity = operation[2]
+                        else:
+                            removed.add(item.pk)
+                            del lines[(item.product_id, item.size_id, item.color_id)]
+                    touched_sizes.add(size_id)
+
+                if removed:
+                    CartItem.objects.filter(pk__in=removed).delete()
+                CartItem.objects.bulk_update(
+                    [item for item in lines.values() if item.size_id in touched_sizes], ['quantity'],
+                )
+                # Sepette olmayan satırlar artırımlı upsert ile: araya giren bir ekleme kaybolmaz
+                cart.add_items(new_lines)
+                StockReservation.objects.hold_many(cart, self._size_totals(cart, touched_sizes))
+                added = defaultdict(int)
+                for operation in adds:
+                    added[operation[1]] += 1
+                ProductActivity.objects.bump('cart_adds', added)
+        except InsufficientStock as e:
+            return Response({"error": str(e), "size_id": e.size_id, "available": e.available}, status=400)
+        except IntegrityError:
+            return Response({"error": "Sepet aynı anda değişti, lütfen tekrar deneyin."}, status=409)
+
+        return Response(CartSerializer(self._fetch_cart(cart)).data, status=200)
+
     @action(detail=False, methods=['post'])
     def apply_coupon(self, request):
         """Kupon kodunu doğrular ve sepete uygular"""
@@ -184,72 +582,172 @@ class CartViewSet(viewsets.ModelViewSet):
             cart.coupon = coupon
             cart.save()
 
-            return Response(CartSerializer(cart).data, status=200)
+            return Response(CartSerializer(self._fetch_cart(cart)).data, status=200)
         except Coupon.DoesNotExist:
             return Response({"error": "Kupon kodu bulunamadı."}, status=404)
 
     @action(detail=False, methods=['post'])
     def checkout(self, request):
-        """Sepeti siparişe dönüştürür (Order + OrderItem snapshot)."""
+        """Sepeti siparişe dönüştürür (Order + OrderItem snapshot).
+
+        Kalem sayısından bağımsız sabit sayıda sorgu: tek koşullu stok UPDATE'i,
+        tek bulk_create; herhangi bir satırda stok yetmezse her şey geri alınır.
+        """
         if not request.user.is_authenticated:
             return Response({"error": "Giriş yapmalısınız."}, status=401)
 
-        cart = Cart.objects.prefetch_related(
-            'items__product', 'items__size', 'items__color'
-        ).filter(user=request.user, is_completed=False).first()
+        cart = Cart.objects.with_totals().select_related('coupon').prefetch_related(*CART_PREFETCH).filter(
+            user=request.user, is_completed=False
+        ).first()
 
-        if not cart or not cart.items.exists():
+        items = list(cart.items.all()) if cart else []
+        if not items:
             return Response({"error": "Sepetiniz boş."}, status=400)
 
-        with transaction.atomic():
-            # Stok kilitle
-            size_ids = list(cart.items.values_list('size_id', flat=True))
-            sizes = ProductSize.objects.select_for_update().filter(id__in=size_ids).select_related('product')
-            size_map = {s.id: s for s in sizes}
-
-            for item in cart.items.all():
-                size = size_map.get(item.size_id)
-                if not size:
-                    return Response({"error": "Beden bulunamadı."}, status=400)
-                if not size.product.is_available or not size.product.is_visible:
-                    return Response({"error": "Ürün satışta değil."}, status=400)
-                if size.stock < item.quantity:
-                    return Response({"error": f"Yetersiz stok. Mevcut: {size.stock}"}, status=400)
-
-            total = cart.total_price
-            order = Order.objects.create(user=request.user, total=total, coupon=cart.coupon, status='pending')
-
-            for item in cart.items.all():
-                size = size_map[item.size_id]
-                OrderItem.objects.create(
-                    order=order,
-                    product=item.product,
-                    product_name=item.product.name_en,
-                    size_value=size.size_value,
-                    price=size.current_price,
-                    quantity=item.quantity,
-                )
-                ProductSize.objects.filter(id=size.id).update(stock=F('stock') - item.quantity)
+        for item in items:
+            if not item.product.is_available or not item.product.is_visible:
+                return Response({"error": "Ürün satışta değil."}, status=400)
 
-            if cart.coupon and cart.coupon.is_valid():
-                cart.coupon.used_count = F('used_count') + 1
-                cart.coupon.save()
+        # Aynı beden farklı renklerle birden fazla satırda olabilir
+        quantities = {}
+        for item in items:
+            quantities[item.size_id] = quantities.get(item.size_id, 0) + item.quantity
 
-            cart.is_completed = True
-            cart.save()
+        try:
+            with transaction.atomic():
+                # Sepeti tamamlandı işaretle; çift tıklamada ikinci istek burada düşer
+                if not Cart.objects.filter(pk=cart.pk, is_completed=False).update(is_completed=True):
+                    raise CheckoutConflict("Sepet zaten siparişe dönüştürüldü.")
+
+                # Rezervasyonlar düşüme dönüşür: bedenler kilitlenir, diğer sepetlerin
+                # aktif rezervasyonları koşul UPDATE'inde korunur
+                if ProductSize.objects.decrement_stock(quantities, cart=cart) != len(quantities):
+                    raise CheckoutConflict(self._stock_error(quantities))
+                StockReservation.objects.filter(cart=cart).delete()
+
+                order = Order.objects.create(
+                    user=request.user, total=cart.total_price, coupon=cart.coupon, status='pending'
+                )
+                OrderItem.objects.bulk_create([
+                    OrderItem(
+                        order=order,
+                        product=item.product,
+                        product_name=item.product.name_en,
+                        size_value=item.size.size_value,
+                        price=item.size.current_price,
+                        quantity=item.quantity,
+                    )
+                    for item in items
+                ])
+                sold = defaultdict(int)
+                for item in items:
+                    sold[item.product_id] += item.quantity
+                ProductActivity.objects.bump('sales', sold)
+
+                if cart.coupon and cart.coupon.is_valid():
+                    Coupon.objects.filter(pk=cart.coupon.pk).update(used_count=F('used_count') + 1)
+        except CheckoutConflict as e:
+            return Response({"error": str(e)}, status=400)
 
         order = Order.objects.prefetch_related('items').get(pk=order.pk)
         return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
 
+    @staticmethod
+    def _stock_error(quantities):
+        """Koşullu UPDATE eksik kaldığında hangi bedenin takıldığını bulur (yalnızca hata yolu)."""
+        sizes = ProductSize.objects.filter(id__in=quantities.keys()).select_related('product')
+        found = {s.id: s for s in sizes}
+        for size_id, qty in quantities.items():
+            size = found.get(size_id)
+            if not size:
+                return "Beden bulunamadı."
+            if not size.product.is_available or not size.product.is_visible:
+                return "Ürün satışta değil."
+            if size.stock < qty:
+                return f"Yetersiz stok. Mevcut: {size.stock}"
+        return "Stok değişti, lütfen tekrar deneyin."
+
 
 # --- SİPARİŞ VIEWSET ---
 
-class OrderViewSet(viewsets.ReadOnlyModelViewSet):
-    """Kullanıcının siparişlerini listeler / detay getirir."""
+class OrderViewSet(PlainListMixin, viewsets.ReadOnlyModelViewSet):
+    """Kullanıcının siparişlerini listeler / detay getirir (?pagination=cursor ile keyset)."""
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = CatalogPagination
+    keyset_orderings = {'newest': 'created_at'}
 
     def get_queryset(self):
         if self.request.user.is_authenticated:
-            return Order.objects.filter(user=self.request.user).prefetch_related('items').order_by('-created_at')
+            return Order.objects.filter(user=self.request.user).prefetch_related('items').order_by('-created_at', '-id')
         return Order.objects.none()
+
+
+# --- FAVORİLER ---
+
+# GET /favorites/check/ ile tek istekte sorulabilecek en fazla ürün
+MAX_FAVORITE_CHECK_IDS = 100
+
+
+class FavoriteViewSet(viewsets.GenericViewSet):
+    """
+    Kullanıcının favorileri. Katalog yanıtları herkes için aynı (önbellek/ETag)
+    kaldığından favori durumu ürün listesine gömülmez; ürün ızgarası
+    check/ ile tek sorguda öğrenir.
+      GET  favorites/                  favori ürünler (kart gösterimi, son eklenen önce)
+      POST favorites/toggle/           {"product_id": 5} (isteğe bağlı "favorite": true/false)
+      GET  favorites/check/?ids=1,2,3  verilen ürünlerden favori olanlar
+    """
+    serializer_class = ProductCardSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        fields = selected_fields(self.serializer_class, self.request)
+        # filter'dan sonraki annotate aynı favori join'ini kullanır
+        qs = (
+            Product.objects.filter(is_visible=True, favorited_by__user=self.request.user)
+            .annotate(favorited_id=F('favorited_by__id'))
+            .with_card_fields().prefetch_related(*product_prefetches(fields))
+            .order_by('-favorited_id')
+        )
+        return localized(qs, request_language(self.request), fields)
+
+    def list(self, request):
+        page = self.paginate_queryset(self.get_queryset())
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @action(detail=False, methods=['post'])
+    def toggle(self, request):
+        try:
+            product_id = int(request.data.get('product_id'))
+        except (TypeError, ValueError):
+            return Response({"error": "Geçersiz ürün."}, status=400)
+        if not Product.objects.filter(pk=product_id, is_visible=True).exists():
+            return Response({"error": "Ürün bulunamadı."}, status=404)
+
+        wanted = request.data.get('favorite')
+        if wanted is None:
+            # Önce silmeyi dene: silinecek satır yoksa ekle
+            is_favorite = not Favorite.objects.remove(request.user, product_id)
+            if is_favorite:
+                Favorite.objects.add(request.user, product_id)
+        else:
+            is_favorite = wanted in (True, 'true', '1', 1)
+            if is_favorite:
+                Favorite.objects.add(request.user, product_id)
+            else:
+                Favorite.objects.remove(request.user, product_id)
+
+        favorite_count = Product.objects.values_list('favorite_count', flat=True).get(pk=product_id)
+        return Response({"product_id": product_id, "is_favorite": is_favorite, "favorite_count": favorite_count})
+
+    @action(detail=False, methods=['get'])
+    def check(self, request):
+        raw = request.query_params.get('ids', '')
+        try:
+            ids = {int(value) for value in raw.split(',') if value.strip()}
+        except ValueError:
+            return Response({"error": "ids virgülle ayrılmış ürün id'leri olmalıdır."}, status=400)
+        if len(ids) > MAX_FAVORITE_CHECK_IDS:
+            return Response({"error": f"En fazla {MAX_FAVORITE_CHECK_IDS} ürün sorulabilir."}, status=400)
+        return Response({"favorited": sorted(Favorite.objects.ids_for(request.user, ids))})
@@ -1,9 +1,12 @@
 import { Link } from 'react-router-dom';
 import { mediaUrl } from '../services/api';
-import { ArrowRight } from 'lucide-react';
+import { ArrowRight, Heart } from 'lucide-react';
 import { useTranslation } from 'react-i18next';
 import { motion } from 'framer-motion';
 
+// Kart genişliği: mobilde tam ekran, grid'de ~1/3
+const CARD_SIZES = '(max-width: 640px) 100vw, (max-width: 1024px) 50vw, 400px';
+
 export function ProductCardSkeleton() {
   return (
     <div className="rounded-3xl overflow-hidden border border-slate-200 dark:border-slate-800 bg-slate-100 dark:bg-slate-800/50 shadow-sm animate-pulse">
@@ -17,13 +20,15 @@ export function ProductCardSkeleton() {
   );
 }
 
-export default function ProductCard({ product }) {
+export default function ProductCard({ product, isFavorite = false, onToggleFavorite }) {
   const { t } = useTranslation();
   const imageSrc = product.thumbnail || product.images?.[0]?.image;
   const src = imageSrc ? mediaUrl(imageSrc) : null;
+  const srcset = (product.thumbnail && product.thumbnail_srcset) || {};
   const displayName = product.display_name || product.name_en || product.name_tr;
   const subtitle = product.display_description || product.description_en || product.description_tr || '';
-  const has3d = !!product.model_3d;
+  const has3d = product.has_3d ?? !!product.model_3d;
+  const price = product.min_price ?? product.price;
 
   return (
     <motion.div
@@ -36,11 +41,18 @@ export default function ProductCard({ product }) {
     >
       <div className="relative overflow-hidden bg-slate-100 dark:bg-slate-800/50">
         {src ? (
-          <img
-            src={src}
-            alt={displayName}
-            className="h-64 w-full object-cover transition duration-500 group-hover:scale-105"
-          />
+          <picture>
+            {srcset.avif && <source type="image/avif" srcSet={srcset.avif} sizes={CARD_SIZES} />}
+            {srcset.webp && <source type="image/webp" srcSet={srcset.webp} sizes={CARD_SIZES} />}
+            <img
+              src={src}
+              srcSet={srcset.jpeg}
+              sizes={CARD_SIZES}
+              loading="lazy"
+              alt={displayName}
+              className="h-64 w-full object-cover transition duration-500 group-hover:scale-105"
+            />
+          </picture>
         ) : (
           <div className="flex h-64 items-center justify-center text-slate-400 dark:text-slate-500">{t('product.noImage')}</div>
         )}
@@ -49,6 +61,20 @@ export default function ProductCard({ product }) {
             ◈ 3D
           </span>
         )}
+        {onToggleFavorite && (
+          <motion.button
+            type="button"
+            whileTap={{ scale: 0.85 }}
+            onClick={() => onToggleFavorite(product.id)}
+            aria-pressed={isFavorite}
+            aria-label={t('product.favorite')}
+            className="absolute right-4 top-4 rounded-full bg-white/90 dark:bg-slate-900/90 p-2 shadow-xl transition hover:scale-105"
+          >
+            <Heart
+              className={`w-5 h-5 ${isFavorite ? 'fill-rose-500 text-rose-500' : 'text-slate-500 dark:text-slate-300'}`}
+            />
+          </motion.button>
+        )}
       </div>
 
       <div className="p-5 space-y-4">
@@ -60,7 +86,7 @@ export default function ProductCard({ product }) {
         <div className="flex items-center justify-between gap-4">
           <div>
             <p className="text-sm text-slate-500 dark:text-slate-400">{t('product.price')}</p>
-            <p className="text-2xl font-black text-indigo-600 dark:text-cyan-400">{product.price} {product.currency}</p>
+            <p className="text-2xl font-black text-indigo-600 dark:text-cyan-400">{price} {product.currency}</p>
           </div>
           <motion.div whileTap={{ scale: 0.93 }} whileHover={{ scale: 1.05 }}>
             <Link
@@ -1,10 +1,9 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Link } from 'react-router-dom';
 import { useTranslation } from 'react-i18next';
 import {
   getMyCart,
-  updateCartItemQuantity,
-  removeCartItem,
+  updateCartItems,
   applyCoupon,
   checkout,
   mediaUrl,
@@ -38,23 +37,44 @@ export default function Cart() {
     loadCart();
   }, [isAuthenticated]);
 
-  const handleUpdateQty = (itemId, newQty) => {
-    if (newQty < 1) return;
-    updateCartItemQuantity(itemId, newQty)
+  // Hızlı +/- tıklamaları ve silmeler biriktirilip tek PATCH isteğiyle gönderilir
+  const pendingOps = useRef(new Map());
+  const flushTimer = useRef(null);
+
+  useEffect(() => () => clearTimeout(flushTimer.current), []);
+
+  const flushOps = () => {
+    clearTimeout(flushTimer.current);
+    flushTimer.current = null;
+    const operations = [...pendingOps.current.values()];
+    pendingOps.current.clear();
+    if (!operations.length) return Promise.resolve();
+    return updateCartItems(operations)
       .then((data) => {
         setCart(data);
         refreshCartCount?.();
       })
-      .catch(() => {});
+      .catch(() => loadCart());
+  };
+
+  const queueOp = (itemId, operation) => {
+    pendingOps.current.set(itemId, operation);
+    clearTimeout(flushTimer.current);
+    flushTimer.current = setTimeout(flushOps, 300);
+  };
+
+  const handleUpdateQty = (itemId, newQty) => {
+    if (newQty < 1) return;
+    setCart((prev) => ({
+      ...prev,
+      items: prev.items.map((item) => (item.id === itemId ? { ...item, quantity: newQty } : item)),
+    }));
+    queueOp(itemId, { op: 'set', item_id: itemId, quantity: newQty });
   };
 
   const handleRemove = (itemId) => {
-    removeCartItem(itemId)
-      .then((data) => {
-        setCart(data);
-        refreshCartCount?.();
-      })
-      .catch(() => {});
+    setCart((prev) => ({ ...prev, items: prev.items.filter((item) => item.id !== itemId) }));
+    queueOp(itemId, { op: 'remove', item_id: itemId });
   };
 
   const handleApplyCoupon = (e) => {
@@ -74,7 +94,8 @@ export default function Cart() {
   const handleCheckout = () => {
     setCheckoutLoading(true);
     setOrderDone(null);
-    checkout()
+    flushOps()
+      .then(() => checkout())
       .then((data) => {
         setOrderDone(data);
         setCart({ items: [] });
@@ -1,7 +1,8 @@
 import React, { useCallback, useEffect, useRef, useState } from 'react';
 import { useTranslation } from 'react-i18next';
 import { motion } from 'framer-motion';
-import { getProducts, getCategories } from '../services/api';
+import { getProducts, getCategories, checkFavorites, toggleFavorite } from '../services/api';
+import { useAuth } from '../context/AuthContext';
 import ProductCard, { ProductCardSkeleton } from '../components/ProductCard';
 
 const containerVariants = {
@@ -24,23 +25,36 @@ export default function Home() {
   const [selectedCategory, setSelectedCategory] = useState(null);
   const [search, setSearch] = useState('');
   const [loading, setLoading] = useState(true);
+  const [favorites, setFavorites] = useState(() => new Set());
+  // Beden / renk / stok süzgeçleri ve sunucunun döndüğü facet sayıları
+  const [facetFilters, setFacetFilters] = useState({ size: [], color: [], inStock: false });
+  const [facets, setFacets] = useState(null);
+  const { isAuthenticated } = useAuth();
   const searchRef = useRef(null);
 
   const fetchProducts = useCallback(() => {
     setLoading(true);
-    const params = {};
+    // Kart için yalnızca küçük/ad/fiyat/3D bilgisi (beden, renk, galeri gönderilmez)
+    const params = { view: 'card', facets: 1 };
 
     if (selectedCategory) params.category = selectedCategory;
-    if (search.trim()) params.search = search.trim();
+    if (search.trim()) params.q = search.trim();
+    if (facetFilters.size.length) params.size = facetFilters.size.join(',');
+    if (facetFilters.color.length) params.color = facetFilters.color.join(',');
+    if (facetFilters.inStock) params.in_stock = 1;
 
     getProducts(params)
       .then((data) => {
         const list = data?.results ?? data ?? [];
         setProducts(Array.isArray(list) ? list : []);
+        setFacets(data?.facets ?? null);
+      })
+      .catch(() => {
+        setProducts([]);
+        setFacets(null);
       })
-      .catch(() => setProducts([]))
       .finally(() => setLoading(false));
-  }, [selectedCategory, search]);
+  }, [selectedCategory, search, facetFilters]);
 
   useEffect(() => {
     getCategories()
@@ -53,7 +67,7 @@ export default function Home() {
 
   useEffect(() => {
     fetchProducts();
-  }, [selectedCategory]);
+  }, [selectedCategory, facetFilters]);
 
   useEffect(() => {
     fetchProducts();
@@ -63,18 +77,56 @@ export default function Home() {
     }).catch(() => setCategories([]));
   }, [i18n.language]);
 
+  // Izgaradaki tüm kartların favori durumu tek istekte
+  useEffect(() => {
+    if (!isAuthenticated || products.length === 0) {
+      setFavorites(new Set());
+      return;
+    }
+    checkFavorites(products.map((product) => product.id))
+      .then((ids) => setFavorites(new Set(ids)))
+      .catch(() => setFavorites(new Set()));
+  }, [products, isAuthenticated]);
+
+  const handleToggleFavorite = (productId) => {
+    toggleFavorite(productId)
+      .then(({ is_favorite: isFavorite }) => {
+        setFavorites((current) => {
+          const next = new Set(current);
+          if (isFavorite) next.add(productId);
+          else next.delete(productId);
+          return next;
+        });
+      })
+      .catch(() => {});
+  };
+
   const handleSearch = (event) => {
     event?.preventDefault();
     fetchProducts();
   };
 
+  const toggleFacet = (name, value) => {
+    setFacetFilters((current) => ({
+      ...current,
+      [name]: current[name].includes(value)
+        ? current[name].filter((item) => item !== value)
+        : [...current[name], value],
+    }));
+  };
+
   const handleClearFilters = () => {
     setSearch('');
     setSelectedCategory(null);
+    setFacetFilters({ size: [], color: [], inStock: false });
     if (searchRef.current) searchRef.current.value = '';
   };
 
-  const hasFilters = selectedCategory !== null || search.trim() !== '';
+  const hasFacetFilters = facetFilters.size.length > 0 || facetFilters.color.length > 0 || facetFilters.inStock;
+  const hasFilters = selectedCategory !== null || search.trim() !== '' || hasFacetFilters;
+  const chipClass = (active) => `rounded-full px-4 py-2 text-xs font-semibold transition active:scale-95 ${
+    active ? 'bg-indigo-600 dark:bg-cyan-500 text-white dark:text-slate-950' : 'bg-slate-100 dark:bg-slate-800 text-slate-700 dark:text-slate-300 hover:bg-slate-200 dark:hover:bg-slate-700'
+  }`;
 
   return (
     <div className="max-w-7xl mx-auto px-4 sm:px-6 py-10">
@@ -175,10 +227,51 @@ export default function Home() {
         ))}
       </motion.div>
 
+      {facets && (
+        <div className="mb-10 flex flex-col gap-4">
+          {facets.size.length > 0 && (
+            <div className="flex flex-wrap items-center gap-2">
+              <span className="mr-2 text-sm font-semibold text-slate-500 dark:text-slate-400">{t('home.size')}</span>
+              {facets.size.map(({ value, count }) => (
+                <button key={value} type="button" onClick={() => toggleFacet('size', value)} className={chipClass(facetFilters.size.includes(value))}>
+                  {value} ({count})
+                </button>
+              ))}
+            </div>
+          )}
+          {facets.color.length > 0 && (
+            <div className="flex flex-wrap items-center gap-2">
+              <span className="mr-2 text-sm font-semibold text-slate-500 dark:text-slate-400">{t('home.color')}</span>
+              {facets.color.map(({ value, count }) => (
+                <button key={value} type="button" onClick={() => toggleFacet('color', value)} className={chipClass(facetFilters.color.includes(value))}>
+                  {value} ({count})
+                </button>
+              ))}
+            </div>
+          )}
+          <div className="flex flex-wrap items-center gap-2">
+            <button
+              type="button"
+              onClick={() => setFacetFilters((current) => ({ ...current, inStock: !current.inStock }))}
+              className={chipClass(facetFilters.inStock)}
+            >
+              {t('home.inStock')} ({facets.in_stock})
+            </button>
+          </div>
+        </div>
+      )}
+
       <div className="grid gap-6 sm:grid-cols-2 xl:grid-cols-4">
         {loading
           ? Array.from({ length: 8 }).map((_, index) => <ProductCardSkeleton key={index} />)
-          : products.map((product) => <ProductCard key={product.id} product={product} />)}
+          : products.map((product) => (
+              <ProductCard
+                key={product.id}
+                product={product}
+                isFavorite={favorites.has(product.id)}
+                onToggleFavorite={isAuthenticated ? handleToggleFavorite : undefined}
+              />
+            ))}
       </div>
 
       {!loading && products.length === 0 && (
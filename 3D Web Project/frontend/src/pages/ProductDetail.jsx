@@ -1,7 +1,8 @@
 import React, { useState, useEffect } from 'react';
 import { useParams } from 'react-router-dom';
 import { useTranslation } from 'react-i18next';
-import { getProductDetail, addToCartWithColor, addToCart, mediaUrl } from '../services/api';
+import { getProductDetail, getRelatedProducts, addToCartWithColor, addToCart, mediaUrl } from '../services/api';
+import ProductCard from '../components/ProductCard';
 import { useAuth } from '../context/AuthContext';
 import { ShoppingCart, CheckCircle, ArrowLeft, Eye, Box } from 'lucide-react';
 import { Link } from 'react-router-dom';
@@ -19,6 +20,7 @@ export default function ProductDetail() {
   const [galleryIndex, setGalleryIndex] = useState(0);
   const [selectedColorId, setSelectedColorId] = useState(null);
   const [show3d, setShow3d] = useState(false);
+  const [related, setRelated] = useState([]);
 
   const loadProduct = () => {
     getProductDetail(id)
@@ -37,6 +39,12 @@ export default function ProductDetail() {
     loadProduct();
   }, [i18n.language]);
 
+  useEffect(() => {
+    getRelatedProducts(id)
+      .then((list) => setRelated(Array.isArray(list) ? list.slice(0, 4) : []))
+      .catch(() => setRelated([]));
+  }, [id, i18n.language]);
+
   if (loading) return <div className="text-center py-20 font-bold">{t('common.loading')}</div>;
   if (!product) return <div className="text-center py-20 font-bold">{t('product.description')}</div>;
 
@@ -46,7 +54,13 @@ export default function ProductDetail() {
       ? [mediaUrl(product.thumbnail)]
       : [];
   const mainImage = images[galleryIndex] || images[0];
-  const modelUrl = product.model_3d ? mediaUrl(product.model_3d) : null;
+  // Mobilde / veri tasarrufu modunda sıkıştırılmış (doku küçültülmüş) GLB yüklenir
+  const preferLiteModel = product.model_3d_lite && (
+    window.matchMedia('(max-width: 768px)').matches || navigator.connection?.saveData
+  );
+  const modelUrl = product.model_3d
+    ? mediaUrl(preferLiteModel ? product.model_3d_lite : product.model_3d)
+    : null;
   const posterUrl = product.model_3d_poster ? mediaUrl(product.model_3d_poster) : mainImage;
   const displayName = product.display_name || product.name_en || product.name_tr;
   const displayDescription = product.display_description || product.description_en || product.description_tr;
@@ -277,6 +291,15 @@ export default function ProductDetail() {
           </div>
         </motion.div>
       </div>
+
+      {related.length > 0 && (
+        <section className="mt-20">
+          <h2 className="mb-8 text-2xl font-black text-gray-900 dark:text-white">{t('product.related')}</h2>
+          <div className="grid gap-6 sm:grid-cols-2 xl:grid-cols-4">
+            {related.map((item) => <ProductCard key={item.id} product={item} />)}
+          </div>
+        </section>
+      )}
     </div>
   );
 }
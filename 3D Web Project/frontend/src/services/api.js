@@ -71,6 +71,10 @@ export const getCategories = () =>
 export const getProductDetail = (id) =>
   api.get(`${store}/products/${id}/`).then((res) => res.data);
 
+// Birlikte sık satın alınanlar (kart gösterimi)
+export const getRelatedProducts = (id) =>
+  api.get(`${store}/products/${id}/related/`).then((res) => res.data ?? []);
+
 // --- Sepet ---
 export const getMyCart = () =>
   api.get(`${store}/cart/my_cart/`).then((res) => res.data);
@@ -91,6 +95,10 @@ export const updateCartItemQuantity = (itemId, quantity) =>
 export const removeCartItem = (itemId) =>
   api.delete(`${store}/cart/items/${itemId}/`).then((res) => res.data);
 
+// Birden çok add / set / remove işlemini tek istekte uygular
+export const updateCartItems = (operations) =>
+  api.patch(`${store}/cart/items/`, { operations }).then((res) => res.data);
+
 export const applyCoupon = (code) =>
   api.post(`${store}/cart/apply_coupon/`, { code }).then((res) => res.data);
 
@@ -100,6 +108,19 @@ export const mergeCart = (items) =>
 export const checkout = () =>
   api.post(`${store}/cart/checkout/`).then((res) => res.data);
 
+// --- Favoriler ---
+export const getFavorites = (params = {}) =>
+  api.get(`${store}/favorites/`, { params }).then((res) => res.data);
+
+export const toggleFavorite = (productId) =>
+  api.post(`${store}/favorites/toggle/`, { product_id: productId }).then((res) => res.data);
+
+// Ürün ızgarasındaki kartlardan hangilerinin favori olduğu (tek istek)
+export const checkFavorites = (productIds) =>
+  api
+    .get(`${store}/favorites/check/`, { params: { ids: productIds.join(',') } })
+    .then((res) => res.data.favorited ?? []);
+
 // --- Siparişler ---
 export const getMyOrders = () =>
   api.get(`${store}/orders/`).then((res) => res.data.results ?? res.data ?? []);